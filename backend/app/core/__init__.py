@@ -0,0 +1,13 @@
+from .cache import TTLCache, SingleFlight
+from .executor import BoundedExecutor, ExecutorSaturated
+from .metrics import TimingMiddleware, timed, render_metrics
+
+__all__ = [
+    "TTLCache",
+    "SingleFlight",
+    "BoundedExecutor",
+    "ExecutorSaturated",
+    "TimingMiddleware",
+    "timed",
+    "render_metrics"
+]
@@ -0,0 +1,141 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# Market data quote cache
+QUOTE_CACHE_MAX_SIZE = _int("QUOTE_CACHE_MAX_SIZE", 2048)
+QUOTE_PRICE_TTL_SECONDS = _float("QUOTE_PRICE_TTL_SECONDS", 60)
+QUOTE_PROFILE_TTL_SECONDS = _float("QUOTE_PROFILE_TTL_SECONDS", 24 * 60 * 60)
+QUOTE_BATCH_MAX_TICKERS = _int("QUOTE_BATCH_MAX_TICKERS", 100)
+
+# Upstream market data protection
+UPSTREAM_RATE_PER_SECOND = _float("UPSTREAM_RATE_PER_SECOND", 5)
+UPSTREAM_BURST = _int("UPSTREAM_BURST", 10)
+UPSTREAM_RATE_WAIT_SECONDS = _float("UPSTREAM_RATE_WAIT_SECONDS", 1)
+UPSTREAM_BREAKER_FAILURES = _int("UPSTREAM_BREAKER_FAILURES", 5)
+UPSTREAM_BREAKER_RESET_SECONDS = _float("UPSTREAM_BREAKER_RESET_SECONDS", 30)
+# Serve an expired quote younger than this at once and refresh it in the background
+QUOTE_STALE_WHILE_REVALIDATE_SECONDS = _float("QUOTE_STALE_WHILE_REVALIDATE_SECONDS", 5 * 60)
+# Serve the last known quote up to this age when upstream is unavailable
+QUOTE_STALE_MAX_AGE_SECONDS = _float("QUOTE_STALE_MAX_AGE_SECONDS", 24 * 60 * 60)
+
+# Market data worker pool
+STOCK_EXECUTOR_WORKERS = _int("STOCK_EXECUTOR_WORKERS", 8)
+STOCK_EXECUTOR_MAX_QUEUE = _int("STOCK_EXECUTOR_MAX_QUEUE", 64)
+STOCK_FETCH_TIMEOUT_SECONDS = _float("STOCK_FETCH_TIMEOUT_SECONDS", 10)
+# Unlisted tickers checked per concurrent upstream call when validating imports and batch edits
+TICKER_VALIDATION_CHUNK_SIZE = _int("TICKER_VALIDATION_CHUNK_SIZE", 10)
+
+# Authenticated principal cache
+AUTH_CACHE_MAX_SIZE = _int("AUTH_CACHE_MAX_SIZE", 10000)
+AUTH_CACHE_TTL_SECONDS = _float("AUTH_CACHE_TTL_SECONDS", 60)
+
+# Password hashing
+BCRYPT_ROUNDS = _int("BCRYPT_ROUNDS", 12)
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = _int("PASSWORD_HASH_WORKERS", 4)
+PASSWORD_HASH_MAX_QUEUE = _int("PASSWORD_HASH_MAX_QUEUE", 32)
+PASSWORD_HASH_TIMEOUT_SECONDS = _float("PASSWORD_HASH_TIMEOUT_SECONDS", 5)
+
+# Storage backend: "supabase" (PostgREST over HTTP), "postgres" (asyncpg) or "sqlite" (embedded file)
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase").lower()
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/app.sqlite3")
+# Prepared statements kept per connection by the postgres and sqlite backends
+DB_STATEMENT_CACHE_SIZE = _int("DB_STATEMENT_CACHE_SIZE", 256)
+
+# Database HTTP (PostgREST) connection pool
+POSTGREST_URL = os.getenv("POSTGREST_URL") or f"{os.getenv('SUPABASE_URL', '').rstrip('/')}/rest/v1"
+DB_POOL_MAX_CONNECTIONS = _int("DB_POOL_MAX_CONNECTIONS", 50)
+DB_POOL_MAX_KEEPALIVE = _int("DB_POOL_MAX_KEEPALIVE", 20)
+DB_KEEPALIVE_EXPIRY_SECONDS = _float("DB_KEEPALIVE_EXPIRY_SECONDS", 30)
+DB_CONNECT_TIMEOUT_SECONDS = _float("DB_CONNECT_TIMEOUT_SECONDS", 3)
+DB_TIMEOUT_SECONDS = _float("DB_TIMEOUT_SECONDS", 10)
+DB_RETRIES = _int("DB_RETRIES", 2)
+DB_HTTP2 = os.getenv("DB_HTTP2", "true").lower() in ("1", "true", "yes")
+
+# Durable profile tier (SQLite), shared across restarts and workers
+PROFILE_STORE_PATH = os.getenv("PROFILE_STORE_PATH", "data/profiles.sqlite3")
+PROFILE_STORE_TTL_SECONDS = _float("PROFILE_STORE_TTL_SECONDS", QUOTE_PROFILE_TTL_SECONDS)
+
+# Largest share count a position may hold; positions.shares is a 32-bit INTEGER on Postgres
+POSITION_MAX_SHARES = _int("POSITION_MAX_SHARES", 2 ** 31 - 1)
+
+# Bulk position import
+POSITION_IMPORT_BATCH_SIZE = _int("POSITION_IMPORT_BATCH_SIZE", 1000)
+POSITION_IMPORT_MAX_ROWS = _int("POSITION_IMPORT_MAX_ROWS", 50000)
+
+# Symbol universe index
+SYMBOL_LISTING_URLS = [
+    url.strip() for url in os.getenv(
+        "SYMBOL_LISTING_URLS",
+        "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt,"
+        "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+    ).split(",") if url.strip()
+]
+SYMBOL_LISTING_PATH = os.getenv("SYMBOL_LISTING_PATH", "data/symbols.txt")
+SYMBOL_INDEX_REFRESH_SECONDS = _float("SYMBOL_INDEX_REFRESH_SECONDS", 24 * 60 * 60)
+
+# Local OHLCV history store
+HISTORY_STORE_PATH = os.getenv("HISTORY_STORE_PATH", "data/history")
+HISTORY_REFRESH_SECONDS = _float("HISTORY_REFRESH_SECONDS", 60 * 60)
+HISTORY_INITIAL_PERIOD = os.getenv("HISTORY_INITIAL_PERIOD", "10y")
+HISTORY_MAX_OPEN = _int("HISTORY_MAX_OPEN", 1024)
+# Downsampled chart series kept per (ticker, range, points, method)
+SERIES_CACHE_SIZE = _int("SERIES_CACHE_SIZE", 2048)
+SERIES_DEFAULT_POINTS = _int("SERIES_DEFAULT_POINTS", 500)
+SERIES_MAX_POINTS = _int("SERIES_MAX_POINTS", 5000)
+
+# Portfolio analytics
+ANALYTICS_BENCHMARK = os.getenv("ANALYTICS_BENCHMARK", "SPY")
+ANALYTICS_LOOKBACK_DAYS = _int("ANALYTICS_LOOKBACK_DAYS", 252)
+
+# Monte Carlo VaR; a simulation stops adding paths once the time budget is spent
+RISK_DEFAULT_PATHS = _int("RISK_DEFAULT_PATHS", 10000)
+RISK_MAX_PATHS = _int("RISK_MAX_PATHS", 100000)
+RISK_MAX_SCENARIOS = _int("RISK_MAX_SCENARIOS", 10)
+RISK_TIME_BUDGET_SECONDS = _float("RISK_TIME_BUDGET_SECONDS", 0.5)
+RISK_MODEL_CACHE_SIZE = _int("RISK_MODEL_CACHE_SIZE", 1024)
+# Histories gain a bar a day, so a factor is rebuilt at least this often
+RISK_MODEL_TTL_SECONDS = _float("RISK_MODEL_TTL_SECONDS", 60 * 60)
+
+# Request instrumentation; /stats and /metrics take this bearer token when set (for
+# scrapers), otherwise a signed-in user's token
+OPS_TOKEN = os.getenv("OPS_TOKEN", "")
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Response encoding: "orjson", "msgspec" or "json" for the routes returning database rows
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson").lower()
+# Opt in to let those routes skip response_model validation of rows we wrote ourselves
+TRUST_SERVICE_OUTPUT = os.getenv("TRUST_SERVICE_OUTPUT", "false").lower() in ("1", "true", "yes")
+# Responses smaller than this go out uncompressed; 0 disables compression
+COMPRESSION_MIN_BYTES = _int("COMPRESSION_MIN_BYTES", 1024)
+GZIP_LEVEL = _int("GZIP_LEVEL", 6)
+BROTLI_QUALITY = _int("BROTLI_QUALITY", 4)
+
+# Live watchlist quote stream
+QUOTE_STREAM_INTERVAL_SECONDS = _float("QUOTE_STREAM_INTERVAL_SECONDS", 15)
+QUOTE_STREAM_HEARTBEAT_SECONDS = _float("QUOTE_STREAM_HEARTBEAT_SECONDS", 20)
+QUOTE_STREAM_MAX_SUBSCRIBERS = _int("QUOTE_STREAM_MAX_SUBSCRIBERS", 1000)
+QUOTE_STREAM_MAX_TICKERS = _int("QUOTE_STREAM_MAX_TICKERS", 200)
+
+# Inline watchlist quotes: tickers per concurrent upstream batch and the default deadline
+WATCHLIST_QUOTE_CHUNK_SIZE = _int("WATCHLIST_QUOTE_CHUNK_SIZE", 10)
+WATCHLIST_QUOTE_DEADLINE_SECONDS = _float("WATCHLIST_QUOTE_DEADLINE_SECONDS", 1.5)
+# Tickers accepted in each of the add and remove lists of one batch edit
+WATCHLIST_BATCH_MAX_TICKERS = _int("WATCHLIST_BATCH_MAX_TICKERS", 500)
+
+# Background quote prewarming (interval 0 disables it)
+PREWARM_INTERVAL_SECONDS = _float("PREWARM_INTERVAL_SECONDS", 45)
+PREWARM_MAX_TICKERS = _int("PREWARM_MAX_TICKERS", 500)
+PREWARM_UPSTREAM_BUDGET = _int("PREWARM_UPSTREAM_BUDGET", 10)
@@ -0,0 +1,37 @@
+import hashlib
+import json
+from fastapi import Response
+from typing import Any, Dict, Optional
+
+
+def version_etag(row: Dict[str, Any]) -> str:
+    """Strong ETag from a row's id and mutation counter"""
+    return f'"{row["id"]}.{row.get("version", 0)}"'
+
+
+def content_etag(data: Dict[str, Any]) -> str:
+    """Strong ETag from a digest of the payload itself"""
+    digest = hashlib.blake2b(json.dumps(data, sort_keys=True, default=str).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Clients may keep the body but must revalidate before reusing it
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
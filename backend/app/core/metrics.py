@@ -0,0 +1,134 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds, shared by every histogram
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request {dependency: [seconds, calls]}, set by TimingMiddleware
+_request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values, rendered in Prometheus text format"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values: Tuple[str, ...], seconds: float) -> None:
+        # Layout: one count per bucket, then +Inf count, then sum
+        index = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [0.0] * (len(BUCKETS) + 2)
+            series[index] += 1
+            series[-1] += seconds
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {values: list(counts) for values, counts in self._series.items()}
+        for values, counts in sorted(series.items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            cumulative = 0.0
+            for bound, count in zip(BUCKETS, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative:g}')
+            cumulative += counts[len(BUCKETS)]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative:g}')
+            lines.append(f"{self.name}_sum{{{labels}}} {counts[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative:g}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response body",
+    ("method", "route", "status")
+)
+DEPENDENCY_DURATION = Histogram(
+    "dependency_duration_seconds",
+    "Time spent per request in each dependency (all calls summed)",
+    ("route", "dependency")
+)
+
+
+@contextmanager
+def timed(dependency: str) -> Iterator[None]:
+    """Attribute the enclosed time to a dependency of the current request"""
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = timings.get(dependency)
+        if entry is None:
+            timings[dependency] = [time.perf_counter() - started, 1]
+        else:
+            entry[0] += time.perf_counter() - started
+            entry[1] += 1
+
+
+def server_timing(timings: Dict[str, List[float]], total: float) -> bytes:
+    """Server-Timing header value: one entry per dependency plus the whole request"""
+    parts = [f'{name};dur={seconds * 1000:.1f};desc="{int(calls)}x"' for name, (seconds, calls) in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+def render_metrics() -> str:
+    return "\n".join(REQUEST_DURATION.render() + DEPENDENCY_DURATION.render()) + "\n"
+
+
+class TimingMiddleware:
+    """ASGI middleware recording per-request dependency timings and latency histograms"""
+
+    def __init__(self, app, server_timing_header: bool = True):
+        self.app = app
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, List[float]] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing_header:
+                    # Headers go out before the body, so this covers time up to the first byte
+                    header = server_timing(timings, time.perf_counter() - started)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            elapsed = time.perf_counter() - started
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_DURATION.observe((scope["method"], route, str(status)), elapsed)
+            for dependency, (seconds, _) in timings.items():
+                DEPENDENCY_DURATION.observe((route, dependency), seconds)
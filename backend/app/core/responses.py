@@ -0,0 +1,77 @@
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from . import config
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value: Any) -> Any:
+    """Types the fast encoders don't know natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):
+        # numpy scalars and arrays
+        return value.tolist()
+    # pydantic Url and similar string-like values
+    return str(value)
+
+
+def _json_encoder(name: str) -> Callable[[Any], bytes]:
+    if name == "orjson" and ORJSON_AVAILABLE:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        return lambda content: orjson.dumps(content, default=_default, option=options)
+    if name == "msgspec" and MSGSPEC_AVAILABLE:
+        return msgspec.json.Encoder(enc_hook=_default).encode
+    if name != "json":
+        logger.warning("JSON_ENCODER=%s is not installed; falling back to the json module", name)
+    return lambda content: json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+render_json = _json_encoder(config.JSON_ENCODER)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with the configured JSON_ENCODER (orjson, msgspec or json)"""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def trusted_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> Any:
+    """Encode service output that already has the response model's shape, skipping FastAPI's
+    response_model validation; with TRUST_SERVICE_OUTPUT off the content is validated first and
+    then encoded by the route's response_class"""
+    if not config.TRUST_SERVICE_OUTPUT:
+        return content
+    encoded = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        # Headers set on the injected Response, such as the ETag
+        encoded.raw_headers.extend(
+            (key, value) for key, value in response.raw_headers
+            if key not in (b"content-length", b"content-type")
+        )
+    return encoded
@@ -1,15 +1,75 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from .core import config
+from .core.compression import CompressionMiddleware
+from .core.metrics import TimingMiddleware, render_metrics
 from .routers import auth_router, stock_router, portfolio_router, watchlist_router
 from .utils.database import create_tables
-from .utils.dependencies import get_supabase_client
+from .utils.dependencies import (
+    get_supabase_client,
+    get_database,
+    get_symbol_index,
+    get_stock_provider,
+    get_hash_executor,
+    get_quote_broadcaster,
+    get_prewarmer,
+    get_screener,
+    require_ops_access,
+    close_dependencies
+)
+from .services.auth_service import AuthService
+from .services.stock_service import StockService
+from .services.symbol_index import keep_symbol_index_fresh
+from .services.upstream import market_data
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start with the profiles an earlier process (or another worker) already fetched,
+    # registering the screener first so it indexes them as they load
+    get_screener()
+    await asyncio.to_thread(StockService.warm_profiles)
+    # Direct SQL backends own their schema; over Supabase this is a no-op
+    await get_database().create_schema()
+    tasks = [
+        asyncio.create_task(keep_symbol_index_fresh(
+            get_symbol_index(),
+            config.SYMBOL_LISTING_URLS,
+            config.SYMBOL_LISTING_PATH,
+            config.SYMBOL_INDEX_REFRESH_SECONDS
+        ))
+    ]
+    if config.PREWARM_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(get_prewarmer().run()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_dependencies()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Finance Portfolio API",
     description="A comprehensive finance portfolio management API with Supabase backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+if config.COMPRESSION_MIN_BYTES > 0:
+    # Added first so it sits inside the timing middleware and its CPU time is measured
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.COMPRESSION_MIN_BYTES,
+        gzip_level=config.GZIP_LEVEL,
+        brotli_quality=config.BROTLI_QUALITY
+    )
+
+# Per-request dependency timings (Server-Timing header and /metrics histograms)
+app.add_middleware(TimingMiddleware, server_timing_header=config.SERVER_TIMING_ENABLED)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(stock_router)
@@ -23,6 +83,30 @@ async def root():
     return {"message": "Finance Portfolio API with Supabase is running!"}
 
 
+@app.get("/stats", dependencies=[Depends(require_ops_access)])
+async def stats():
+    """Counters for sizing in-process caches and worker pools"""
+    return {
+        "quote_cache": StockService.cache_stats(),
+        "principal_cache": AuthService.cache_stats(),
+        "stock_executor": get_stock_provider().executor.stats(),
+        "market_data_upstream": market_data.stats(),
+        "symbol_index": {"size": len(get_symbol_index()), "loaded_at": get_symbol_index().loaded_at},
+        "password_hash_executor": get_hash_executor().stats(),
+        "password_hash_time": AuthService.hash_stats(),
+        "quote_stream": get_quote_broadcaster().stats(),
+        "prewarm": get_prewarmer().stats(),
+        "screener": get_screener().stats(),
+        "price_series": get_stock_provider().history_store.series_stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_ops_access)])
+async def metrics():
+    """Request and per-dependency latency histograms in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/setup-database")
 async def setup_database():
     """
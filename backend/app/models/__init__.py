@@ -1,16 +1,40 @@
 from .auth import UserCreate, UserLogin, Token
-from .stock import StockInfo
-from .portfolio import PositionAdd, PositionResponse, PortfolioResponse
-from .watchlist import TickerAdd, WatchlistResponse
+from .stock import StockInfo, StockBatchResponse, ScreenRow, ScreenResponse, SymbolMatch, PriceBar, PriceHistory, SeriesPoint, PriceSeries
+from .portfolio import (
+    PositionAdd, PositionResponse, PortfolioResponse, ImportRowError, ImportResult, PositionAnalytics, PortfolioAnalytics,
+    Trade, WhatIfScenario, RiskRequest, RiskMeasure, ScenarioRisk, PortfolioRisk
+)
+from .watchlist import TickerAdd, WatchlistBatch, WatchlistBatchResult, WatchlistQuote, WatchlistResponse
 
 __all__ = [
     "UserCreate",
     "UserLogin", 
     "Token",
     "StockInfo",
+    "StockBatchResponse",
+    "ScreenRow",
+    "ScreenResponse",
+    "SymbolMatch",
+    "PriceBar",
+    "PriceHistory",
+    "SeriesPoint",
+    "PriceSeries",
     "PositionAdd",
     "PositionResponse",
     "PortfolioResponse",
+    "ImportRowError",
+    "ImportResult",
+    "PositionAnalytics",
+    "PortfolioAnalytics",
+    "Trade",
+    "WhatIfScenario",
+    "RiskRequest",
+    "RiskMeasure",
+    "ScenarioRisk",
+    "PortfolioRisk",
     "TickerAdd",
+    "WatchlistBatch",
+    "WatchlistBatchResult",
+    "WatchlistQuote",
     "WatchlistResponse"
 ]
@@ -1,11 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
+from ..core import config
 
 
 class PositionAdd(BaseModel):
     ticker: str
-    shares: int
+    shares: int = Field(..., le=config.POSITION_MAX_SHARES)
 
 
 class PositionResponse(BaseModel):
@@ -20,3 +21,79 @@ class PortfolioResponse(BaseModel):
     name: str
     positions: List[PositionResponse]
     created_at: datetime
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    positions_updated: int
+    errors: List[ImportRowError]
+
+
+class PositionAnalytics(BaseModel):
+    ticker: str
+    shares: int
+    price: Optional[float] = None
+    market_value: Optional[float] = None
+    weight: Optional[float] = None
+    daily_pnl: Optional[float] = None
+    volatility: Optional[float] = None
+    beta: Optional[float] = None
+
+
+class PortfolioAnalytics(BaseModel):
+    total_value: float
+    daily_pnl: Optional[float] = None
+    daily_return: Optional[float] = None
+    volatility: Optional[float] = None
+    beta: Optional[float] = None
+    benchmark: str
+    lookback_days: int
+    positions: List[PositionAnalytics]
+    correlation: Optional[List[List[Optional[float]]]] = None
+    errors: Dict[str, str]
+
+
+class Trade(BaseModel):
+    ticker: str
+    # Positive buys, negative sells
+    shares: int
+
+
+class WhatIfScenario(BaseModel):
+    name: str
+    trades: List[Trade]
+
+
+class RiskRequest(BaseModel):
+    scenarios: List[WhatIfScenario] = Field([], max_length=config.RISK_MAX_SCENARIOS)
+    paths: int = Field(config.RISK_DEFAULT_PATHS, ge=100, le=config.RISK_MAX_PATHS)
+    confidence: float = Field(0.95, ge=0.5, lt=1)
+    seed: Optional[int] = None
+
+
+class RiskMeasure(BaseModel):
+    horizon_days: int
+    var: float
+    cvar: float
+
+
+class ScenarioRisk(BaseModel):
+    name: str
+    total_value: float
+    risk: List[RiskMeasure]
+
+
+class PortfolioRisk(BaseModel):
+    total_value: float
+    confidence: float
+    # Paths actually simulated; fewer than requested if the time budget ran out
+    paths: int
+    lookback_days: int
+    risk: List[RiskMeasure]
+    scenarios: List[ScenarioRisk]
+    errors: Dict[str, str]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from datetime import date, datetime
+from typing import Dict, List, Optional
 
 
 class StockInfo(BaseModel):
@@ -22,6 +23,77 @@ class StockInfo(BaseModel):
     beta: Optional[float] = None
     volume: Optional[int] = None
     average_volume: Optional[int] = None
+    previous_close: Optional[float] = None
     website: Optional[HttpUrl] = None
     short_description: Optional[str] = None
     is_etf: Optional[bool] = False
+    stale: bool = False
+    as_of: Optional[datetime] = None
+
+
+class StockBatchResponse(BaseModel):
+    results: Dict[str, StockInfo]
+    errors: Dict[str, str]
+
+
+class ScreenRow(BaseModel):
+    ticker: str
+    name: str
+    is_etf: bool = False
+    sector: Optional[str] = None
+    industry: Optional[str] = None
+    country: Optional[str] = None
+    exchange: Optional[str] = None
+    currency: Optional[str] = None
+    price: Optional[float] = None
+    market_cap: Optional[float] = None
+    pe_ratio: Optional[float] = None
+    forward_pe: Optional[float] = None
+    eps: Optional[float] = None
+    dividend_yield: Optional[float] = None
+    beta: Optional[float] = None
+    volume: Optional[float] = None
+    average_volume: Optional[float] = None
+    fifty_two_week_high: Optional[float] = None
+    fifty_two_week_low: Optional[float] = None
+
+
+class ScreenResponse(BaseModel):
+    universe: int
+    matched: int
+    results: List[ScreenRow]
+
+
+class SymbolMatch(BaseModel):
+    ticker: str
+    name: str
+    exchange: str
+
+
+class PriceBar(BaseModel):
+    date: date
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+
+
+class PriceHistory(BaseModel):
+    ticker: str
+    interval: str
+    bars: List[PriceBar]
+
+
+class SeriesPoint(BaseModel):
+    date: date
+    close: float
+
+
+class PriceSeries(BaseModel):
+    ticker: str
+    range: str
+    method: str
+    source_bars: int
+    points: Optional[List[SeriesPoint]] = None
+    bars: Optional[List[PriceBar]] = None
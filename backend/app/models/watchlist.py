@@ -1,13 +1,41 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
+from ..core import config
 
 
 class TickerAdd(BaseModel):
     ticker: str
 
 
+class WatchlistBatch(BaseModel):
+    # Removals are applied first, then additions not already in the watchlist
+    add: List[str] = Field([], max_length=config.WATCHLIST_BATCH_MAX_TICKERS)
+    remove: List[str] = Field([], max_length=config.WATCHLIST_BATCH_MAX_TICKERS)
+
+
+class WatchlistBatchResult(BaseModel):
+    tickers: List[str]
+    added: List[str]
+    removed: List[str]
+    # Tickers left out of add because they do not exist
+    errors: Dict[str, str]
+
+
+class WatchlistQuote(BaseModel):
+    ticker: str
+    price: Optional[float] = None
+    change: Optional[float] = None
+    change_percent: Optional[float] = None
+    volume: Optional[int] = None
+    stale: bool = False
+    # Not resolved before the request deadline; price, if any, is the last known one
+    pending: bool = False
+    as_of: Optional[datetime] = None
+
+
 class WatchlistResponse(BaseModel):
     id: str
     tickers: List[str]
     created_at: datetime
+    quotes: Optional[List[WatchlistQuote]] = None
@@ -0,0 +1,30 @@
+from .client import PostgrestClient, DatabaseError
+from .database import Database
+from .users import UserRepository
+from .portfolios import PortfolioRepository
+from .positions import PositionRepository
+from .watchlists import WatchlistRepository
+from .tickers import TickerRepository
+from .loader import BatchLoader, RequestLoader
+from .sql import SqlConnection, SqlDatabase
+from .postgres import PostgresConnection, postgres_database
+from .sqlite import SqliteConnection, sqlite_database
+
+__all__ = [
+    "PostgrestClient",
+    "DatabaseError",
+    "Database",
+    "UserRepository",
+    "PortfolioRepository",
+    "PositionRepository",
+    "WatchlistRepository",
+    "TickerRepository",
+    "BatchLoader",
+    "RequestLoader",
+    "SqlConnection",
+    "SqlDatabase",
+    "PostgresConnection",
+    "postgres_database",
+    "SqliteConnection",
+    "sqlite_database"
+]
@@ -0,0 +1,118 @@
+import asyncio
+import httpx
+from typing import Any, Dict, Optional
+from ..core.metrics import timed
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Safe to resend even if the first attempt may have reached the server
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PATCH", "DELETE"}
+RETRY_STATUS_CODES = {502, 503, 504}
+
+
+class DatabaseError(Exception):
+    """Raised when the database API returns an error response"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+def quote(value: Any) -> str:
+    """Quote a value for use inside a PostgREST or=(...)/in.(...) filter"""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+class PostgrestClient:
+    """Async PostgREST client over a pooled keep-alive HTTP connection"""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30,
+        connect_timeout: float = 3,
+        timeout: float = 10,
+        retries: int = 2,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        headers = {"Accept": "application/json"}
+        if api_key:
+            headers["apikey"] = api_key
+            headers["Authorization"] = f"Bearer {api_key}"
+        self.retries = retries
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            http2=http2 and HTTP2_AVAILABLE and transport is None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            transport=transport,
+        )
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        prefer: Optional[str] = None,
+    ) -> Any:
+        """Send a request, retrying transient failures, and return the decoded body"""
+        headers = {"Prefer": prefer} if prefer else None
+        attempt = 0
+        while True:
+            try:
+                with timed("db"):
+                    response = await self._client.request(method, path, params=params, json=json, headers=headers)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # Never reached the server, so any method can be retried
+                if attempt >= self.retries:
+                    raise
+            except httpx.TransportError:
+                if method not in IDEMPOTENT_METHODS or attempt >= self.retries:
+                    raise
+            else:
+                if (
+                    response.status_code in RETRY_STATUS_CODES
+                    and method in IDEMPOTENT_METHODS
+                    and attempt < self.retries
+                ):
+                    pass
+                elif response.status_code >= 400:
+                    raise DatabaseError(response.status_code, response.text)
+                else:
+                    return response.json() if response.content else None
+            attempt += 1
+            await asyncio.sleep(0.05 * 2 ** attempt)
+
+    async def select(self, table: str, params: Dict[str, Any]) -> list:
+        return await self.request("GET", f"/{table}", params=params) or []
+
+    async def insert(self, table: str, row: Dict[str, Any]) -> list:
+        return await self.request("POST", f"/{table}", json=row, prefer="return=representation") or []
+
+    async def update(self, table: str, params: Dict[str, Any], values: Dict[str, Any]) -> list:
+        return await self.request("PATCH", f"/{table}", params=params, json=values, prefer="return=representation") or []
+
+    async def delete(self, table: str, params: Dict[str, Any]) -> None:
+        await self.request("DELETE", f"/{table}", params=params)
+
+    async def rpc(self, function: str, args: Dict[str, Any]) -> Any:
+        return await self.request("POST", f"/rpc/{function}", json=args)
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -0,0 +1,34 @@
+from typing import Any, Optional
+from .client import PostgrestClient
+from .users import UserRepository
+from .portfolios import PortfolioRepository
+from .positions import PositionRepository
+from .watchlists import WatchlistRepository
+from .tickers import TickerRepository
+
+
+class Database:
+    """Repositories for every table, sharing one pooled client"""
+
+    def __init__(
+        self,
+        client: Optional[PostgrestClient],
+        users: Any = None,
+        portfolios: Any = None,
+        positions: Any = None,
+        watchlists: Any = None,
+        tickers: Any = None
+    ):
+        # Backends without PostgREST pass their own repositories and no client
+        self.client = client
+        self.users = users or UserRepository(client)
+        self.portfolios = portfolios or PortfolioRepository(client)
+        self.positions = positions or PositionRepository(client)
+        self.watchlists = watchlists or WatchlistRepository(client)
+        self.tickers = tickers or TickerRepository(client)
+
+    async def create_schema(self) -> None:
+        """Nothing to do over PostgREST; the schema is applied through /setup-database"""
+
+    async def close(self) -> None:
+        await self.client.close()
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from .database import Database
+
+Row = Dict[str, Any]
+
+
+class BatchLoader:
+    """DataLoader for one entity type: each key is fetched at most once, and keys
+    requested in the same event-loop tick share one batched query"""
+
+    def __init__(self, fetch: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Row]]]):
+        self._fetch = fetch
+        self._results: Dict[Hashable, "asyncio.Future[Optional[Row]]"] = {}
+        self._queue: List[Hashable] = []
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Optional[Row]:
+        """The row for key, or None if there is none"""
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._results[key] = loop.create_future()
+            if not self._queue:
+                # Let every coroutine runnable in this tick queue its keys first
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        # Shielded so one cancelled caller does not fail the others waiting on the same row
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[Hashable]) -> List[Optional[Row]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, row: Optional[Row]) -> None:
+        """Remember a row the caller already has, such as the result of a write"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(row)
+        self._results[key] = future
+
+    def clear(self, key: Hashable) -> None:
+        """Forget key so the next load reads it again, e.g. after it was written"""
+        self._results.pop(key, None)
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        futures = {key: self._results[key] for key in keys}
+        self.batches += 1
+        task = asyncio.ensure_future(self._fetch(keys))
+
+        def resolve(task: "asyncio.Task[Dict[Hashable, Row]]") -> None:
+            for key, future in futures.items():
+                if future.done():
+                    continue
+                if task.cancelled():
+                    future.cancel()
+                elif task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result().get(key))
+            if task.cancelled() or task.exception() is not None:
+                # Failures are not memoized; the next load retries
+                for key, future in futures.items():
+                    if self._results.get(key) is future:
+                        del self._results[key]
+                        # Retrieved here so an unawaited failure does not log a warning
+                        future.cancelled() or future.exception()
+
+        task.add_done_callback(resolve)
+
+
+class RequestLoader:
+    """Loaders for the rows a request reads by user, shared by every service in that request"""
+
+    def __init__(self, db: Database, principal_columns: str = "*"):
+        self.users = BatchLoader(lambda keys: db.users.get_many_by_username(keys, columns=principal_columns))
+        self.portfolios = BatchLoader(db.portfolios.get_many_with_positions)
+        self.watchlists = BatchLoader(db.watchlists.get_many_by_user_id)
@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+from .client import PostgrestClient, quote
+
+
+class PortfolioRepository:
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def get_by_user_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self.client.select("portfolios", {
+            "select": "*",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.asc",
+            "limit": 1
+        })
+        return rows[0] if rows else None
+
+    async def get_version(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Only the id and version, enough to answer a conditional GET"""
+        rows = await self.client.select("portfolios", {
+            "select": "id,version",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.asc",
+            "limit": 1
+        })
+        return rows[0] if rows else None
+
+    async def get_with_positions(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the user's portfolio with its positions embedded"""
+        rows = await self.client.select("portfolios", {
+            "select": "*,positions(*)",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.asc",
+            "limit": 1
+        })
+        return rows[0] if rows else None
+
+    async def get_many_with_positions(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Portfolios with positions embedded, keyed by user id, in one in.(...) query"""
+        rows = await self.client.select("portfolios", {
+            "select": "*,positions(*)",
+            "user_id": f"in.({','.join(quote(u) for u in user_ids)})",
+            "order": "created_at.asc"
+        })
+        # Oldest first, so a user with several keeps the one the SQL backends and RPCs use
+        found: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            found.setdefault(row["user_id"], row)
+        return found
+
+    async def create(self, user_id: str, name: str) -> Optional[Dict[str, Any]]:
+        rows = await self.client.insert("portfolios", {"user_id": user_id, "name": name})
+        return rows[0] if rows else None
@@ -0,0 +1,31 @@
+from typing import Any, Dict, List, Optional
+from .client import PostgrestClient
+
+
+class PositionRepository:
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def add(self, user_id: str, ticker: str, shares: int) -> Optional[Dict[str, Any]]:
+        """Atomically create a position or increment its shares; None if the user has no portfolio"""
+        rows = await self.client.rpc("add_position", {
+            "p_user_id": user_id,
+            "p_ticker": ticker,
+            "p_shares": shares
+        })
+        return rows[0] if rows else None
+
+    async def remove(self, user_id: str, ticker: str, shares: int) -> Optional[int]:
+        """Atomically reduce or delete a position; returns remaining shares, or None if not held"""
+        return await self.client.rpc("remove_position", {
+            "p_user_id": user_id,
+            "p_ticker": ticker,
+            "p_shares": shares
+        })
+
+    async def import_many(self, user_id: str, positions: List[Dict[str, Any]]) -> int:
+        """Upsert a batch of {ticker, shares} rows in one statement; returns positions touched"""
+        return await self.client.rpc("import_positions", {
+            "p_user_id": user_id,
+            "p_positions": positions
+        }) or 0
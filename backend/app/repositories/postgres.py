@@ -0,0 +1,146 @@
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, List, Optional
+from ..core.metrics import timed
+from .schema import POSTGRES_SCHEMA
+from .sql import Row, SqlConnection, SqlDatabase, SqlWatchlistRepository
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+
+
+class PostgresConnection(SqlConnection):
+    """asyncpg pool talking to Postgres directly; asyncpg prepares and caches each statement per connection"""
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 20,
+        statement_cache_size: int = 256,
+        timeout: float = 10
+    ):
+        if not ASYNCPG_AVAILABLE:
+            raise RuntimeError("DB_BACKEND=postgres needs the asyncpg package")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.timeout = timeout
+        self._pool: Optional["asyncpg.Pool"] = None
+        self._lock = asyncio.Lock()
+
+    async def fetch(self, sql: str, *args: Any) -> List[Row]:
+        pool = await self._get_pool()
+        with timed("db"):
+            records = await pool.fetch(sql, *args, timeout=self.timeout)
+        return [_row(record) for record in records]
+
+    async def fetchrow(self, sql: str, *args: Any) -> Optional[Row]:
+        pool = await self._get_pool()
+        with timed("db"):
+            record = await pool.fetchrow(sql, *args, timeout=self.timeout)
+        return _row(record) if record is not None else None
+
+    async def fetchval(self, sql: str, *args: Any) -> Any:
+        pool = await self._get_pool()
+        with timed("db"):
+            value = await pool.fetchval(sql, *args, timeout=self.timeout)
+        return str(value) if isinstance(value, uuid.UUID) else value
+
+    async def execute(self, sql: str, *args: Any) -> None:
+        pool = await self._get_pool()
+        with timed("db"):
+            await pool.execute(sql, *args, timeout=self.timeout)
+
+    def member(self, column: str, index: int, type: str) -> str:
+        # One array parameter keeps the statement text, and so its prepared plan, the same for any count
+        return f"{column} = ANY(${index}::{type}[])"
+
+    def array(self, values: List[Any]) -> Any:
+        return list(values)
+
+    def json(self, value: Any) -> Any:
+        # Encoded by the jsonb codec registered on each connection
+        return value
+
+    async def create_schema(self) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            for sql in POSTGRES_SCHEMA:
+                await conn.execute(sql)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def _get_pool(self) -> "asyncpg.Pool":
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        statement_cache_size=self.statement_cache_size,
+                        init=_init_connection
+                    )
+        return self._pool
+
+
+async def _init_connection(conn: "asyncpg.Connection") -> None:
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+def _row(record: "asyncpg.Record") -> Row:
+    # Ids leave the repositories as strings, as they do from PostgREST
+    return {key: str(value) if isinstance(value, uuid.UUID) else value for key, value in record.items()}
+
+
+class PostgresPositionRepository:
+    """Position mutations through the same SQL functions PostgREST exposes as RPCs"""
+
+    def __init__(self, conn: PostgresConnection):
+        self.conn = conn
+
+    async def add(self, user_id: str, ticker: str, shares: int) -> Optional[Dict[str, Any]]:
+        """Atomically create a position or increment its shares; None if the user has no portfolio"""
+        return await self.conn.fetchrow("SELECT * FROM add_position($1, $2, $3)", user_id, ticker, shares)
+
+    async def remove(self, user_id: str, ticker: str, shares: int) -> Optional[int]:
+        """Atomically reduce or delete a position; returns remaining shares, or None if not held"""
+        return await self.conn.fetchval("SELECT remove_position($1, $2, $3)", user_id, ticker, shares)
+
+    async def import_many(self, user_id: str, positions: List[Dict[str, Any]]) -> int:
+        """Upsert a batch of {ticker, shares} rows in one statement; returns positions touched"""
+        return await self.conn.fetchval("SELECT import_positions($1, $2::jsonb)", user_id, positions) or 0
+
+
+class PostgresWatchlistRepository(SqlWatchlistRepository):
+    async def edit(self, user_id: str, add: List[str], remove: List[str]) -> Optional[Dict[str, Any]]:
+        """Atomically remove tickers, then append new ones; returns {tickers, added, removed, version},
+        or None if the user has no watchlist"""
+        return await self.conn.fetchrow("SELECT * FROM edit_watchlist($1, $2, $3)", user_id, add, remove)
+
+
+class PostgresTickerRepository:
+    def __init__(self, conn: PostgresConnection):
+        self.conn = conn
+
+    async def hot(self, limit: int) -> List[Dict[str, Any]]:
+        """Tickers held in portfolios or watchlists as [{ticker, holders}], most-held first"""
+        return await self.conn.fetch("SELECT ticker, holders FROM hot_tickers($1)", limit)
+
+
+def postgres_database(dsn: str, **options: Any) -> SqlDatabase:
+    """Database backed by a direct asyncpg pool"""
+    conn = PostgresConnection(dsn, **options)
+    return SqlDatabase(
+        conn, PostgresPositionRepository(conn), PostgresWatchlistRepository(conn), PostgresTickerRepository(conn)
+    )
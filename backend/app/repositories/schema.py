@@ -0,0 +1,329 @@
+"""Table definitions shared by every storage backend
+
+The Postgres statements are what /setup-database runs through Supabase and what the
+asyncpg backend applies on startup; SQLite gets an equivalent schema of its own.
+"""
+
+# Users
+USERS_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    username TEXT UNIQUE NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    hashed_password TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+"""
+
+# Portfolios
+PORTFOLIOS_SQL = """
+CREATE TABLE IF NOT EXISTS portfolios (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL DEFAULT 'Default Portfolio',
+    version BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE portfolios ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_portfolios_user_id ON portfolios(user_id);
+"""
+
+# Positions, with a trigger keeping the portfolio version current
+POSITIONS_SQL = """
+CREATE TABLE IF NOT EXISTS positions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    portfolio_id UUID NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    ticker TEXT NOT NULL,
+    shares INTEGER NOT NULL CHECK (shares > 0),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_positions_portfolio_id ON positions(portfolio_id);
+CREATE INDEX IF NOT EXISTS idx_positions_ticker ON positions(ticker);
+
+-- Databases created before the unique index may hold several rows per ticker:
+-- fold their shares into the oldest row so the index can be built
+DO $$
+BEGIN
+    IF to_regclass('idx_positions_portfolio_ticker') IS NULL THEN
+        WITH ranked AS (
+            SELECT id,
+                   first_value(id) OVER (PARTITION BY portfolio_id, ticker ORDER BY created_at, id) AS keep_id,
+                   sum(shares) OVER (PARTITION BY portfolio_id, ticker) AS total
+            FROM positions
+        )
+        UPDATE positions p SET shares = r.total
+        FROM ranked r
+        WHERE p.id = r.id AND r.id = r.keep_id AND p.shares <> r.total;
+
+        DELETE FROM positions p
+        USING (
+            SELECT id, row_number() OVER (PARTITION BY portfolio_id, ticker ORDER BY created_at, id) AS n
+            FROM positions
+        ) r
+        WHERE p.id = r.id AND r.n > 1;
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_positions_portfolio_ticker ON positions(portfolio_id, ticker);
+
+-- Any change to a position bumps its portfolio's version, which backs the ETag. The
+-- triggers run once per statement, so a bulk import bumps each portfolio once, not per row
+CREATE OR REPLACE FUNCTION bump_portfolio_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE portfolios SET version = version + 1
+        WHERE id IN (SELECT DISTINCT portfolio_id FROM old_rows);
+    ELSE
+        UPDATE portfolios SET version = version + 1
+        WHERE id IN (SELECT DISTINCT portfolio_id FROM new_rows);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS positions_bump_version ON positions;
+DROP TRIGGER IF EXISTS positions_bump_version_insert ON positions;
+CREATE TRIGGER positions_bump_version_insert
+AFTER INSERT ON positions REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION bump_portfolio_version();
+
+DROP TRIGGER IF EXISTS positions_bump_version_update ON positions;
+CREATE TRIGGER positions_bump_version_update
+AFTER UPDATE ON positions REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION bump_portfolio_version();
+
+DROP TRIGGER IF EXISTS positions_bump_version_delete ON positions;
+CREATE TRIGGER positions_bump_version_delete
+AFTER DELETE ON positions REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION bump_portfolio_version();
+"""
+
+# Watchlists
+WATCHLISTS_SQL = """
+CREATE TABLE IF NOT EXISTS watchlists (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    tickers JSONB DEFAULT '[]'::jsonb,
+    version BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE watchlists ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_watchlists_user_id ON watchlists(user_id);
+
+CREATE OR REPLACE FUNCTION bump_watchlist_version() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS watchlists_bump_version ON watchlists;
+CREATE TRIGGER watchlists_bump_version
+BEFORE UPDATE OF tickers ON watchlists
+FOR EACH ROW EXECUTE FUNCTION bump_watchlist_version();
+"""
+
+# Atomic position mutations, each a single round trip through PostgREST RPC
+POSITION_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION add_position(p_user_id UUID, p_ticker TEXT, p_shares INTEGER)
+RETURNS SETOF positions AS $$
+    INSERT INTO positions (portfolio_id, ticker, shares)
+    SELECT id, p_ticker, p_shares FROM portfolios
+    WHERE user_id = p_user_id
+    ORDER BY created_at
+    LIMIT 1
+    ON CONFLICT (portfolio_id, ticker) DO UPDATE SET shares = positions.shares + EXCLUDED.shares
+    RETURNING *;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION remove_position(p_user_id UUID, p_ticker TEXT, p_shares INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_id UUID;
+    v_shares INTEGER;
+BEGIN
+    SELECT p.id, p.shares INTO v_id, v_shares
+    FROM positions p JOIN portfolios f ON f.id = p.portfolio_id
+    WHERE f.user_id = p_user_id AND p.ticker = p_ticker
+    LIMIT 1
+    FOR UPDATE OF p;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF p_shares >= v_shares THEN
+        DELETE FROM positions WHERE id = v_id;
+        RETURN 0;
+    END IF;
+
+    UPDATE positions SET shares = shares - p_shares WHERE id = v_id RETURNING shares INTO v_shares;
+    RETURN v_shares;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION import_positions(p_user_id UUID, p_positions JSONB)
+RETURNS INTEGER AS $$
+    WITH upserted AS (
+        INSERT INTO positions (portfolio_id, ticker, shares)
+        SELECT f.id, upper(x.ticker), sum(x.shares)
+        FROM (SELECT id FROM portfolios WHERE user_id = p_user_id ORDER BY created_at LIMIT 1) f,
+             jsonb_to_recordset(p_positions) AS x(ticker TEXT, shares INTEGER)
+        GROUP BY f.id, upper(x.ticker)
+        ON CONFLICT (portfolio_id, ticker) DO UPDATE SET shares = positions.shares + EXCLUDED.shares
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM upserted;
+$$ LANGUAGE sql;
+"""
+
+# Atomic watchlist edit: drop removals, then append additions not already present,
+# under a row lock so concurrent edits never overwrite each other
+WATCHLIST_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION edit_watchlist(p_user_id UUID, p_add TEXT[], p_remove TEXT[])
+RETURNS TABLE (tickers JSONB, added TEXT[], removed TEXT[], version BIGINT) AS $$
+#variable_conflict use_column
+DECLARE
+    v_id UUID;
+    v_old JSONB;
+    v_kept JSONB;
+BEGIN
+    p_add := COALESCE(p_add, '{}');
+    p_remove := COALESCE(p_remove, '{}');
+
+    SELECT w.id, COALESCE(w.tickers, '[]'::jsonb), w.version INTO v_id, v_old, version
+    FROM watchlists w
+    WHERE w.user_id = p_user_id
+    ORDER BY w.created_at
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT COALESCE(jsonb_agg(e.value ORDER BY e.ord), '[]'::jsonb) INTO v_kept
+    FROM jsonb_array_elements_text(v_old) WITH ORDINALITY AS e(value, ord)
+    WHERE e.value <> ALL(p_remove);
+
+    SELECT COALESCE(array_agg(DISTINCT r.value), '{}') INTO removed
+    FROM unnest(p_remove) AS r(value)
+    WHERE v_old ? r.value;
+
+    -- First occurrence wins, so the additions keep the order they were sent in
+    SELECT COALESCE(array_agg(a.value ORDER BY a.ord), '{}') INTO added
+    FROM (
+        SELECT x.value, min(x.ord) AS ord
+        FROM unnest(p_add) WITH ORDINALITY AS x(value, ord)
+        WHERE NOT v_kept ? x.value
+        GROUP BY x.value
+    ) a;
+
+    IF cardinality(added) = 0 AND cardinality(removed) = 0 THEN
+        tickers := v_old;
+    ELSE
+        tickers := v_kept || to_jsonb(added);
+        UPDATE watchlists w SET tickers = edit_watchlist.tickers
+        WHERE w.id = v_id
+        RETURNING w.version INTO version;
+    END IF;
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Most-held tickers across portfolios and watchlists, for cache prewarming
+TICKER_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION hot_tickers(p_limit INTEGER)
+RETURNS TABLE (ticker TEXT, holders INTEGER) AS $$
+    SELECT held.ticker, count(*)::INTEGER AS holders
+    FROM (
+        SELECT f.user_id, p.ticker
+        FROM positions p JOIN portfolios f ON f.id = p.portfolio_id
+        UNION
+        SELECT w.user_id, jsonb_array_elements_text(w.tickers)
+        FROM watchlists w
+    ) held
+    GROUP BY held.ticker
+    ORDER BY holders DESC, held.ticker
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+"""
+
+POSTGRES_SCHEMA = (
+    USERS_SQL,
+    PORTFOLIOS_SQL,
+    POSITIONS_SQL,
+    WATCHLISTS_SQL,
+    POSITION_FUNCTIONS_SQL,
+    WATCHLIST_FUNCTIONS_SQL,
+    TICKER_FUNCTIONS_SQL
+)
+
+# SQLite equivalent: TEXT ids generated by the application, JSON stored as TEXT,
+# and triggers in place of the plpgsql ones; position and watchlist edits run as transactions instead of functions
+SQLITE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        hashed_password TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS portfolios (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        name TEXT NOT NULL DEFAULT 'Default Portfolio',
+        version INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_portfolios_user_id ON portfolios(user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS positions (
+        id TEXT PRIMARY KEY,
+        portfolio_id TEXT NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+        ticker TEXT NOT NULL,
+        shares INTEGER NOT NULL CHECK (shares > 0),
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_positions_ticker ON positions(ticker)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_positions_portfolio_ticker ON positions(portfolio_id, ticker)",
+    """
+    CREATE TRIGGER IF NOT EXISTS positions_bump_version_insert AFTER INSERT ON positions
+    BEGIN UPDATE portfolios SET version = version + 1 WHERE id = NEW.portfolio_id; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS positions_bump_version_update AFTER UPDATE ON positions
+    BEGIN UPDATE portfolios SET version = version + 1 WHERE id = NEW.portfolio_id; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS positions_bump_version_delete AFTER DELETE ON positions
+    BEGIN UPDATE portfolios SET version = version + 1 WHERE id = OLD.portfolio_id; END
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS watchlists (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        tickers TEXT NOT NULL DEFAULT '[]',
+        version INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_watchlists_user_id ON watchlists(user_id)",
+    """
+    CREATE TRIGGER IF NOT EXISTS watchlists_bump_version AFTER UPDATE OF tickers ON watchlists
+    BEGIN UPDATE watchlists SET version = OLD.version + 1 WHERE id = NEW.id; END
+    """
+)
@@ -0,0 +1,203 @@
+import re
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from .database import Database
+
+Row = Dict[str, Any]
+
+_COLUMN = re.compile(r"^[a-z_]+$")
+
+
+class SqlConnection(ABC):
+    """What the SQL repositories need from a driver; statements use $1-style placeholders
+
+    Every distinct statement text is prepared once per connection and reused, so repositories
+    keep their SQL constant and pass lists through array() rather than building IN (...) lists.
+    """
+
+    @abstractmethod
+    async def fetch(self, sql: str, *args: Any) -> List[Row]:
+        ...
+
+    async def fetchrow(self, sql: str, *args: Any) -> Optional[Row]:
+        rows = await self.fetch(sql, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, sql: str, *args: Any) -> Any:
+        row = await self.fetchrow(sql, *args)
+        return next(iter(row.values())) if row else None
+
+    async def execute(self, sql: str, *args: Any) -> None:
+        await self.fetch(sql, *args)
+
+    @abstractmethod
+    def member(self, column: str, index: int, type: str) -> str:
+        """Predicate true when column is one of the values in parameter $index"""
+
+    @abstractmethod
+    def array(self, values: List[Any]) -> Any:
+        """Bind value for a parameter used with member()"""
+
+    @abstractmethod
+    def json(self, value: Any) -> Any:
+        """Bind value for a JSON column"""
+
+    @abstractmethod
+    async def create_schema(self) -> None:
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        ...
+
+
+def column_list(selected: str) -> str:
+    """Validate a PostgREST-style column list so it can be spliced into SQL"""
+    if selected == "*":
+        return selected
+    names = selected.split(",")
+    if not all(_COLUMN.match(name) for name in names):
+        raise ValueError(f"Invalid column list {selected!r}")
+    return ", ".join(names)
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+class SqlUserRepository:
+    def __init__(self, conn: SqlConnection):
+        self.conn = conn
+
+    async def get_by_username(self, username: str, columns: str = "*") -> Optional[Row]:
+        return await self.conn.fetchrow(f"SELECT {column_list(columns)} FROM users WHERE username = $1", username)
+
+    async def get_many_by_username(self, usernames: List[str], columns: str = "*") -> Dict[str, Row]:
+        """Users keyed by username, in one query"""
+        selected = column_list(columns)
+        if selected != "*" and "username" not in columns.split(","):
+            selected += ", username"
+        rows = await self.conn.fetch(
+            f"SELECT {selected} FROM users WHERE {self.conn.member('username', 1, 'text')}",
+            self.conn.array(usernames)
+        )
+        return {row["username"]: row for row in rows}
+
+    async def exists(self, username: str, email: str) -> bool:
+        """Check whether the username or email is already taken"""
+        row = await self.conn.fetchrow("SELECT 1 FROM users WHERE username = $1 OR email = $2 LIMIT 1", username, email)
+        return row is not None
+
+    async def create(self, username: str, email: str, hashed_password: str) -> Optional[Row]:
+        return await self.conn.fetchrow(
+            "INSERT INTO users (id, username, email, hashed_password) VALUES ($1, $2, $3, $4) RETURNING *",
+            new_id(), username, email, hashed_password
+        )
+
+    async def update_password(self, user_id: str, hashed_password: str) -> None:
+        await self.conn.execute("UPDATE users SET hashed_password = $2 WHERE id = $1", user_id, hashed_password)
+
+
+class SqlPortfolioRepository:
+    def __init__(self, conn: SqlConnection):
+        self.conn = conn
+
+    async def get_by_user_id(self, user_id: str) -> Optional[Row]:
+        return await self.conn.fetchrow(
+            "SELECT * FROM portfolios WHERE user_id = $1 ORDER BY created_at LIMIT 1", user_id
+        )
+
+    async def get_version(self, user_id: str) -> Optional[Row]:
+        """Only the id and version, enough to answer a conditional GET"""
+        return await self.conn.fetchrow(
+            "SELECT id, version FROM portfolios WHERE user_id = $1 ORDER BY created_at LIMIT 1", user_id
+        )
+
+    async def get_with_positions(self, user_id: str) -> Optional[Row]:
+        """Get the user's portfolio with its positions embedded"""
+        portfolios = await self.get_many_with_positions([user_id])
+        return portfolios.get(user_id)
+
+    async def get_many_with_positions(self, user_ids: List[str]) -> Dict[str, Row]:
+        """Portfolios with positions embedded, keyed by user id, in two queries"""
+        rows = await self.conn.fetch(
+            f"SELECT * FROM portfolios WHERE {self.conn.member('user_id', 1, 'uuid')} ORDER BY created_at",
+            self.conn.array(user_ids)
+        )
+        if not rows:
+            return {}
+        positions = await self.conn.fetch(
+            f"SELECT * FROM positions WHERE {self.conn.member('portfolio_id', 1, 'uuid')} ORDER BY created_at",
+            self.conn.array([row["id"] for row in rows])
+        )
+        by_portfolio: Dict[str, List[Row]] = {row["id"]: [] for row in rows}
+        for position in positions:
+            by_portfolio[position["portfolio_id"]].append(position)
+        portfolios: Dict[str, Row] = {}
+        for row in rows:
+            # Oldest portfolio first, matching the position functions
+            portfolios.setdefault(row["user_id"], {**row, "positions": by_portfolio[row["id"]]})
+        return portfolios
+
+    async def create(self, user_id: str, name: str) -> Optional[Row]:
+        return await self.conn.fetchrow(
+            "INSERT INTO portfolios (id, user_id, name) VALUES ($1, $2, $3) RETURNING *", new_id(), user_id, name
+        )
+
+
+class SqlWatchlistRepository:
+    """Watchlist reads and plain writes; each backend adds an atomic edit()"""
+
+    def __init__(self, conn: SqlConnection):
+        self.conn = conn
+
+    async def get_by_user_id(self, user_id: str) -> Optional[Row]:
+        return await self.conn.fetchrow(
+            "SELECT * FROM watchlists WHERE user_id = $1 ORDER BY created_at LIMIT 1", user_id
+        )
+
+    async def get_many_by_user_id(self, user_ids: List[str]) -> Dict[str, Row]:
+        """Watchlists keyed by user id, in one query"""
+        rows = await self.conn.fetch(
+            f"SELECT * FROM watchlists WHERE {self.conn.member('user_id', 1, 'uuid')} ORDER BY created_at",
+            self.conn.array(user_ids)
+        )
+        watchlists: Dict[str, Row] = {}
+        for row in rows:
+            watchlists.setdefault(row["user_id"], row)
+        return watchlists
+
+    async def get_version(self, user_id: str) -> Optional[Row]:
+        """Only the id and version, enough to answer a conditional GET"""
+        return await self.conn.fetchrow(
+            "SELECT id, version FROM watchlists WHERE user_id = $1 ORDER BY created_at LIMIT 1", user_id
+        )
+
+    async def create(self, user_id: str, tickers: List[str]) -> Optional[Row]:
+        return await self.conn.fetchrow(
+            "INSERT INTO watchlists (id, user_id, tickers) VALUES ($1, $2, $3) RETURNING *",
+            new_id(), user_id, self.conn.json(tickers)
+        )
+
+
+class SqlDatabase(Database):
+    """Repositories over a direct SQL connection, skipping the PostgREST hop"""
+
+    def __init__(self, conn: SqlConnection, positions: Any, watchlists: SqlWatchlistRepository, tickers: Any):
+        super().__init__(
+            None,
+            users=SqlUserRepository(conn),
+            portfolios=SqlPortfolioRepository(conn),
+            positions=positions,
+            watchlists=watchlists,
+            tickers=tickers
+        )
+        self.conn = conn
+
+    async def create_schema(self) -> None:
+        await self.conn.create_schema()
+
+    async def close(self) -> None:
+        await self.conn.close()
+
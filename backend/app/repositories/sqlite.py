@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from ..core.metrics import timed
+from .schema import SQLITE_SCHEMA
+from .sql import Row, SqlConnection, SqlDatabase, SqlWatchlistRepository, new_id
+
+# Columns stored as JSON text and decoded on the way out
+JSON_COLUMNS = ("tickers",)
+
+_PLACEHOLDER = re.compile(r"\$(\d+)")
+
+
+@lru_cache(maxsize=None)
+def _translate(sql: str) -> str:
+    # $1 -> ?1: SQLite's numbered parameters keep the repositories' SQL unchanged
+    return _PLACEHOLDER.sub(r"?\1", sql)
+
+
+class SqliteConnection(SqlConnection):
+    """Embedded SQLite file; one thread owns the connection and its prepared-statement cache"""
+
+    def __init__(self, path: str, statement_cache_size: int = 256):
+        self.path = path
+        self.statement_cache_size = statement_cache_size
+        # sqlite3 serializes writers anyway; a single thread avoids cross-thread connection use
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def fetch(self, sql: str, *args: Any) -> List[Row]:
+        return await self.run(lambda conn: [_row(r) for r in conn.execute(_translate(sql), args).fetchall()])
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn with the connection on the SQLite thread"""
+        loop = asyncio.get_running_loop()
+        with timed("db"):
+            return await loop.run_in_executor(self._executor, lambda: fn(self._connection()))
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn inside BEGIN IMMEDIATE ... COMMIT, rolling back if it raises"""
+        def run(conn: sqlite3.Connection) -> Any:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+        return await self.run(run)
+
+    def member(self, column: str, index: int, type: str) -> str:
+        # One JSON array parameter keeps the statement text, and so its cached statement, the same
+        return f"{column} IN (SELECT value FROM json_each(${index}))"
+
+    def array(self, values: List[Any]) -> Any:
+        return json.dumps(list(values))
+
+    def json(self, value: Any) -> Any:
+        return json.dumps(value)
+
+    async def create_schema(self) -> None:
+        def create(conn: sqlite3.Connection) -> None:
+            for sql in SQLITE_SCHEMA:
+                conn.execute(sql)
+
+        await self.run(create)
+
+    async def close(self) -> None:
+        def close(conn: sqlite3.Connection) -> None:
+            conn.close()
+            self._conn = None
+
+        if self._conn is not None:
+            await self.run(close)
+        self._executor.shutdown(wait=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit; multi-statement writes open their own transaction
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, cached_statements=self.statement_cache_size,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._conn = conn
+        return self._conn
+
+
+def _row(row: sqlite3.Row) -> Row:
+    item = dict(zip(row.keys(), row))
+    for column in JSON_COLUMNS:
+        if isinstance(item.get(column), str):
+            item[column] = json.loads(item[column])
+    return item
+
+
+def _portfolio_id(conn: sqlite3.Connection, user_id: str) -> Optional[str]:
+    row = conn.execute(
+        _translate("SELECT id FROM portfolios WHERE user_id = $1 ORDER BY created_at LIMIT 1"), (user_id,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+_UPSERT_POSITION = _translate("""
+    INSERT INTO positions (id, portfolio_id, ticker, shares) VALUES ($1, $2, $3, $4)
+    ON CONFLICT (portfolio_id, ticker) DO UPDATE SET shares = shares + excluded.shares
+    RETURNING *
+""")
+
+
+class SqlitePositionRepository:
+    """Position mutations as short transactions, standing in for the Postgres functions"""
+
+    def __init__(self, conn: SqliteConnection):
+        self.conn = conn
+
+    async def add(self, user_id: str, ticker: str, shares: int) -> Optional[Dict[str, Any]]:
+        """Atomically create a position or increment its shares; None if the user has no portfolio"""
+        def add(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            portfolio_id = _portfolio_id(conn, user_id)
+            if portfolio_id is None:
+                return None
+            return _row(conn.execute(_UPSERT_POSITION, (new_id(), portfolio_id, ticker, shares)).fetchone())
+
+        return await self.conn.transaction(add)
+
+    async def remove(self, user_id: str, ticker: str, shares: int) -> Optional[int]:
+        """Atomically reduce or delete a position; returns remaining shares, or None if not held"""
+        def remove(conn: sqlite3.Connection) -> Optional[int]:
+            portfolio_id = _portfolio_id(conn, user_id)
+            row = conn.execute(
+                _translate("SELECT id, shares FROM positions WHERE portfolio_id = $1 AND ticker = $2"),
+                (portfolio_id, ticker)
+            ).fetchone()
+            if row is None:
+                return None
+            if shares >= row["shares"]:
+                conn.execute(_translate("DELETE FROM positions WHERE id = $1"), (row["id"],))
+                return 0
+            conn.execute(_translate("UPDATE positions SET shares = shares - $2 WHERE id = $1"), (row["id"], shares))
+            return row["shares"] - shares
+
+        return await self.conn.transaction(remove)
+
+    async def import_many(self, user_id: str, positions: List[Dict[str, Any]]) -> int:
+        """Upsert a batch of {ticker, shares} rows in one transaction; returns positions touched"""
+        totals: Dict[str, int] = {}
+        for position in positions:
+            ticker = position["ticker"].upper()
+            totals[ticker] = totals.get(ticker, 0) + position["shares"]
+
+        def import_many(conn: sqlite3.Connection) -> int:
+            portfolio_id = _portfolio_id(conn, user_id)
+            if portfolio_id is None:
+                return 0
+            for ticker, shares in totals.items():
+                conn.execute(_UPSERT_POSITION, (new_id(), portfolio_id, ticker, shares)).fetchall()
+            return len(totals)
+
+        return await self.conn.transaction(import_many)
+
+
+class SqliteWatchlistRepository(SqlWatchlistRepository):
+    async def edit(self, user_id: str, add: List[str], remove: List[str]) -> Optional[Dict[str, Any]]:
+        """Atomically remove tickers, then append new ones; returns {tickers, added, removed, version},
+        or None if the user has no watchlist"""
+        def edit(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            row = conn.execute(
+                _translate("SELECT id, tickers, version FROM watchlists WHERE user_id = $1 ORDER BY created_at LIMIT 1"),
+                (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            current = json.loads(row["tickers"] or "[]")
+            dropped = set(remove)
+            kept = [t for t in current if t not in dropped]
+            removed = sorted(dropped.intersection(current))
+            added = [t for t in dict.fromkeys(add) if t not in kept]
+            if not added and not removed:
+                return {"tickers": current, "added": [], "removed": [], "version": row["version"]}
+            tickers = kept + added
+            conn.execute(_translate("UPDATE watchlists SET tickers = $2 WHERE id = $1"), (row["id"], json.dumps(tickers)))
+            # The version is bumped by an AFTER trigger, which RETURNING would not see
+            version = conn.execute(_translate("SELECT version FROM watchlists WHERE id = $1"), (row["id"],)).fetchone()[0]
+            return {"tickers": tickers, "added": added, "removed": removed, "version": version}
+
+        return await self.conn.transaction(edit)
+
+
+class SqliteTickerRepository:
+    def __init__(self, conn: SqliteConnection):
+        self.conn = conn
+
+    async def hot(self, limit: int) -> List[Dict[str, Any]]:
+        """Tickers held in portfolios or watchlists as [{ticker, holders}], most-held first"""
+        return await self.conn.fetch("""
+            SELECT held.ticker AS ticker, count(*) AS holders
+            FROM (
+                SELECT f.user_id, p.ticker
+                FROM positions p JOIN portfolios f ON f.id = p.portfolio_id
+                UNION
+                SELECT w.user_id, t.value
+                FROM watchlists w, json_each(w.tickers) t
+            ) held
+            GROUP BY held.ticker
+            ORDER BY holders DESC, held.ticker
+            LIMIT $1
+        """, limit)
+
+
+def sqlite_database(path: str, **options: Any) -> SqlDatabase:
+    """Database in an embedded SQLite file"""
+    conn = SqliteConnection(path, **options)
+    return SqlDatabase(
+        conn, SqlitePositionRepository(conn), SqliteWatchlistRepository(conn), SqliteTickerRepository(conn)
+    )
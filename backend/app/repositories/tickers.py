@@ -0,0 +1,11 @@
+from typing import Any, Dict, List
+from .client import PostgrestClient
+
+
+class TickerRepository:
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def hot(self, limit: int) -> List[Dict[str, Any]]:
+        """Tickers held in portfolios or watchlists as [{ticker, holders}], most-held first"""
+        return await self.client.rpc("hot_tickers", {"p_limit": limit}) or []
@@ -0,0 +1,39 @@
+from typing import Any, Dict, List, Optional
+from .client import PostgrestClient, quote
+
+
+class UserRepository:
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def get_by_username(self, username: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        rows = await self.client.select("users", {"select": columns, "username": f"eq.{username}"})
+        return rows[0] if rows else None
+
+    async def get_many_by_username(self, usernames: List[str], columns: str = "*") -> Dict[str, Dict[str, Any]]:
+        """Users keyed by username, in one in.(...) query"""
+        rows = await self.client.select("users", {
+            "select": columns if columns == "*" or "username" in columns.split(",") else f"{columns},username",
+            "username": f"in.({','.join(quote(u) for u in usernames)})"
+        })
+        return {row["username"]: row for row in rows}
+
+    async def exists(self, username: str, email: str) -> bool:
+        """Check whether the username or email is already taken"""
+        rows = await self.client.select("users", {
+            "select": "id",
+            "or": f"(username.eq.{quote(username)},email.eq.{quote(email)})",
+            "limit": 1
+        })
+        return bool(rows)
+
+    async def create(self, username: str, email: str, hashed_password: str) -> Optional[Dict[str, Any]]:
+        rows = await self.client.insert("users", {
+            "username": username,
+            "email": email,
+            "hashed_password": hashed_password
+        })
+        return rows[0] if rows else None
+
+    async def update_password(self, user_id: str, hashed_password: str) -> None:
+        await self.client.update("users", {"id": f"eq.{user_id}"}, {"hashed_password": hashed_password})
@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+from .client import PostgrestClient, quote
+
+
+class WatchlistRepository:
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def get_by_user_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self.client.select("watchlists", {
+            "select": "*",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.asc",
+            "limit": 1
+        })
+        return rows[0] if rows else None
+
+    async def get_many_by_user_id(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Watchlists keyed by user id, in one in.(...) query"""
+        rows = await self.client.select("watchlists", {
+            "select": "*",
+            "user_id": f"in.({','.join(quote(u) for u in user_ids)})",
+            "order": "created_at.asc"
+        })
+        # Oldest first, so a user with several keeps the one the SQL backends and RPCs use
+        found: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            found.setdefault(row["user_id"], row)
+        return found
+
+    async def get_version(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Only the id and version, enough to answer a conditional GET"""
+        rows = await self.client.select("watchlists", {
+            "select": "id,version",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.asc",
+            "limit": 1
+        })
+        return rows[0] if rows else None
+
+    async def create(self, user_id: str, tickers: List[str]) -> Optional[Dict[str, Any]]:
+        rows = await self.client.insert("watchlists", {"user_id": user_id, "tickers": tickers})
+        return rows[0] if rows else None
+
+    async def edit(self, user_id: str, add: List[str], remove: List[str]) -> Optional[Dict[str, Any]]:
+        """Atomically remove tickers, then append new ones; returns {tickers, added, removed, version},
+        or None if the user has no watchlist"""
+        rows = await self.client.rpc("edit_watchlist", {
+            "p_user_id": user_id,
+            "p_add": add,
+            "p_remove": remove
+        })
+        return rows[0] if rows else None
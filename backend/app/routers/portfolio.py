@@ -1,25 +1,71 @@
-from fastapi import APIRouter, Depends
-from ..models.portfolio import PositionAdd, PortfolioResponse
-from ..services.portfolio_service import PortfolioService
-from ..services.auth_service import AuthService
-from ..utils.dependencies import get_portfolio_service, get_auth_service
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from typing import Optional
+from ..core import config
+from ..core.etag import etag_matches, not_modified, set_etag
+from ..core.responses import FastJSONResponse, trusted_response
+from ..models.portfolio import PositionAdd, PortfolioResponse, ImportResult, PortfolioAnalytics, RiskRequest, PortfolioRisk
+from ..services.portfolio_service import PortfolioService, parse_positions_csv
+from ..utils.dependencies import get_portfolio_service, get_current_user
 
 router = APIRouter(prefix="/portfolio", tags=["portfolio"])
 
 
-@router.get("", response_model=PortfolioResponse)
+@router.get("", response_model=PortfolioResponse, response_class=FastJSONResponse)
 async def get_portfolio(
-    current_user: dict = Depends(lambda auth_service=Depends(get_auth_service): auth_service.get_current_user),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
     portfolio_service: PortfolioService = Depends(get_portfolio_service)
 ):
-    """Get user's portfolio with all positions"""
-    return await portfolio_service.get_portfolio(current_user["id"])
+    """Get user's portfolio with all positions; 304 if unchanged since the client's ETag"""
+    if if_none_match:
+        etag = await portfolio_service.get_portfolio_etag(current_user["id"])
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    portfolio, etag = await portfolio_service.get_portfolio_payload(current_user["id"])
+    set_etag(response, etag)
+    # Rows straight from the database; large portfolios skip per-position validation
+    return trusted_response(portfolio, response)
+
+
+@router.get("/analytics", response_model=PortfolioAnalytics)
+async def get_portfolio_analytics(
+    include_correlation: bool = False,
+    current_user: dict = Depends(get_current_user),
+    portfolio_service: PortfolioService = Depends(get_portfolio_service)
+):
+    """Get market value, weights, daily P&L, volatility, beta and (opt-in) the correlation matrix"""
+    return await portfolio_service.get_analytics(current_user["id"], include_correlation)
+
+
+@router.get("/risk", response_model=PortfolioRisk)
+async def get_portfolio_risk(
+    paths: int = Query(config.RISK_DEFAULT_PATHS, ge=100, le=config.RISK_MAX_PATHS),
+    confidence: float = Query(0.95, ge=0.5, lt=1),
+    seed: Optional[int] = None,
+    current_user: dict = Depends(get_current_user),
+    portfolio_service: PortfolioService = Depends(get_portfolio_service)
+):
+    """1-day and 10-day Monte Carlo VaR and CVaR from the positions' historical covariance"""
+    request = RiskRequest(paths=paths, confidence=confidence, seed=seed)
+    return await portfolio_service.get_risk(current_user["id"], request)
+
+
+@router.post("/risk/what-if", response_model=PortfolioRisk)
+async def simulate_portfolio_trades(
+    request: RiskRequest,
+    current_user: dict = Depends(get_current_user),
+    portfolio_service: PortfolioService = Depends(get_portfolio_service)
+):
+    """VaR and CVaR before and after hypothetical trades, all valued on the same simulated paths"""
+    return await portfolio_service.get_risk(current_user["id"], request)
 
 
 @router.post("/add")
 async def add_position(
     position_data: PositionAdd,
-    current_user: dict = Depends(lambda auth_service=Depends(get_auth_service): auth_service.get_current_user),
+    current_user: dict = Depends(get_current_user),
     portfolio_service: PortfolioService = Depends(get_portfolio_service)
 ):
     """Add or update a position in portfolio"""
@@ -29,8 +75,32 @@ async def add_position(
 @router.post("/remove")
 async def remove_position(
     position_data: PositionAdd,
-    current_user: dict = Depends(lambda auth_service=Depends(get_auth_service): auth_service.get_current_user),
+    current_user: dict = Depends(get_current_user),
     portfolio_service: PortfolioService = Depends(get_portfolio_service)
 ):
     """Remove or reduce a position in portfolio"""
     return await portfolio_service.remove_position(current_user["id"], position_data)
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_positions(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    portfolio_service: PortfolioService = Depends(get_portfolio_service)
+):
+    """Bulk add positions from a JSON body or a CSV export (Content-Type: text/csv)"""
+    try:
+        body = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 encoded")
+    if "csv" in request.headers.get("content-type", ""):
+        rows = parse_positions_csv(body)
+    else:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Body must be JSON or CSV")
+        rows = payload.get("positions") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise HTTPException(status_code=422, detail="Expected a list of {ticker, shares} objects")
+    return await portfolio_service.import_positions(current_user["id"], rows)
@@ -1,16 +1,157 @@
-from fastapi import APIRouter, Depends
-from ..models.stock import StockInfo
-from ..services.stock_service import StockService
-from ..services.auth_service import AuthService
-from ..utils.dependencies import get_auth_service
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from datetime import date, timedelta
+from typing import List, Literal, Optional
+from ..core import config
+from ..core.etag import content_etag, etag_matches, not_modified, set_etag, version_etag
+from ..core.responses import trusted_response
+from ..models.stock import StockInfo, StockBatchResponse, ScreenResponse, SymbolMatch, PriceHistory, PriceSeries
+from ..services.stock_provider import StockDataProvider
+from ..services.screener import Screener, parse_filter
+from ..services.symbol_index import SymbolIndex
+from ..utils.dependencies import get_current_user, get_screener, get_stock_provider, get_symbol_index
 
 router = APIRouter(prefix="/research", tags=["stock research"])
 
 
+@router.get("", response_model=StockBatchResponse)
+async def get_stock_research_batch(
+    tickers: str = Query(..., description="Comma-separated list of tickers"),
+    current_user: dict = Depends(get_current_user),
+    stock_provider: StockDataProvider = Depends(get_stock_provider)
+):
+    """Get stock information for several tickers at once"""
+    symbols = [t for t in tickers.split(",") if t.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No tickers provided")
+    if len(symbols) > config.QUOTE_BATCH_MAX_TICKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.QUOTE_BATCH_MAX_TICKERS} tickers per request"
+        )
+    return await stock_provider.get_many(symbols)
+
+
+@router.get("/search", response_model=List[SymbolMatch])
+async def search_symbols(
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user),
+    symbol_index: SymbolIndex = Depends(get_symbol_index)
+):
+    """Autocomplete tickers and company names from the local symbol index"""
+    return symbol_index.search(q, limit)
+
+
+@router.get("/screen", response_model=ScreenResponse)
+async def screen_stocks(
+    filter: List[str] = Query([], description="Numeric conditions such as pe_ratio<20 or market_cap>=10B"),
+    sector: List[str] = Query([]),
+    industry: List[str] = Query([]),
+    country: List[str] = Query([]),
+    exchange: List[str] = Query([]),
+    currency: List[str] = Query([]),
+    is_etf: Optional[bool] = None,
+    sort: str = Query("-market_cap", description="Numeric field, prefixed with - for descending"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+    screener: Screener = Depends(get_screener)
+):
+    """Filter and rank every symbol with cached fundamentals; unknown values never match"""
+    categories = {
+        field: values
+        for field, values in (
+            ("sector", sector), ("industry", industry), ("country", country),
+            ("exchange", exchange), ("currency", currency)
+        )
+        if values
+    }
+    return screener.screen(
+        [parse_filter(expression) for expression in filter],
+        categories,
+        is_etf=is_etf,
+        sort=sort.lstrip("-+"),
+        descending=sort.startswith("-"),
+        limit=limit
+    )
+
+
 @router.get("/{ticker}", response_model=StockInfo)
 async def get_stock_research(
     ticker: str,
-    current_user: dict = Depends(lambda auth_service=Depends(get_auth_service): auth_service.get_current_user)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+    stock_provider: StockDataProvider = Depends(get_stock_provider)
+):
+    """Get comprehensive stock information; 304 if the quote has not changed"""
+    version = stock_provider.data_version(ticker)
+    info = await stock_provider.get_stock_info(ticker)
+    # Tag by when the cached quote last changed, so a matching ETag costs no hashing, validation
+    # or encoding; if the cache was written while we read it, fall back to hashing the payload
+    if version is not None and version == stock_provider.data_version(ticker):
+        etag = version_etag({"id": ticker.upper() + (".stale" if info.get("stale") else ""), "version": version})
+    else:
+        etag = content_etag(info)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    # Upstream payloads are not shaped by our code, so they keep response_model validation
+    return info
+
+
+@router.get("/{ticker}/history", response_model=PriceHistory)
+async def get_stock_history(
+    ticker: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: Literal["1d", "1wk", "1mo"] = "1d",
+    current_user: dict = Depends(get_current_user),
+    stock_provider: StockDataProvider = Depends(get_stock_provider)
+):
+    """Get OHLCV price history, defaulting to the last year"""
+    if start is None:
+        start = (end or date.today()) - timedelta(days=365)
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    columns = await stock_provider.get_history(ticker, start, end, interval)
+    return trusted_response({
+        "ticker": ticker.upper(),
+        "interval": interval,
+        "bars": [
+            {
+                "date": bar_date,
+                "open": bar_open,
+                "high": bar_high,
+                "low": bar_low,
+                "close": bar_close,
+                "volume": bar_volume
+            }
+            for bar_date, bar_open, bar_high, bar_low, bar_close, bar_volume in zip(
+                columns["date"].tolist(),
+                columns["open"].tolist(),
+                columns["high"].tolist(),
+                columns["low"].tolist(),
+                columns["close"].tolist(),
+                columns["volume"].tolist()
+            )
+        ]
+    })
+
+
+@router.get("/{ticker}/series", response_model=PriceSeries)
+async def get_stock_series(
+    ticker: str,
+    response: Response,
+    period: Literal["1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max"] = Query("1y", alias="range"),
+    points: int = Query(config.SERIES_DEFAULT_POINTS, ge=10, le=config.SERIES_MAX_POINTS),
+    method: Literal["lttb", "ohlc"] = Query("lttb", description="lttb for a close line, ohlc for candlestick buckets"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+    stock_provider: StockDataProvider = Depends(get_stock_provider)
 ):
-    """Get comprehensive stock information"""
-    return StockService.get_stock_info(ticker)
+    """Daily closes downsampled for a chart of about `points` pixels; 304 if unchanged"""
+    series, etag = await stock_provider.get_series(ticker, period, points, method)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return trusted_response(series, response)
@@ -1,25 +1,76 @@
-from fastapi import APIRouter, Depends
-from ..models.watchlist import TickerAdd, WatchlistResponse
+import json
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from ..core import config
+from ..core.etag import etag_matches, not_modified, set_etag
+from ..core.responses import FastJSONResponse
+from ..models.watchlist import TickerAdd, WatchlistBatch, WatchlistBatchResult, WatchlistResponse
+from ..services.quote_stream import QuoteBroadcaster
 from ..services.watchlist_service import WatchlistService
-from ..services.auth_service import AuthService
-from ..utils.dependencies import get_watchlist_service, get_auth_service
+from ..utils.dependencies import get_watchlist_service, get_quote_broadcaster, get_current_user
 
 router = APIRouter(prefix="/watchlist", tags=["watchlist"])
 
 
-@router.get("", response_model=WatchlistResponse)
+@router.get("", response_model=WatchlistResponse, response_class=FastJSONResponse)
 async def get_watchlist(
-    current_user: dict = Depends(lambda auth_service=Depends(get_auth_service): auth_service.get_current_user),
+    response: Response,
+    include: Optional[Literal["quotes"]] = Query(None, description="quotes: add price, change and volume per ticker"),
+    deadline: float = Query(
+        config.WATCHLIST_QUOTE_DEADLINE_SECONDS, gt=0, le=config.STOCK_FETCH_TIMEOUT_SECONDS,
+        description="Seconds to wait for quotes; later ones come back flagged pending"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
     watchlist_service: WatchlistService = Depends(get_watchlist_service)
 ):
-    """Get user's watchlist"""
-    return await watchlist_service.get_watchlist(current_user["id"])
+    """Get user's watchlist; 304 if it has not changed since the client's ETag"""
+    if include == "quotes":
+        # Quotes move without the watchlist changing, so its version cannot validate them
+        return await watchlist_service.get_watchlist_with_quotes(current_user["id"], deadline)
+    if if_none_match:
+        etag = await watchlist_service.get_watchlist_etag(current_user["id"])
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    watchlist, etag = await watchlist_service.get_watchlist_with_etag(current_user["id"])
+    set_etag(response, etag)
+    return watchlist
+
+
+@router.get("/stream")
+async def stream_watchlist_quotes(
+    current_user: dict = Depends(get_current_user),
+    watchlist_service: WatchlistService = Depends(get_watchlist_service),
+    broadcaster: QuoteBroadcaster = Depends(get_quote_broadcaster)
+):
+    """Server-sent events with quotes for the watchlist's tickers, pushed as they change"""
+    watchlist = await watchlist_service.get_watchlist(current_user["id"])
+    subscription = broadcaster.subscribe(watchlist.tickers)
+
+    async def events():
+        try:
+            while True:
+                quotes = await subscription.next(config.QUOTE_STREAM_HEARTBEAT_SECONDS)
+                if quotes is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: quotes\ndata: {json.dumps(quotes)}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/add")
 async def add_to_watchlist(
     ticker_data: TickerAdd,
-    current_user: dict = Depends(lambda auth_service=Depends(get_auth_service): auth_service.get_current_user),
+    current_user: dict = Depends(get_current_user),
     watchlist_service: WatchlistService = Depends(get_watchlist_service)
 ):
     """Add a ticker to watchlist"""
@@ -29,8 +80,18 @@ async def add_to_watchlist(
 @router.post("/remove")
 async def remove_from_watchlist(
     ticker_data: TickerAdd,
-    current_user: dict = Depends(lambda auth_service=Depends(get_auth_service): auth_service.get_current_user),
+    current_user: dict = Depends(get_current_user),
     watchlist_service: WatchlistService = Depends(get_watchlist_service)
 ):
     """Remove a ticker from watchlist"""
     return await watchlist_service.remove_ticker(current_user["id"], ticker_data)
+
+
+@router.post("/batch", response_model=WatchlistBatchResult)
+async def edit_watchlist(
+    batch: WatchlistBatch,
+    current_user: dict = Depends(get_current_user),
+    watchlist_service: WatchlistService = Depends(get_watchlist_service)
+):
+    """Remove, then add, many tickers in one atomic update, skipping ones already present"""
+    return await watchlist_service.edit_tickers(current_user["id"], batch)
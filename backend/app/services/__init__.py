@@ -1,11 +1,13 @@
 from .auth_service import AuthService
 from .stock_service import StockService
+from .stock_provider import StockDataProvider
 from .portfolio_service import PortfolioService
 from .watchlist_service import WatchlistService
 
 __all__ = [
     "AuthService",
-    "StockService", 
+    "StockService",
+    "StockDataProvider",
     "PortfolioService",
     "WatchlistService"
 ]
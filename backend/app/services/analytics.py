@@ -0,0 +1,144 @@
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+TRADING_DAYS = 252
+
+
+def align_closes(histories: Dict[str, Dict[str, np.ndarray]], tickers: List[str], calendar: np.ndarray) -> np.ndarray:
+    """Closes as a (dates x tickers) matrix on a shared calendar, NaN where a ticker has no bar"""
+    prices = np.full((len(calendar), len(tickers)), np.nan)
+    for column, ticker in enumerate(tickers):
+        history = histories.get(ticker)
+        if history is None or not len(history["date"]):
+            continue
+        dates = history["date"]
+        rows = np.searchsorted(dates, calendar)
+        rows = np.minimum(rows, len(dates) - 1)
+        hit = dates[rows] == calendar
+        prices[hit, column] = history["close"][rows[hit]]
+    return prices
+
+
+def forward_fill(prices: np.ndarray) -> np.ndarray:
+    """Carry the last seen price forward down each column (holidays, halts)"""
+    rows = np.where(np.isnan(prices), 0, np.arange(len(prices))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = prices[rows, np.arange(prices.shape[1])]
+    return filled
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """Period returns; a ticker contributes 0 where it has no price yet"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = prices[1:] / prices[:-1] - 1
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def portfolio_metrics(
+    returns: np.ndarray,
+    benchmark: Optional[np.ndarray],
+    weights: np.ndarray,
+    include_correlation: bool = True
+) -> Dict[str, object]:
+    """Volatility, beta and correlation over aligned daily returns (dates x tickers)"""
+    n_obs = len(returns)
+    result: Dict[str, object] = {
+        "volatility": None,
+        "beta": None,
+        "position_volatility": np.full(returns.shape[1], np.nan),
+        "position_beta": np.full(returns.shape[1], np.nan),
+        "correlation": None,
+    }
+    if n_obs < 2:
+        return result
+
+    portfolio = returns @ weights
+    result["volatility"] = float(portfolio.std(ddof=1) * np.sqrt(TRADING_DAYS))
+    result["position_volatility"] = returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+
+    if benchmark is not None:
+        centered_benchmark = benchmark - benchmark.mean()
+        variance = centered_benchmark @ centered_benchmark / (n_obs - 1)
+        if variance > 0:
+            centered = returns - returns.mean(axis=0)
+            result["position_beta"] = centered.T @ centered_benchmark / (n_obs - 1) / variance
+            result["beta"] = float(result["position_beta"] @ weights)
+
+    if include_correlation:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["correlation"] = np.corrcoef(returns, rowvar=False).reshape(returns.shape[1], returns.shape[1])
+    return result
+
+
+def to_json_list(values: np.ndarray) -> List[Optional[float]]:
+    """Floats for a JSON response; NaN/inf are not valid JSON so they become null"""
+    return [v if v == v and v not in (np.inf, -np.inf) else None for v in np.asarray(values, dtype=np.float64).tolist()]
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Daily log returns; a ticker contributes 0 where it has no price yet"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.log(prices[1:] / prices[:-1])
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def covariance_factor(returns: np.ndarray) -> np.ndarray:
+    """Matrix L with L @ L.T equal to the sample covariance of returns (dates x tickers)
+
+    With fewer observations than tickers the covariance is singular, so the centered
+    returns themselves serve as the (tickers x dates) factor; otherwise it is the
+    Cholesky factor, with a small ridge if rounding leaves the matrix not quite positive definite.
+    """
+    n_obs, n_tickers = returns.shape
+    centered = (returns - returns.mean(axis=0)) / np.sqrt(max(n_obs - 1, 1))
+    if n_obs - 1 < n_tickers:
+        return np.ascontiguousarray(centered.T)
+    covariance = centered.T @ centered
+    ridge = 1e-12 * max(float(np.trace(covariance)) / n_tickers, 1e-12)
+    for _ in range(8):
+        try:
+            return np.linalg.cholesky(covariance + ridge * np.eye(n_tickers))
+        except np.linalg.LinAlgError:
+            ridge *= 100
+    return np.ascontiguousarray(centered.T)
+
+
+def simulate_pnl(
+    factor: np.ndarray,
+    values: np.ndarray,
+    horizons: List[int],
+    paths: int,
+    rng: np.random.Generator,
+    budget: float,
+    chunk_size: int = 2048
+) -> np.ndarray:
+    """Simulated P&L as a (paths x variants x horizons) array for position values (tickers x variants)
+
+    Log returns are drawn as N(0, h * covariance), so one draw per path covers every horizon
+    by scaling, and every variant is revalued on the same draws. Chunks stop once the time
+    budget is spent, so fewer than `paths` rows may come back.
+    """
+    started = time.perf_counter()
+    scales = np.sqrt(np.asarray(horizons, dtype=np.float64))
+    chunks = []
+    done = 0
+    while done < paths:
+        size = min(chunk_size, paths - done)
+        shocks = rng.standard_normal((size, factor.shape[1])) @ factor.T
+        # (paths, tickers) returns per horizon, revalued against every variant in one matmul
+        pnl = np.stack([np.expm1(shocks * scale) @ values for scale in scales], axis=-1)
+        chunks.append(pnl)
+        done += size
+        if time.perf_counter() - started > budget:
+            break
+    return np.concatenate(chunks)
+
+
+def value_at_risk(pnl: np.ndarray, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    """VaR and CVaR (expected shortfall) as positive losses along the first axis of pnl"""
+    cutoff = np.quantile(pnl, 1 - confidence, axis=0)
+    # The sample minimum is always at or below the quantile, so no tail is empty
+    tail = pnl <= cutoff
+    shortfall = np.where(tail, pnl, 0.0).sum(axis=0) / tail.sum(axis=0)
+    return -cutoff, -shortfall
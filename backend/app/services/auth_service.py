@@ -3,26 +3,91 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 import jwt
 import bcrypt
+import asyncio
 import os
-from supabase import Client
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from ..core import config
+from ..core.cache import TTLCache
+from ..core.executor import BoundedExecutor, ExecutorSaturated
+from ..core.metrics import timed
 from ..models.auth import UserCreate, UserLogin, Token
+from ..repositories.database import Database
+from ..repositories.loader import RequestLoader
 
 security = HTTPBearer()
 
+# Only what routes need from the user row; never the password hash
+PRINCIPAL_FIELDS = ("id", "username", "email")
+
+
+# Module-level so they can be shipped to a process pool
+def _hashpw(password: str, rounds: int) -> Tuple[str, float]:
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    return hashed, time.perf_counter() - start
+
+
+def _checkpw(password: str, hashed_password: str) -> Tuple[bool, float]:
+    start = time.perf_counter()
+    ok = bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return ok, time.perf_counter() - start
+
+
+def bcrypt_rounds(hashed_password: str) -> Optional[int]:
+    """Read the cost factor out of a bcrypt hash such as $2b$12$..."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
 class AuthService:
-    def __init__(self, supabase_client: Client):
-        self.supabase = supabase_client
+    # Resolved users shared across requests, keyed by token subject
+    _principal_cache = TTLCache(config.AUTH_CACHE_MAX_SIZE, config.AUTH_CACHE_TTL_SECONDS)
+    _hash_stats_lock = threading.Lock()
+    _hash_stats = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+
+    def __init__(self, db: Database, hash_executor: BoundedExecutor, loader: RequestLoader):
+        self.db = db
+        self.hash_executor = hash_executor
+        self.loader = loader
         self.secret_key = os.getenv("SECRET_KEY")
         self.algorithm = "HS256"
         self.access_token_expire_minutes = 30
+        self.bcrypt_rounds = config.BCRYPT_ROUNDS
+
+    async def hash_password(self, password: str) -> str:
+        """Hash a password using bcrypt on the hashing pool"""
+        return await self._run_hash(_hashpw, password, self.bcrypt_rounds)
+
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash on the hashing pool"""
+        return await self._run_hash(_checkpw, password, hashed_password)
 
-    def hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    async def _run_hash(self, fn, *args: Any) -> Any:
+        # Shed load early instead of letting bcrypt latency pile up
+        try:
+            with timed("hash"):
+                result, elapsed = await self.hash_executor.run(
+                    fn, *args, timeout=config.PASSWORD_HASH_TIMEOUT_SECONDS
+                )
+        except (ExecutorSaturated, asyncio.TimeoutError):
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication is busy, try again shortly",
+                headers={"Retry-After": "1"}
+            )
+        self._record_hash_time(elapsed)
+        return result
 
-    def verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    @classmethod
+    def _record_hash_time(cls, elapsed: float) -> None:
+        with cls._hash_stats_lock:
+            cls._hash_stats["count"] += 1
+            cls._hash_stats["total_seconds"] += elapsed
+            cls._hash_stats["max_seconds"] = max(cls._hash_stats["max_seconds"], elapsed)
 
     def create_access_token(self, data: dict) -> str:
         """Create a JWT access token"""
@@ -35,37 +100,24 @@ class AuthService:
     async def register_user(self, user_data: UserCreate) -> Token:
         """Register a new user"""
         # Check if user exists
-        existing_user = self.supabase.table("users").select("*").or_(
-            f"username.eq.{user_data.username},email.eq.{user_data.email}"
-        ).execute()
-        
-        if existing_user.data:
+        if await self.db.users.exists(user_data.username, user_data.email):
             raise HTTPException(status_code=400, detail="Username or email already registered")
         
         # Create user
-        hashed_pw = self.hash_password(user_data.password)
-        user_response = self.supabase.table("users").insert({
-            "username": user_data.username,
-            "email": user_data.email,
-            "hashed_password": hashed_pw
-        }).execute()
+        hashed_pw = await self.hash_password(user_data.password)
+        user = await self.db.users.create(user_data.username, user_data.email, hashed_pw)
         
-        if not user_response.data:
+        if not user:
             raise HTTPException(status_code=400, detail="Failed to create user")
         
-        user_id = user_response.data[0]["id"]
+        user_id = user["id"]
+        self.invalidate_user(user_data.username)
         
         # Create default portfolio
-        self.supabase.table("portfolios").insert({
-            "user_id": user_id,
-            "name": "Default Portfolio"
-        }).execute()
+        await self.db.portfolios.create(user_id, "Default Portfolio")
         
         # Create default watchlist
-        self.supabase.table("watchlists").insert({
-            "user_id": user_id,
-            "tickers": []
-        }).execute()
+        await self.db.watchlists.create(user_id, [])
         
         # Create access token
         access_token = self.create_access_token(data={"sub": user_data.username})
@@ -73,32 +125,79 @@ class AuthService:
 
     async def login_user(self, user_data: UserLogin) -> Token:
         """Authenticate and login a user"""
-        user_response = self.supabase.table("users").select("*").eq("username", user_data.username).execute()
+        user = await self.db.users.get_by_username(user_data.username)
         
-        if not user_response.data:
+        if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
-        user = user_response.data[0]
-        if not self.verify_password(user_data.password, user["hashed_password"]):
+        if not await self.verify_password(user_data.password, user["hashed_password"]):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
+        # Upgrade the stored hash when the configured cost has changed
+        if bcrypt_rounds(user["hashed_password"]) != self.bcrypt_rounds:
+            await self._rehash_password(user["id"], user_data.password)
+        
         access_token = self.create_access_token(data={"sub": user["username"]})
         return Token(access_token=access_token, token_type="bearer")
 
-    def get_current_user(self, credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    async def get_current_user(self, credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
         """Get current authenticated user from JWT token"""
         try:
             token = credentials.credentials
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            with timed("jwt"):
+                payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             username: str = payload.get("sub")
             if username is None:
                 raise HTTPException(status_code=401, detail="Invalid token")
         except jwt.PyJWTError:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        # Query user from Supabase
-        response = self.supabase.table("users").select("*").eq("username", username).execute()
-        if not response.data:
+        principal = self._principal_cache.get(username)
+        if principal is not None:
+            return dict(principal)
+        
+        user = await self.loader.users.load(username)
+        if not user:
             raise HTTPException(status_code=401, detail="User not found")
         
-        return response.data[0]
+        principal = {field: user[field] for field in PRINCIPAL_FIELDS}
+        self._cache_principal(username, principal, payload.get("exp"))
+        return dict(principal)
+
+    async def _rehash_password(self, user_id: str, password: str) -> None:
+        try:
+            hashed_pw = await self.hash_password(password)
+        except HTTPException:
+            # Not worth failing a valid login over; try again next time
+            return
+        await self.db.users.update_password(user_id, hashed_pw)
+
+    @classmethod
+    def _cache_principal(cls, username: str, principal: Dict[str, Any], exp: Any) -> None:
+        # Never keep a principal around longer than the token that resolved it
+        ttl = config.AUTH_CACHE_TTL_SECONDS
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+        if ttl > 0:
+            cls._principal_cache.set(username, principal, ttl)
+
+    @classmethod
+    def invalidate_user(cls, username: str) -> None:
+        """Drop a cached principal; call whenever a user row changes or is deleted"""
+        cls._principal_cache.delete(username)
+
+    @classmethod
+    def clear_user_cache(cls) -> None:
+        cls._principal_cache.clear()
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        return cls._principal_cache.stats()
+
+    @classmethod
+    def hash_stats(cls) -> Dict[str, Any]:
+        """Time spent inside bcrypt, excluding time queued for a worker"""
+        with cls._hash_stats_lock:
+            stats = dict(cls._hash_stats)
+        stats["avg_seconds"] = stats["total_seconds"] / stats["count"] if stats["count"] else 0.0
+        return stats
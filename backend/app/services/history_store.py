@@ -0,0 +1,200 @@
+import logging
+import os
+import re
+import shutil
+import time
+import numpy as np
+import yfinance as yf
+from datetime import date
+from fastapi import HTTPException
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.cache import TTLCache, SingleFlight
+from ..core.etag import content_etag
+from ..core.resilience import UpstreamUnavailable
+from .series import aggregate, build_series
+from .upstream import market_data, unavailable
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+INTERVALS = {"1d": None, "1wk": "W", "1mo": "M"}
+
+# Symbols become directory names, so keep them to characters Yahoo actually uses
+_SAFE_SYMBOL = re.compile(r"^[A-Z0-9^][A-Z0-9.\-=^]{0,19}$")
+
+# Relative change in the overlapping bar that means Yahoo re-adjusted past prices
+_REBASE_TOLERANCE = 1e-3
+
+Columns = Dict[str, np.ndarray]
+
+
+def _frame_to_columns(hist) -> Columns:
+    hist = hist.dropna(subset=["Close"])
+    return {
+        "date": np.asarray(hist.index.strftime("%Y-%m-%d"), dtype="datetime64[D]"),
+        "open": hist["Open"].to_numpy(dtype=np.float64),
+        "high": hist["High"].to_numpy(dtype=np.float64),
+        "low": hist["Low"].to_numpy(dtype=np.float64),
+        "close": hist["Close"].to_numpy(dtype=np.float64),
+        "volume": hist["Volume"].fillna(0).to_numpy(dtype=np.int64),
+    }
+
+
+def slice_range(columns: Columns, start: Optional[date], end: Optional[date]) -> Columns:
+    """Rows with start <= date <= end, as views into the mapped columns"""
+    dates = columns["date"]
+    lo = np.searchsorted(dates, np.datetime64(start, "D")) if start else 0
+    hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right") if end else len(dates)
+    return {name: values[lo:hi] for name, values in columns.items()}
+
+
+def resample(columns: Columns, interval: str) -> Columns:
+    """Aggregate daily bars into weekly or monthly bars"""
+    unit = INTERVALS[interval]
+    if unit is None or not len(columns["date"]):
+        return columns
+    dates = columns["date"]
+    if unit == "W":
+        # numpy weeks start on Thursday (the epoch's weekday); shift so they start on Monday
+        dates = dates + np.timedelta64(3, "D")
+    keys = dates.astype(f"datetime64[{unit}]")
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+    return aggregate(columns, starts)
+
+
+class HistoryStore:
+    """Daily OHLCV per ticker kept on local disk as memory-mapped column files"""
+
+    def __init__(self, root: str, refresh_seconds: float, initial_period: str, max_open: int, max_series: int = 2048):
+        self.root = root
+        self.refresh_seconds = refresh_seconds
+        self.initial_period = initial_period
+        # Expiry doubles as "time to ask upstream for new bars"
+        self._open = TTLCache(max_open, refresh_seconds)
+        self._flight = SingleFlight()
+        # Downsampled chart series, valid for as long as the columns they came from are current
+        self._series = TTLCache(max_series, refresh_seconds)
+
+    def get(self, ticker: str) -> Columns:
+        """All stored daily bars for a ticker, fetching only the missing tail from upstream"""
+        symbol = ticker.upper()
+        if not _SAFE_SYMBOL.match(symbol):
+            raise HTTPException(status_code=404, detail=f"No price history for {ticker}")
+        columns = self._open.get(symbol)
+        if columns is not None:
+            return columns
+        return self._flight.do(symbol, lambda: self._load(symbol))
+
+    def get_range(self, ticker: str, start: Optional[date], end: Optional[date], interval: str = "1d") -> Columns:
+        return resample(slice_range(self.get(ticker), start, end), interval)
+
+    def get_series(self, ticker: str, period: str, points: int, method: str) -> Tuple[Dict[str, Any], str]:
+        """Chart series for a range downsampled to about points values, and its ETag"""
+        columns = self.get(ticker)
+        key = (ticker.upper(), period, points, method)
+        cached = self._series.get(key)
+        # Refreshing a ticker maps new column arrays, which retires every series built from the old ones
+        if cached is not None and cached[0] is columns["date"]:
+            return cached[1], cached[2]
+        series = build_series(ticker.upper(), columns, period, points, method)
+        etag = content_etag(series)
+        self._series.set(key, (columns["date"], series, etag))
+        return series, etag
+
+    def series_stats(self) -> Dict[str, Any]:
+        return self._series.stats()
+
+    def get_many(self, tickers: List[str], start: Optional[date] = None) -> Tuple[Dict[str, Columns], Dict[str, str]]:
+        """Bars since start for several tickers, with per-ticker errors instead of failing"""
+        found: Dict[str, Columns] = {}
+        errors: Dict[str, str] = {}
+        for ticker in dict.fromkeys(t.upper() for t in tickers):
+            try:
+                found[ticker] = slice_range(self.get(ticker), start, None)
+            except HTTPException as e:
+                errors[ticker] = e.detail
+        return found, errors
+
+    def _load(self, symbol: str) -> Columns:
+        columns = self._read(symbol)
+        if columns is None or self._age(symbol) >= self.refresh_seconds:
+            try:
+                columns = self._update(symbol, columns)
+            except UpstreamUnavailable as e:
+                if columns is None:
+                    raise unavailable(e.retry_after)
+            except Exception as e:
+                # Serve what we have on disk if upstream is unavailable
+                logger.warning("History refresh for %s failed: %s", symbol, e)
+
+        if columns is None or not len(columns["date"]):
+            raise HTTPException(status_code=404, detail=f"No price history for {symbol}")
+        self._open.set(symbol, columns)
+        return columns
+
+    def _update(self, symbol: str, columns: Optional[Columns]) -> Optional[Columns]:
+        stock = yf.Ticker(symbol)
+        if columns is None or not len(columns["date"]):
+            fresh = _frame_to_columns(market_data.call(stock.history, period=self.initial_period, interval="1d"))
+            merged = fresh
+        else:
+            # Re-request the last stored bar: it may have been partial, and it tells us
+            # whether upstream has re-adjusted older prices for a split or dividend
+            last = columns["date"][-1]
+            fresh = _frame_to_columns(market_data.call(stock.history, start=str(last), interval="1d"))
+            if not len(fresh["date"]):
+                self._touch(symbol)
+                return columns
+            if fresh["date"][0] == last and abs(fresh["close"][0] / columns["close"][-1] - 1) > _REBASE_TOLERANCE:
+                fresh = _frame_to_columns(market_data.call(stock.history, period=self.initial_period, interval="1d"))
+                merged = fresh
+            else:
+                keep = columns["date"] < fresh["date"][0]
+                merged = {name: np.concatenate((columns[name][keep], fresh[name])) for name in COLUMNS}
+
+        if not len(merged["date"]):
+            return columns
+        self._write(symbol, merged)
+        return self._read(symbol)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol)
+
+    def _read(self, symbol: str) -> Optional[Columns]:
+        path = self._path(symbol)
+        try:
+            # Plain ndarray views over the mapping slice much faster than np.memmap objects
+            return {
+                name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+                for name in COLUMNS
+            }
+        except FileNotFoundError:
+            return None
+
+    def _age(self, symbol: str) -> float:
+        try:
+            return time.time() - os.stat(self._path(symbol)).st_mtime
+        except FileNotFoundError:
+            return float("inf")
+
+    def _touch(self, symbol: str) -> None:
+        os.utime(os.path.realpath(self._path(symbol)))
+
+    def _write(self, symbol: str, columns: Columns) -> None:
+        # Columns go into a fresh versioned directory and a symlink is swapped onto it,
+        # so readers in other workers never see a mix of old and new column files
+        os.makedirs(self.root, exist_ok=True)
+        link = self._path(symbol)
+        version = f"{symbol}@{time.time_ns()}"
+        target = os.path.join(self.root, version)
+        os.makedirs(target)
+        for name in COLUMNS:
+            np.save(os.path.join(target, f"{name}.npy"), np.ascontiguousarray(columns[name]))
+
+        previous = os.path.realpath(link) if os.path.islink(link) else None
+        tmp_link = f"{link}.{os.getpid()}.tmp"
+        os.symlink(version, tmp_link)
+        os.replace(tmp_link, link)
+        # Open memory maps keep the old files alive until they are released
+        if previous and os.path.isdir(previous):
+            shutil.rmtree(previous, ignore_errors=True)
@@ -1,30 +1,71 @@
+import asyncio
+import csv
+import io
+import math
+import re
+import numpy as np
+from datetime import date, timedelta
 from fastapi import HTTPException
-from supabase import Client
-from ..models.portfolio import PositionAdd, PortfolioResponse
-from .stock_service import StockService
+from typing import Any, Dict, List, Tuple
+from ..core import config
+from ..core.cache import TTLCache
+from ..core.etag import version_etag
+from ..models.portfolio import (
+    PositionAdd, PortfolioResponse, ImportResult, ImportRowError, PortfolioAnalytics,
+    RiskRequest, RiskMeasure, ScenarioRisk, PortfolioRisk
+)
+from . import analytics
+from ..repositories.database import Database
+from ..repositories.loader import RequestLoader
+from .stock_provider import StockDataProvider
+from .symbol_index import normalize_symbol
+
+# Column names accepted from brokerage exports
+TICKER_COLUMNS = ("ticker", "symbol")
+SHARES_COLUMNS = ("shares", "quantity", "qty")
+TICKER_PATTERN = re.compile(r"^[A-Z0-9^][A-Z0-9.\-=]{0,14}$")
+# Holding periods, in trading days, reported by the risk simulator
+RISK_HORIZONS = (1, 10)
 
 
 class PortfolioService:
-    def __init__(self, supabase_client: Client):
-        self.supabase = supabase_client
-        self.stock_service = StockService()
+    # Covariance factors keyed by (portfolio id, version, tickers); a position change bumps the version
+    _risk_models = TTLCache(config.RISK_MODEL_CACHE_SIZE, config.RISK_MODEL_TTL_SECONDS)
+
+    def __init__(self, db: Database, stock_provider: StockDataProvider, loader: RequestLoader):
+        self.db = db
+        self.stock_provider = stock_provider
+        self.loader = loader
 
     async def get_portfolio(self, user_id: str) -> PortfolioResponse:
         """Get user's portfolio with all positions"""
-        portfolio_response = self.supabase.table("portfolios").select(
-            "*, positions(*)"
-        ).eq("user_id", user_id).execute()
-        
-        if not portfolio_response.data:
+        portfolio, _ = await self.get_portfolio_with_etag(user_id)
+        return portfolio
+
+    async def get_portfolio_etag(self, user_id: str) -> str:
+        """Current ETag of the user's portfolio, without loading its positions"""
+        portfolio = await self.db.portfolios.get_version(user_id)
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
+        return version_etag(portfolio)
+
+    async def get_portfolio_with_etag(self, user_id: str) -> Tuple[PortfolioResponse, str]:
+        """Get user's portfolio and the ETag of the version that was read"""
+        portfolio, etag = await self.get_portfolio_payload(user_id)
+        return PortfolioResponse(**portfolio), etag
+
+    async def get_portfolio_payload(self, user_id: str) -> Tuple[Dict[str, Any], str]:
+        """User's portfolio as stored, shaped like PortfolioResponse but not validated, and its ETag"""
+        portfolio = await self.loader.portfolios.load(user_id)
         
-        portfolio = portfolio_response.data[0]
+        if not portfolio:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        return PortfolioResponse(
-            id=portfolio["id"],
-            name=portfolio["name"],
-            created_at=portfolio["created_at"],
-            positions=[
+        return {
+            "id": portfolio["id"],
+            "name": portfolio["name"],
+            "created_at": portfolio["created_at"],
+            "positions": [
                 {
                     "id": pos["id"],
                     "ticker": pos["ticker"],
@@ -33,69 +74,282 @@ class PortfolioService:
                 }
                 for pos in portfolio.get("positions", [])
             ]
+        }, version_etag(portfolio)
+
+    async def get_analytics(self, user_id: str, include_correlation: bool = False) -> PortfolioAnalytics:
+        """Market value, weights, daily P&L and risk metrics for the user's portfolio"""
+        portfolio = await self.loader.portfolios.load(user_id)
+        if not portfolio:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        
+        positions = portfolio.get("positions", [])
+        tickers = [pos["ticker"] for pos in positions]
+        benchmark = config.ANALYTICS_BENCHMARK.upper()
+        if not tickers:
+            return PortfolioAnalytics(
+                total_value=0.0, benchmark=benchmark, lookback_days=0, positions=[], errors={}
+            )
+        quotes = await self.stock_provider.get_quotes(tickers)
+        _, closes, histories, errors = await self._aligned_closes(tickers + [benchmark], benchmark)
+        for ticker in tickers:
+            if ticker not in quotes:
+                errors[ticker] = f"No price available for {ticker}"
+        
+        shares = np.array([pos["shares"] for pos in positions], dtype=np.float64)
+        prices = np.array([quotes[t]["price"] if t in quotes else np.nan for t in tickers])
+        values = shares * prices
+        total_value = float(np.nansum(values))
+        weights = np.nan_to_num(values / total_value) if total_value > 0 else np.zeros(len(tickers))
+        
+        returns = analytics.simple_returns(closes)
+        metrics = analytics.portfolio_metrics(
+            returns[:, :-1],
+            returns[:, -1] if benchmark in histories else None,
+            weights,
+            include_correlation
+        )
+        
+        # The quote's own previous close belongs to its market's session, whatever the server's
+        # local date; positions without one have no daily P&L rather than a wrong one
+        previous = np.array([
+            quotes[t].get("previous_close") if t in quotes and quotes[t].get("previous_close") else np.nan
+            for t in tickers
+        ], dtype=np.float64)
+        position_pnl = shares * (prices - previous)
+        daily_pnl = float(np.nansum(position_pnl))
+        previous_value = float(np.nansum(shares * previous))
+        
+        columns = {
+            "price": prices,
+            "market_value": values,
+            "weight": weights,
+            "daily_pnl": position_pnl,
+            "volatility": metrics["position_volatility"],
+            "beta": metrics["position_beta"]
+        }
+        columns = {name: analytics.to_json_list(values) for name, values in columns.items()}
+        correlation = metrics["correlation"]
+        return PortfolioAnalytics(
+            total_value=total_value,
+            daily_pnl=daily_pnl,
+            daily_return=daily_pnl / previous_value if previous_value > 0 else None,
+            volatility=metrics["volatility"],
+            beta=metrics["beta"],
+            benchmark=benchmark,
+            lookback_days=len(returns),
+            positions=[
+                {"ticker": ticker, "shares": int(shares[i]), **{name: col[i] for name, col in columns.items()}}
+                for i, ticker in enumerate(tickers)
+            ],
+            correlation=[analytics.to_json_list(row) for row in correlation.round(4)] if correlation is not None else None,
+            errors=errors
+        )
+
+    async def get_risk(self, user_id: str, request: RiskRequest) -> PortfolioRisk:
+        """Monte Carlo VaR and CVaR for the portfolio and for each what-if scenario on the same draws"""
+        portfolio = await self.loader.portfolios.load(user_id)
+        if not portfolio:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+
+        holdings = {pos["ticker"]: pos["shares"] for pos in portfolio.get("positions", [])}
+        variants = [holdings]
+        for scenario in request.scenarios:
+            variant = dict(holdings)
+            for trade in scenario.trades:
+                ticker = normalize_symbol(trade.ticker)
+                if not TICKER_PATTERN.match(ticker):
+                    raise HTTPException(status_code=400, detail=f"Invalid ticker {trade.ticker!r} in scenario {scenario.name!r}")
+                variant[ticker] = variant.get(ticker, 0) + trade.shares
+                if variant[ticker] < 0:
+                    raise HTTPException(status_code=400, detail=f"Scenario {scenario.name!r} sells more {ticker} than held")
+            variants.append(variant)
+        # Portfolio tickers first, then anything only a scenario trades
+        tickers = list(dict.fromkeys(t for variant in variants for t in variant))
+        confidence = request.confidence
+        if not tickers:
+            zero = [RiskMeasure(horizon_days=h, var=0.0, cvar=0.0) for h in RISK_HORIZONS]
+            return PortfolioRisk(
+                total_value=0.0, confidence=confidence, paths=0, lookback_days=0, risk=zero,
+                scenarios=[ScenarioRisk(name=s.name, total_value=0.0, risk=zero) for s in request.scenarios],
+                errors={}
+            )
+
+        # The factor depends only on the tickers' histories, so it lives until positions change
+        key = (portfolio["id"], portfolio.get("version"), tuple(tickers))
+        model = self._risk_models.get(key)
+        if model is None:
+            benchmark = config.ANALYTICS_BENCHMARK.upper()
+            _, closes, _, history_errors = await self._aligned_closes(tickers + [benchmark], benchmark)
+            returns = analytics.log_returns(closes[:, :len(tickers)])
+            factor = await asyncio.to_thread(analytics.covariance_factor, returns)
+            history_errors.pop(benchmark, None)
+            model = (factor, len(returns), history_errors)
+            self._risk_models.set(key, model)
+        factor, lookback_days, history_errors = model
+
+        quotes = await self.stock_provider.get_quotes(tickers)
+        errors = dict(history_errors)
+        for ticker in tickers:
+            if ticker not in quotes:
+                errors[ticker] = f"No price available for {ticker}"
+        prices = np.array([quotes[t]["price"] if t in quotes else 0.0 for t in tickers])
+        shares = np.array([[variant.get(t, 0) for variant in variants] for t in tickers], dtype=np.float64)
+        values = shares * prices[:, None]
+
+        rng = np.random.default_rng(request.seed)
+        pnl = await asyncio.to_thread(
+            analytics.simulate_pnl, factor, values, list(RISK_HORIZONS), request.paths, rng,
+            config.RISK_TIME_BUDGET_SECONDS
+        )
+        var, cvar = analytics.value_at_risk(pnl, confidence)
+        totals = values.sum(axis=0)
+
+        def measures(column: int) -> List[RiskMeasure]:
+            return [
+                RiskMeasure(horizon_days=h, var=float(var[column, i]), cvar=float(cvar[column, i]))
+                for i, h in enumerate(RISK_HORIZONS)
+            ]
+
+        return PortfolioRisk(
+            total_value=float(totals[0]),
+            confidence=confidence,
+            paths=len(pnl),
+            lookback_days=lookback_days,
+            risk=measures(0),
+            scenarios=[
+                ScenarioRisk(name=scenario.name, total_value=float(totals[i + 1]), risk=measures(i + 1))
+                for i, scenario in enumerate(request.scenarios)
+            ],
+            errors=errors
         )
 
+    async def _aligned_closes(
+        self, tickers: List[str], calendar_ticker: str
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Dict[str, np.ndarray]], Dict[str, str]]:
+        """Forward-filled (dates x tickers) closes over the lookback window: (calendar, closes, histories, errors)"""
+        lookback = config.ANALYTICS_LOOKBACK_DAYS
+        # Calendar days comfortably covering the requested number of trading days
+        start = date.today() - timedelta(days=int(lookback * 1.5) + 10)
+        histories, errors = await self.stock_provider.get_histories(tickers, start)
+
+        # Align everything on the benchmark's trading calendar
+        if calendar_ticker in histories and len(histories[calendar_ticker]["date"]):
+            calendar = histories[calendar_ticker]["date"][-(lookback + 1):]
+        else:
+            all_dates = [h["date"] for h in histories.values() if len(h["date"])]
+            calendar = np.unique(np.concatenate(all_dates))[-(lookback + 1):] if all_dates else np.array([], dtype="datetime64[D]")
+        closes = analytics.forward_fill(analytics.align_closes(histories, tickers, calendar))
+        return calendar, closes, histories, errors
+
     async def add_position(self, user_id: str, position_data: PositionAdd) -> dict:
         """Add or update a position in user's portfolio"""
-        # Validate ticker
-        self.stock_service.get_stock_info(position_data.ticker)
+        # Validate the symbol as it will be stored (BRK.B -> BRK-B)
+        ticker_upper = normalize_symbol(position_data.ticker)
+        await self.stock_provider.validate_ticker(ticker_upper)
         
         # Validate shares
         if position_data.shares <= 0:
             raise HTTPException(status_code=400, detail="Shares must be positive")
         
-        # Get user's portfolio
-        portfolio_response = self.supabase.table("portfolios").select("*").eq("user_id", user_id).execute()
-        if not portfolio_response.data:
+        # Insert or increment in a single atomic call
+        position = await self.db.positions.add(user_id, ticker_upper, position_data.shares)
+        self.loader.portfolios.clear(user_id)
+        if not position:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        portfolio_id = portfolio_response.data[0]["id"]
-        ticker_upper = position_data.ticker.upper()
-        
-        # Check if position already exists
-        existing_position = self.supabase.table("positions").select("*").eq("portfolio_id", portfolio_id).eq("ticker", ticker_upper).execute()
-        
-        if existing_position.data:
-            # Update existing position
-            position = existing_position.data[0]
-            new_shares = position["shares"] + position_data.shares
-            self.supabase.table("positions").update({"shares": new_shares}).eq("id", position["id"]).execute()
-        else:
-            # Create new position
-            self.supabase.table("positions").insert({
-                "portfolio_id": portfolio_id,
-                "ticker": ticker_upper,
-                "shares": position_data.shares
-            }).execute()
-        
         return {"message": f"Added {position_data.shares} shares of {ticker_upper}"}
 
     async def remove_position(self, user_id: str, position_data: PositionAdd) -> dict:
         """Remove or reduce a position in user's portfolio"""
-        # Get user's portfolio
-        portfolio_response = self.supabase.table("portfolios").select("*").eq("user_id", user_id).execute()
-        if not portfolio_response.data:
-            raise HTTPException(status_code=404, detail="Portfolio not found")
+        # Validate shares
+        if position_data.shares <= 0:
+            raise HTTPException(status_code=400, detail="Shares must be positive")
         
-        portfolio_id = portfolio_response.data[0]["id"]
-        ticker_upper = position_data.ticker.upper()
+        ticker_upper = normalize_symbol(position_data.ticker)
         
-        # Find existing position
-        position_response = self.supabase.table("positions").select("*").eq("portfolio_id", portfolio_id).eq("ticker", ticker_upper).execute()
+        # Reduce or delete in a single atomic call
+        remaining = await self.db.positions.remove(user_id, ticker_upper, position_data.shares)
+        self.loader.portfolios.clear(user_id)
         
-        if not position_response.data:
+        if remaining is None:
             raise HTTPException(status_code=404, detail="Position not found")
         
-        position = position_response.data[0]
-        
-        if position_data.shares >= position["shares"]:
-            # Remove entire position
-            self.supabase.table("positions").delete().eq("id", position["id"]).execute()
+        if remaining == 0:
             message = f"Removed all shares of {ticker_upper}"
         else:
-            # Reduce shares
-            new_shares = position["shares"] - position_data.shares
-            self.supabase.table("positions").update({"shares": new_shares}).eq("id", position["id"]).execute()
             message = f"Reduced {ticker_upper} by {position_data.shares} shares"
         
         return {"message": message}
+
+    async def import_positions(self, user_id: str, rows: List[Dict[str, Any]]) -> ImportResult:
+        """Bulk add positions, upserting them in batched statements"""
+        if len(rows) > config.POSITION_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {config.POSITION_IMPORT_MAX_ROWS} positions per import"
+            )
+        
+        cleaned = []
+        errors = []
+        for index, row in enumerate(rows, start=1):
+            try:
+                cleaned.append((index, _clean_import_row(row)))
+            except ValueError as e:
+                errors.append(ImportRowError(row=index, error=str(e)))
+        
+        # Listed symbols validate locally; only the rest are checked upstream, and an
+        # upstream outage fails the import rather than rejecting rows as unknown
+        index = self.stock_provider.symbol_index
+        unlisted = sorted({row["ticker"] for _, row in cleaned if not index.contains(row["ticker"])})
+        invalid = set()
+        if unlisted:
+            invalid = set(await self.stock_provider.find_unknown(unlisted))
+        
+        valid = []
+        for row_number, row in cleaned:
+            if row["ticker"] in invalid:
+                errors.append(ImportRowError(row=row_number, error=f"Unknown ticker {row['ticker']}"))
+            else:
+                valid.append(row)
+        errors.sort(key=lambda error: error.row)
+        
+        updated = 0
+        batch_size = config.POSITION_IMPORT_BATCH_SIZE
+        for start in range(0, len(valid), batch_size):
+            updated += await self.db.positions.import_many(user_id, valid[start:start + batch_size])
+        self.loader.portfolios.clear(user_id)
+        
+        if valid and not updated:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        
+        return ImportResult(imported=len(valid), positions_updated=updated, errors=errors)
+
+
+def _clean_import_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    ticker = normalize_symbol(str(_first(row, TICKER_COLUMNS) or ""))
+    if not TICKER_PATTERN.match(ticker):
+        raise ValueError(f"Invalid ticker {ticker!r}")
+    
+    raw_shares = _first(row, SHARES_COLUMNS)
+    try:
+        shares = float(str(raw_shares).replace(",", ""))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid share count {raw_shares!r}")
+    if not math.isfinite(shares) or shares <= 0 or shares != int(shares):
+        raise ValueError("Shares must be a positive whole number")
+    if shares > config.POSITION_MAX_SHARES:
+        raise ValueError(f"Shares must be at most {config.POSITION_MAX_SHARES}")
+    
+    return {"ticker": ticker, "shares": int(shares)}
+
+
+def _first(row: Dict[str, Any], columns: Tuple[str, ...]) -> Any:
+    for key, value in row.items():
+        if str(key).strip().lower() in columns:
+            return value
+    return None
+
+
+def parse_positions_csv(text: str) -> List[Dict[str, Any]]:
+    """Read rows from a CSV export with a ticker/symbol and shares/quantity column"""
+    return list(csv.DictReader(io.StringIO(text.lstrip("\ufeff"))))
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from fastapi import HTTPException
+from typing import Any, Dict
+from ..repositories.database import Database
+from .stock_provider import StockDataProvider
+from .stock_service import StockService
+
+logger = logging.getLogger(__name__)
+
+
+class QuotePrewarmer:
+    """Keeps quotes for the most-held tickers cached so user reads rarely go upstream"""
+
+    def __init__(
+        self,
+        db: Database,
+        stock_provider: StockDataProvider,
+        interval: float,
+        max_tickers: int,
+        budget: int,
+        batch_size: int
+    ):
+        self.db = db
+        self.stock_provider = stock_provider
+        self.interval = interval
+        self.max_tickers = max_tickers
+        self.budget = budget
+        self.batch_size = batch_size
+        self.cycles = 0
+        self.hot_tickers = 0
+        self.prices_refreshed = 0
+        self.profiles_refreshed = 0
+        self.over_budget = 0
+        self.last_run_at = None
+        self.last_duration = None
+
+    async def run(self) -> None:
+        """Refresh the hot ticker set every interval until cancelled"""
+        while True:
+            started = time.monotonic()
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning("Quote prewarm cycle failed: %s", e)
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def run_once(self) -> None:
+        """One cycle: refresh prices, then missing profiles, within the upstream budget"""
+        started = time.monotonic()
+        rows = await self.db.tickers.hot(self.max_tickers)
+        tickers = list(dict.fromkeys(row["ticker"].upper() for row in rows))
+        self.hot_tickers = len(tickers)
+        budget = self.budget
+
+        try:
+            # Prices first: anything that would expire before the next cycle, most-held first
+            stale = StockService.expiring_prices(tickers, self.interval)
+            batches = [stale[i:i + self.batch_size] for i in range(0, len(stale), self.batch_size)]
+            for batch in batches[:budget]:
+                quotes = await self.stock_provider.refresh_quotes(batch)
+                self.prices_refreshed += len(quotes)
+            budget -= min(len(batches), budget)
+            skipped = sum(len(batch) for batch in batches[self.budget:])
+
+            # Whatever budget is left goes to profiles, one upstream call each
+            # Checks the durable tier too, which is a local SQLite read per ticker
+            missing = await asyncio.to_thread(StockService.expiring_profiles, tickers, self.interval)
+            for ticker in missing[:budget]:
+                try:
+                    await self.stock_provider.refresh_stock_info(ticker)
+                    self.profiles_refreshed += 1
+                except HTTPException as e:
+                    if e.status_code != 404:
+                        raise
+            skipped += max(0, len(missing) - budget)
+            self.over_budget += skipped
+        except HTTPException as e:
+            # Pool busy or upstream slow: yield to user traffic until the next cycle
+            logger.info("Quote prewarm cycle cut short: %s", e.detail)
+        finally:
+            self.cycles += 1
+            self.last_run_at = time.time()
+            self.last_duration = time.monotonic() - started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "budget": self.budget,
+            "cycles": self.cycles,
+            "hot_tickers": self.hot_tickers,
+            "prices_refreshed": self.prices_refreshed,
+            "profiles_refreshed": self.profiles_refreshed,
+            "over_budget": self.over_budget,
+            "last_run_at": self.last_run_at,
+            "last_duration": self.last_duration
+        }
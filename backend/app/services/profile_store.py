@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    symbol TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class ProfileStore:
+    """SQLite-backed profile tier shared by restarts and every worker process on the host"""
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.errors = 0
+
+    def get(self, symbol: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Stored profile and its remaining TTL in seconds, or None if absent or expired"""
+        self.reads += 1
+        try:
+            row = self._connection().execute(
+                "SELECT data, fetched_at FROM profiles WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            return None
+        if row is None:
+            return None
+        remaining = row[1] + self.ttl - time.time()
+        if remaining <= 0:
+            return None
+        self.hits += 1
+        return json.loads(row[0]), remaining
+
+    def put(self, symbol: str, profile: Dict[str, Any]) -> None:
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO profiles (symbol, data, fetched_at) VALUES (?, ?, ?)",
+                    (symbol, json.dumps(profile), time.time())
+                )
+            self.writes += 1
+        except sqlite3.Error as e:
+            # The in-memory tier still works; losing durability is not worth failing a request
+            self._failed("write", e)
+
+    def load_recent(self, limit: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Most recently fetched unexpired profiles as (symbol, profile, remaining TTL); purges expired rows"""
+        cutoff = time.time() - self.ttl
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM profiles WHERE fetched_at <= ?", (cutoff,))
+                rows = conn.execute(
+                    "SELECT symbol, data, fetched_at FROM profiles ORDER BY fetched_at DESC LIMIT ?",
+                    (limit,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            self._failed("load", e)
+            return []
+        return [(symbol, json.loads(data), fetched_at - cutoff) for symbol, data, fetched_at in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ttl": self.ttl,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+            "errors": self.errors
+        }
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads, so each pool thread opens its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            # WAL lets several uvicorn workers read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning("Profile store %s failed: %s", operation, error)
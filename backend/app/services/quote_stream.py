@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from fastapi import HTTPException
+from typing import Any, Dict, Iterable, Optional, Set
+from .stock_provider import StockDataProvider
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteSubscription:
+    """One client's view of the stream; pending updates are conflated per ticker"""
+
+    def __init__(self, tickers: Iterable[str]):
+        self.tickers = frozenset(tickers)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+        self.conflated = 0
+
+    def push(self, ticker: str, quote: Dict[str, Any]) -> None:
+        # A slow client only ever holds the latest quote per ticker, so its
+        # backlog is bounded by its ticker count rather than by time
+        if ticker in self._pending:
+            self.conflated += 1
+        self._pending[ticker] = quote
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Wait for changed quotes; None if nothing changed within timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return pending
+
+
+class QuoteBroadcaster:
+    """Single poller per process that fans changed quotes out to every subscriber"""
+
+    def __init__(
+        self,
+        stock_provider: StockDataProvider,
+        interval: float,
+        max_subscribers: int,
+        max_tickers: int
+    ):
+        self.stock_provider = stock_provider
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self.max_tickers = max_tickers
+        self._subscribers: Set[QuoteSubscription] = set()
+        self._by_ticker: Dict[str, Set[QuoteSubscription]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.upstream_errors = 0
+        self.pushed = 0
+
+    def subscribe(self, tickers: Iterable[str]) -> QuoteSubscription:
+        """Register a client for the given tickers and make sure the poller runs"""
+        symbols = {t.upper() for t in tickers}
+        if len(symbols) > self.max_tickers:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot stream more than {self.max_tickers} tickers"
+            )
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many live quote streams, try again shortly",
+                headers={"Retry-After": str(int(self.interval))}
+            )
+
+        subscription = QuoteSubscription(symbols)
+        self._subscribers.add(subscription)
+        unseen = False
+        for symbol in symbols:
+            self._by_ticker.setdefault(symbol, set()).add(subscription)
+            if symbol in self._last:
+                subscription.push(symbol, self._last[symbol])
+            else:
+                unseen = True
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+        elif unseen:
+            self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription: QuoteSubscription) -> None:
+        self._subscribers.discard(subscription)
+        for symbol in subscription.tickers:
+            subscribers = self._by_ticker.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._by_ticker[symbol]
+                self._last.pop(symbol, None)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "tickers": len(self._by_ticker),
+            "polls": self.polls,
+            "upstream_errors": self.upstream_errors,
+            "pushed": self.pushed,
+            "conflated": sum(s.conflated for s in self._subscribers)
+        }
+
+    async def _poll_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_poll = loop.time()
+        while self._by_ticker:
+            remaining = next_poll - loop.time()
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+
+            if loop.time() >= next_poll:
+                # Scheduled poll: every distinct ticker once, however many subscribers
+                next_poll = loop.time() + self.interval
+                await self._poll(list(self._by_ticker), refresh=True)
+            else:
+                # Woken early by a new subscriber: only fill in tickers we have never sent
+                unseen = [symbol for symbol in self._by_ticker if symbol not in self._last]
+                if unseen:
+                    await self._poll(unseen, refresh=False)
+
+    async def _poll(self, tickers, refresh: bool) -> None:
+        self.polls += 1
+        try:
+            if refresh:
+                quotes = await self.stock_provider.refresh_quotes(tickers)
+            else:
+                quotes = await self.stock_provider.get_quotes(tickers)
+        except HTTPException as e:
+            self.upstream_errors += 1
+            logger.warning("Quote stream poll failed: %s", e.detail)
+            return
+
+        for symbol, quote in quotes.items():
+            subscribers = self._by_ticker.get(symbol)
+            if not subscribers or self._last.get(symbol) == quote:
+                continue
+            self._last[symbol] = quote
+            for subscription in subscribers:
+                subscription.push(symbol, quote)
+                self.pushed += 1
@@ -0,0 +1,162 @@
+import operator
+import re
+import threading
+import numpy as np
+from fastapi import HTTPException
+from typing import Any, Dict, List, Optional, Tuple
+
+NUMERIC_FIELDS = (
+    "price", "market_cap", "pe_ratio", "forward_pe", "eps", "dividend_yield", "beta",
+    "volume", "average_volume", "fifty_two_week_high", "fifty_two_week_low"
+)
+CATEGORY_FIELDS = ("sector", "industry", "country", "exchange", "currency")
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+SUFFIXES = {"k": 1e3, "m": 1e6, "b": 1e9, "t": 1e12}
+_FILTER = re.compile(r"^\s*([a-z_0-9]+)\s*(<=|>=|!=|<|>|=)\s*(-?[0-9.]+(?:e[-+]?[0-9]+)?)\s*([kmbt])?\s*$", re.IGNORECASE)
+
+# Placeholder values Yahoo uses for unknown categories
+_MISSING = {None, "", "N/A"}
+
+
+def parse_filter(expression: str) -> Tuple[str, str, float]:
+    """'market_cap > 10B' -> ('market_cap', '>', 1e10)"""
+    match = _FILTER.match(expression)
+    if not match or match.group(1).lower() not in NUMERIC_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid filter {expression!r}; use <field><op><number> with fields {', '.join(NUMERIC_FIELDS)}"
+        )
+    field, op, number, suffix = match.groups()
+    return field.lower(), op, float(number) * SUFFIXES.get((suffix or "").lower(), 1)
+
+
+def _number(value: Any) -> float:
+    try:
+        return np.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class Screener:
+    """Columnar table of cached fundamentals: one NumPy array per numeric field,
+    dictionary-encoded categories, updated in place as quotes are fetched"""
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._names: List[str] = []
+        self._numeric = {field: np.full(capacity, np.nan) for field in NUMERIC_FIELDS}
+        self._codes = {field: np.full(capacity, -1, dtype=np.int32) for field in CATEGORY_FIELDS}
+        self._is_etf = np.zeros(capacity, dtype=bool)
+        # Per category: lower-cased value -> code, and code -> display value
+        self._encoding: Dict[str, Dict[str, int]] = {field: {} for field in CATEGORY_FIELDS}
+        self._labels: Dict[str, List[str]] = {field: [] for field in CATEGORY_FIELDS}
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def upsert(self, symbol: str, data: Dict[str, Any]) -> None:
+        """Write whichever fields data carries into the symbol's row"""
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None:
+                row = self._append(symbol)
+            for field in NUMERIC_FIELDS:
+                if field in data:
+                    self._numeric[field][row] = _number(data[field])
+            for field in CATEGORY_FIELDS:
+                if field in data:
+                    self._codes[field][row] = self._encode(field, data[field])
+            if "name" in data:
+                self._names[row] = data["name"] or symbol
+            if "is_etf" in data:
+                self._is_etf[row] = bool(data["is_etf"])
+            self.updates += 1
+
+    def screen(
+        self,
+        filters: List[Tuple[str, str, float]],
+        categories: Dict[str, List[str]],
+        is_etf: Optional[bool] = None,
+        sort: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """Symbols matching every filter, sorted and cut to the top `limit`"""
+        if sort is not None and sort not in NUMERIC_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Cannot sort by {sort}; choose from {', '.join(NUMERIC_FIELDS)}")
+
+        with self._lock:
+            n = len(self._symbols)
+            mask = np.ones(n, dtype=bool)
+            for field, values in categories.items():
+                codes = [self._encoding[field].get(v.strip().lower(), -2) for v in values]
+                mask &= np.isin(self._codes[field][:n], codes)
+            for field, op, value in filters:
+                # NaN compares false, so rows missing the field drop out
+                mask &= OPERATORS[op](self._numeric[field][:n], value)
+            if is_etf is not None:
+                mask &= self._is_etf[:n] == is_etf
+
+            selected = np.flatnonzero(mask)
+            if sort is not None:
+                keys = self._numeric[sort][selected]
+                # Missing values sort last in either direction
+                keys = np.where(np.isnan(keys), np.inf, -keys if descending else keys)
+                if len(selected) > limit:
+                    top = np.argpartition(keys, limit - 1)[:limit]
+                    selected = selected[top[np.argsort(keys[top], kind="stable")]]
+                else:
+                    selected = selected[np.argsort(keys, kind="stable")]
+            selected = selected[:limit]
+
+            results = [self._row(int(i)) for i in selected]
+            return {"universe": n, "matched": int(mask.sum()), "results": results}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"symbols": len(self._symbols), "updates": self.updates}
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        row: Dict[str, Any] = {"ticker": self._symbols[i], "name": self._names[i], "is_etf": bool(self._is_etf[i])}
+        for field in CATEGORY_FIELDS:
+            code = self._codes[field][i]
+            row[field] = self._labels[field][code] if code >= 0 else None
+        for field in NUMERIC_FIELDS:
+            value = self._numeric[field][i]
+            row[field] = None if np.isnan(value) else float(value)
+        return row
+
+    def _append(self, symbol: str) -> int:
+        row = len(self._symbols)
+        if row == len(self._is_etf):
+            # Grow every column geometrically so appends stay amortized O(1)
+            grow = len(self._is_etf)
+            for field in NUMERIC_FIELDS:
+                self._numeric[field] = np.concatenate((self._numeric[field], np.full(grow, np.nan)))
+            for field in CATEGORY_FIELDS:
+                self._codes[field] = np.concatenate((self._codes[field], np.full(grow, -1, dtype=np.int32)))
+            self._is_etf = np.concatenate((self._is_etf, np.zeros(grow, dtype=bool)))
+        self._rows[symbol] = row
+        self._symbols.append(symbol)
+        self._names.append(symbol)
+        return row
+
+    def _encode(self, field: str, value: Any) -> int:
+        if value in _MISSING:
+            return -1
+        key = str(value).lower()
+        code = self._encoding[field].get(key)
+        if code is None:
+            code = self._encoding[field][key] = len(self._labels[field])
+            self._labels[field].append(str(value))
+        return code
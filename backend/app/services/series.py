@@ -0,0 +1,111 @@
+import calendar
+import numpy as np
+from datetime import date
+from typing import Any, Dict, Optional
+
+Columns = Dict[str, np.ndarray]
+
+# Chart ranges in months back from the last stored bar; ytd and max are handled separately
+RANGE_MONTHS = {"1mo": 1, "3mo": 3, "6mo": 6, "1y": 12, "2y": 24, "5y": 60, "10y": 120}
+
+
+def range_start(last: date, period: str) -> Optional[date]:
+    """First date of a chart range ending at last; None for the whole history"""
+    if period == "max":
+        return None
+    if period == "ytd":
+        return date(last.year, 1, 1)
+    months = last.year * 12 + last.month - 1 - RANGE_MONTHS[period]
+    year, month = divmod(months, 12)
+    return date(year, month + 1, min(last.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def aggregate(columns: Columns, starts: np.ndarray) -> Columns:
+    """Collapse runs of bars beginning at each index in starts into one OHLCV bar"""
+    ends = np.concatenate((starts[1:], [len(columns["date"])])) - 1
+    return {
+        "date": columns["date"][starts],
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+
+
+def ohlc_buckets(columns: Columns, points: int) -> Columns:
+    """At most points bars, each aggregating an equal run of consecutive bars"""
+    n = len(columns["date"])
+    if n <= points:
+        return columns
+    starts = np.unique(np.arange(points) * n // points)
+    return aggregate(columns, starts)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps, always including both ends"""
+    n = len(x)
+    if points < 3:
+        raise ValueError("LTTB needs at least 3 points")
+    if n <= points:
+        return np.arange(n)
+
+    # Bucket i covers [edges[i], edges[i + 1]); the first and last points are buckets of their own
+    edges = (np.arange(points - 1) * (n - 2) / (points - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Mean of every bucket at once from prefix sums; bucket i is scored against the mean of i + 1
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    next_lo = np.append(edges[1:-1], n - 1)
+    next_hi = np.append(edges[2:], n)
+    count = next_hi - next_lo
+    mean_x = (sum_x[next_hi] - sum_x[next_lo]) / count
+    mean_y = (sum_y[next_hi] - sum_y[next_lo]) / count
+
+    keep = np.empty(points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    # Each choice depends on the previous one, so only the per-bucket scoring is vectorized
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay, cx, cy = x[a], y[a], mean_x[i], mean_y[i]
+        # Twice the triangle area (a, b, c), dropping terms that don't depend on b
+        area = np.abs(y[lo:hi] * (ax - cx) + x[lo:hi] * (cy - ay) + (cx * ay - ax * cy))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def build_series(ticker: str, columns: Columns, period: str, points: int, method: str) -> Dict[str, Any]:
+    """Chart payload for a PriceSeries: LTTB-selected closes or OHLC bucket bars"""
+    dates = columns["date"]
+    if len(dates):
+        start = range_start(dates[-1].astype(date), period)
+        if start is not None:
+            lo = np.searchsorted(dates, np.datetime64(start, "D"))
+            columns = {name: values[lo:] for name, values in columns.items()}
+    series: Dict[str, Any] = {
+        "ticker": ticker,
+        "range": period,
+        "method": method,
+        "source_bars": len(columns["date"]),
+    }
+
+    if method == "ohlc":
+        bars = ohlc_buckets(columns, points)
+        series["bars"] = [
+            {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for d, o, h, l, c, v in zip(
+                bars["date"].tolist(), bars["open"].tolist(), bars["high"].tolist(),
+                bars["low"].tolist(), bars["close"].tolist(), bars["volume"].tolist()
+            )
+        ]
+        return series
+
+    close = columns["close"]
+    keep = lttb(columns["date"].astype(np.int64).astype(np.float64), close, points)
+    series["points"] = [
+        {"date": d, "close": c}
+        for d, c in zip(columns["date"][keep].tolist(), close[keep].tolist())
+    ]
+    return series
@@ -0,0 +1,204 @@
+import asyncio
+from datetime import date
+from fastapi import HTTPException
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from ..core.executor import BoundedExecutor, ExecutorSaturated
+from ..core import config
+from ..core.metrics import timed
+from .history_store import HistoryStore
+from .stock_service import PRICE_FIELDS, StockService
+from .symbol_index import SymbolIndex
+
+
+class StockDataProvider:
+    """Async access to StockService that keeps blocking upstream calls off the event loop"""
+
+    def __init__(
+        self,
+        executor: BoundedExecutor,
+        timeout: float,
+        symbol_index: SymbolIndex,
+        history_store: HistoryStore
+    ):
+        self.executor = executor
+        self.timeout = timeout
+        self.symbol_index = symbol_index
+        self.history_store = history_store
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def get_stock_info(self, ticker: str) -> Dict[str, Any]:
+        """Get comprehensive stock information without blocking the event loop"""
+        symbol = ticker.upper()
+        cached = StockService.get_cached(symbol)
+        if cached is not None:
+            return cached
+
+        age = StockService.last_known_age(symbol)
+        if age is not None and age <= config.QUOTE_STALE_WHILE_REVALIDATE_SECONDS:
+            last_known = StockService.get_last_known(symbol)
+            if last_known is not None:
+                # Answer now with the recent quote and refresh it for the next caller
+                self._revalidate(symbol)
+                return last_known
+
+        try:
+            return await self._coalesce(("info", symbol), StockService.get_stock_info, symbol)
+        except HTTPException as e:
+            # Upstream trouble: an old quote flagged stale beats an error
+            last_known = StockService.get_last_known(symbol) if e.status_code in (503, 504) else None
+            if last_known is None:
+                raise
+            return last_known
+
+    def data_version(self, ticker: str) -> Optional[int]:
+        """Changes whenever the cached data behind get_stock_info(ticker) does"""
+        return StockService.data_version(ticker)
+
+    async def validate_ticker(self, ticker: str) -> None:
+        """Raise 404 for unknown tickers; listed symbols never touch the network"""
+        if self.symbol_index.contains(ticker):
+            return
+        # Not in the listing (foreign exchanges, indices, or index not loaded yet)
+        await self.get_stock_info(ticker)
+
+    async def get_many(self, tickers: List[str]) -> Dict[str, Any]:
+        """Get stock information for several tickers without blocking the event loop"""
+        return await self._run(StockService.get_many, tickers)
+
+    async def find_unknown(self, tickers: List[str]) -> Dict[str, str]:
+        """Tickers upstream reports as not found, checked in concurrent chunks
+
+        Raises 503 if upstream could not answer for some ticker, so an outage is never
+        mistaken for unknown symbols.
+        """
+        symbols = list(dict.fromkeys(t.upper() for t in tickers))
+        size = config.TICKER_VALIDATION_CHUNK_SIZE
+        chunks = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+        with timed("market"):
+            results = await asyncio.gather(
+                *(self._call(StockService.find_unknown, chunk) for chunk in chunks),
+                return_exceptions=True
+            )
+
+        unknown: Dict[str, str] = {}
+        unchecked: List[str] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                unchecked.extend(chunk)
+                continue
+            unknown.update(result[0])
+            unchecked.extend(result[1])
+        if unchecked:
+            shown = ", ".join(unchecked[:10]) + (", ..." if len(unchecked) > 10 else "")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Market data unavailable; could not validate {shown}"
+            )
+        return unknown
+
+    async def get_history(
+        self,
+        ticker: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        interval: str = "1d"
+    ) -> Dict[str, Any]:
+        """Daily bars from the local store, appending any new ones from upstream first"""
+        return await self._run(self.history_store.get_range, ticker, start, end, interval)
+
+    async def get_series(self, ticker: str, period: str, points: int, method: str) -> Tuple[Dict[str, Any], str]:
+        """Downsampled chart series and its ETag, cached until the ticker's bars change"""
+        return await self._run(self.history_store.get_series, ticker, period, points, method)
+
+    async def get_quotes(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Latest price and volume per ticker; tickers without a price are omitted"""
+        cached = StockService.get_cached_quotes(tickers)
+        if cached is not None:
+            return cached
+        return await self._run(StockService.get_quotes, tickers)
+
+    async def get_quotes_within(
+        self,
+        tickers: List[str],
+        deadline: float,
+        chunk_size: int
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Quotes ready within deadline seconds, and the tickers still pending at that point
+
+        Cache misses are fetched in concurrent chunks so one slow batch only delays its own
+        tickers; pending tickers carry their last known quote, flagged stale, when there is one.
+        """
+        symbols = list(dict.fromkeys(t.upper() for t in tickers))
+        quotes = StockService.get_fresh_quotes(symbols)
+        missing = [s for s in symbols if s not in quotes]
+        if not missing:
+            return quotes, []
+
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        tasks = [asyncio.ensure_future(self._call(StockService.get_quotes, chunk)) for chunk in chunks]
+        with timed("market"):
+            done, _ = await asyncio.wait(tasks, timeout=deadline)
+        for task in tasks:
+            if task in done and task.exception() is None:
+                quotes.update(task.result())
+            elif task not in done:
+                # Still running for the next request's cache; do not warn about its outcome
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        pending = [s for s in missing if s not in quotes]
+        for symbol in pending:
+            last_known = StockService.get_last_known(symbol)
+            if last_known is not None:
+                quotes[symbol] = {k: last_known.get(k) for k in PRICE_FIELDS + ("stale", "as_of")}
+        return quotes, pending
+
+    async def refresh_quotes(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fresh price and volume per ticker in one bulk upstream call"""
+        return await self._run(StockService.refresh_quotes, tickers)
+
+    async def refresh_stock_info(self, ticker: str) -> Dict[str, Any]:
+        """Re-fetch full stock information for one ticker"""
+        symbol = ticker.upper()
+        return await self._coalesce(("info", symbol), StockService.refresh_info, symbol)
+
+    async def get_histories(self, tickers: List[str], start: Optional[date] = None) -> Any:
+        """Daily bars since start for several tickers in one pool call: (found, errors)"""
+        return await self._run(self.history_store.get_many, tickers, start)
+
+    def _revalidate(self, symbol: str) -> None:
+        key = ("info", symbol)
+        if key in self._inflight:
+            return
+        task = asyncio.ensure_future(self._call(StockService.get_stock_info, symbol))
+        self._inflight[key] = task
+
+        def done(task: asyncio.Task) -> None:
+            self._inflight.pop(key, None)
+            # Failures are already counted by the upstream guard; keep serving stale
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(done)
+
+    async def _coalesce(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        # Concurrent requests for the same key share one pool slot
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call(fn, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one disconnecting client does not cancel the others' fetch
+        with timed("market"):
+            return await asyncio.shield(task)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with timed("market"):
+            return await self._call(fn, *args)
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return await self.executor.run(fn, *args, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Market data request timed out")
+        except ExecutorSaturated:
+            raise HTTPException(status_code=503, detail="Market data service is busy, try again shortly")
@@ -1,45 +1,424 @@
 from fastapi import HTTPException
+from pydantic import ValidationError
+import time
 import yfinance as yf
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from ..core import config
+from ..core.cache import TTLCache, SingleFlight
+from ..core.resilience import UpstreamUnavailable
 from ..models.stock import StockInfo
+from .profile_store import ProfileStore
+from .upstream import attempt, market_data, unavailable
+
+# Fields that move intraday; everything else is treated as profile data
+PRICE_FIELDS = ("price", "volume", "previous_close")
 
 
 class StockService:
+    # Shared across instances so every service sees the same cached quotes
+    _price_cache = TTLCache(config.QUOTE_CACHE_MAX_SIZE, config.QUOTE_PRICE_TTL_SECONDS)
+    _profile_cache = TTLCache(config.QUOTE_CACHE_MAX_SIZE, config.QUOTE_PROFILE_TTL_SECONDS)
+    # Durable copy of the profile tier; opened lazily on first use
+    _profile_store = ProfileStore(config.PROFILE_STORE_PATH, config.PROFILE_STORE_TTL_SECONDS)
+    # Last successfully fetched data per symbol with its fetch time, kept well past the
+    # price TTL so reads keep working while upstream is throttled or down
+    _last_known = TTLCache(config.QUOTE_CACHE_MAX_SIZE, config.QUOTE_STALE_MAX_AGE_SECONDS)
+    _flight = SingleFlight()
+    # When each symbol's cached data last changed, so responses can be tagged without hashing them
+    _changed_at = TTLCache(config.QUOTE_CACHE_MAX_SIZE, config.QUOTE_STALE_MAX_AGE_SECONDS)
+    # Called with (symbol, fields) whenever fresh data lands in the cache
+    _listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    @classmethod
+    def get_stock_info(cls, ticker: str) -> Dict[str, Any]:
+        """Get comprehensive stock information, served from cache when fresh"""
+        symbol = ticker.upper()
+        profile = cls._get_profile(symbol)
+        quote = cls._price_cache.get(symbol)
+
+        if profile is not None and quote is not None:
+            return {**profile, **quote}
+
+        if profile is not None:
+            # Only the price went stale, so skip the heavy .info call
+            quote = cls._flight.do(("price", symbol), lambda: cls._refresh_price(symbol))
+            return {**profile, **quote}
+
+        return cls._flight.do(("info", symbol), lambda: cls._refresh_info(symbol))
+
+    @classmethod
+    def get_cached(cls, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get stock information only if both cache tiers are fresh"""
+        symbol = ticker.upper()
+        profile = cls._profile_cache.get(symbol)
+        if profile is None:
+            return None
+        quote = cls._price_cache.get(symbol)
+        if quote is None:
+            return None
+        return {**profile, **quote}
+
+    @classmethod
+    def get_last_known(cls, ticker: str) -> Optional[Dict[str, Any]]:
+        """Most recent full stock information, flagged stale, even if its TTL has passed"""
+        entry = cls._last_known.get(ticker.upper())
+        if entry is None or "name" not in entry[0]:
+            return None
+        data, fetched_at = entry
+        return {**data, "stale": True, "as_of": datetime.fromtimestamp(fetched_at, timezone.utc)}
+
+    @classmethod
+    def last_known_age(cls, ticker: str) -> Optional[float]:
+        """Seconds since the last successful fetch for this ticker, if any"""
+        entry = cls._last_known.get(ticker.upper())
+        return time.time() - entry[1] if entry is not None else None
+
+    @classmethod
+    def data_version(cls, ticker: str) -> Optional[int]:
+        """Nanosecond time of the last cache write for this ticker, while it is still tracked"""
+        return cls._changed_at.get(ticker.upper())
+
+    @classmethod
+    def get_many(cls, tickers: List[str]) -> Dict[str, Any]:
+        """Get stock information for several tickers, collecting per-ticker errors"""
+        symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        found: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        profiles: Dict[str, Any] = {}
+        missing = []
+
+        for symbol in symbols:
+            profile = cls._get_profile(symbol)
+            quote = cls._price_cache.get(symbol)
+            if profile is not None and quote is not None:
+                found[symbol] = {**profile, **quote}
+            else:
+                profiles[symbol] = profile
+                missing.append(symbol)
+
+        # One bulk download for every price we don't have cached
+        quotes = cls._fetch_prices(missing) if missing else {}
+
+        for symbol in missing:
+            quote = quotes.get(symbol)
+            if quote is not None:
+                if profiles[symbol] is not None:
+                    found[symbol] = {**profiles[symbol], **quote}
+                    continue
+            # Fall back to the per-ticker chain only for what the bulk call missed
+            try:
+                found[symbol] = cls.get_stock_info(symbol)
+            except HTTPException as e:
+                last_known = cls.get_last_known(symbol) if e.status_code == 503 else None
+                if last_known is not None:
+                    found[symbol] = last_known
+                else:
+                    errors[symbol] = e.detail
+
+        results: Dict[str, StockInfo] = {}
+        for symbol in symbols:
+            if symbol not in found:
+                continue
+            try:
+                results[symbol] = StockInfo(**found[symbol])
+            except ValidationError:
+                errors[symbol] = f"Stock {symbol} returned invalid data"
+
+        return {"results": results, "errors": errors}
+
+    @classmethod
+    def find_unknown(cls, tickers: List[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Tickers upstream reports as not found, and those it could not check, each with the reason"""
+        symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        # Anything we already hold data for exists; the rest share one bulk price download
+        missing = [s for s in symbols if cls._get_profile(s) is None and cls._last_known.get(s) is None]
+        quotes = cls._fetch_prices(missing) if missing else {}
+        unknown: Dict[str, str] = {}
+        unchecked: Dict[str, str] = {}
+        for symbol in missing:
+            if symbol in quotes:
+                continue
+            try:
+                cls.get_stock_info(symbol)
+            except HTTPException as e:
+                if e.status_code == 404:
+                    unknown[symbol] = e.detail
+                else:
+                    unchecked[symbol] = e.detail
+        return unknown, unchecked
+
+    @classmethod
+    def get_cached_quotes(cls, tickers: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Fresh cached price and volume for every ticker, or None if any is missing"""
+        quotes = {}
+        for ticker in tickers:
+            symbol = ticker.upper()
+            quote = cls._price_cache.get(symbol)
+            if quote is None:
+                return None
+            quotes[symbol] = quote
+        return quotes
+
+    @classmethod
+    def get_fresh_quotes(cls, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fresh cached price and volume for whichever tickers have one"""
+        quotes = {}
+        for ticker in tickers:
+            symbol = ticker.upper()
+            quote = cls._price_cache.get(symbol)
+            if quote is not None:
+                quotes[symbol] = quote
+        return quotes
+
+    @classmethod
+    def get_quotes(cls, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Latest price and volume per ticker; misses share one bulk download"""
+        symbols = list(dict.fromkeys(t.upper() for t in tickers))
+        quotes = {}
+        missing = []
+        for symbol in symbols:
+            quote = cls._price_cache.get(symbol)
+            if quote is not None:
+                quotes[symbol] = quote
+            else:
+                missing.append(symbol)
+        if missing:
+            quotes.update(cls._fetch_prices(missing))
+            # Whatever upstream could not provide falls back to the last known price
+            for symbol in missing:
+                entry = cls._last_known.get(symbol) if symbol not in quotes else None
+                if entry is not None:
+                    quotes[symbol] = {k: entry[0].get(k) for k in PRICE_FIELDS}
+        return quotes
+
+    @classmethod
+    def expiring_prices(cls, tickers: List[str], within: float) -> List[str]:
+        """Tickers whose cached price is missing or expires within the given seconds"""
+        return [t for t in tickers if cls._price_cache.ttl_remaining(t.upper()) <= within]
+
+    @classmethod
+    def expiring_profiles(cls, tickers: List[str], within: float) -> List[str]:
+        """Tickers whose profile is missing or expires within the given seconds in both tiers
+
+        Profiles the durable store still holds (from before a restart, or fetched by another
+        worker) are loaded into memory instead of being reported.
+        """
+        expiring = []
+        for ticker in tickers:
+            symbol = ticker.upper()
+            if cls._profile_cache.ttl_remaining(symbol) > within:
+                continue
+            if cls._load_stored_profile(symbol, within) is None:
+                expiring.append(ticker)
+        return expiring
+
+    @classmethod
+    def refresh_info(cls, ticker: str) -> Dict[str, Any]:
+        """Re-fetch profile and price for one ticker, bypassing the cache"""
+        symbol = ticker.upper()
+        return cls._flight.do(("info", symbol), lambda: cls._refresh_info(symbol))
+
+    @classmethod
+    def refresh_quotes(cls, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Re-download price and volume for every ticker, bypassing the cache"""
+        symbols = list(dict.fromkeys(t.upper() for t in tickers))
+        return cls._fetch_prices(symbols) if symbols else {}
+
+    @classmethod
+    def warm_profiles(cls) -> int:
+        """Fill the in-memory profile tier from the durable store; returns profiles loaded"""
+        loaded = cls._profile_store.load_recent(config.QUOTE_CACHE_MAX_SIZE)
+        for symbol, profile, remaining in loaded:
+            cls._profile_cache.set(symbol, profile, ttl=min(remaining, cls._profile_cache.ttl))
+            cls._notify(symbol, profile)
+        return len(loaded)
+
+    @classmethod
+    def add_listener(cls, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Register a callback for every quote or profile written to the cache"""
+        cls._listeners.append(listener)
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for the price and profile caches"""
+        return {
+            "price": cls._price_cache.stats(),
+            "profile": cls._profile_cache.stats(),
+            "profile_store": cls._profile_store.stats()
+        }
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._price_cache.clear()
+        cls._profile_cache.clear()
+        cls._last_known.clear()
+        cls._changed_at.clear()
+
+    @classmethod
+    def _refresh_info(cls, symbol: str) -> Dict[str, Any]:
+        data = cls._fetch_stock_info(symbol)
+        cls._store(symbol, data)
+        return data
+
+    @classmethod
+    def _refresh_price(cls, symbol: str) -> Dict[str, Any]:
+        quote = cls._fetch_price(symbol)
+        cls._price_cache.set(symbol, quote)
+        cls._remember(symbol, quote)
+        return quote
+
+    @classmethod
+    def _get_profile(cls, symbol: str) -> Optional[Dict[str, Any]]:
+        # Memory first, then the durable tier left by an earlier process
+        profile = cls._profile_cache.get(symbol)
+        if profile is None:
+            profile = cls._load_stored_profile(symbol)
+        return profile
+
+    @classmethod
+    def _load_stored_profile(cls, symbol: str, within: float = 0) -> Optional[Dict[str, Any]]:
+        # Promote a stored profile with more than `within` seconds left into the memory tier
+        stored = cls._profile_store.get(symbol)
+        if stored is None or stored[1] <= within:
+            return None
+        profile, remaining = stored
+        cls._profile_cache.set(symbol, profile, ttl=min(remaining, cls._profile_cache.ttl))
+        cls._notify(symbol, profile)
+        return profile
+
+    @classmethod
+    def _store(cls, symbol: str, data: Dict[str, Any]) -> None:
+        profile = {k: v for k, v in data.items() if k not in PRICE_FIELDS}
+        cls._price_cache.set(symbol, {k: data.get(k) for k in PRICE_FIELDS})
+        cls._profile_cache.set(symbol, profile)
+        cls._profile_store.put(symbol, profile)
+        cls._remember(symbol, data, profile)
+
+    @classmethod
+    def _remember(cls, symbol: str, data: Dict[str, Any], profile: Optional[Dict[str, Any]] = None) -> None:
+        if profile is None:
+            previous = cls._last_known.get(symbol)
+            profile = cls._profile_cache.get(symbol) or (previous[0] if previous else {})
+        cls._last_known.set(symbol, ({**profile, **data}, time.time()))
+        cls._notify(symbol, data)
+
+    @classmethod
+    def _notify(cls, symbol: str, data: Dict[str, Any]) -> None:
+        cls._changed_at.set(symbol, time.time_ns())
+        for listener in cls._listeners:
+            listener(symbol, data)
+
+    @classmethod
+    def _fetch_prices(cls, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get and cache latest price and volume for many tickers in one Yahoo Finance download"""
+        try:
+            data = market_data.call(
+                yf.download, tickers, period="5d", group_by="ticker",
+                auto_adjust=False, progress=False, threads=True
+            )
+        except Exception:
+            # Callers fall back to per-ticker fetches, which fail fast if upstream is down
+            return {}
+
+        if data is None or data.empty:
+            return {}
+
+        quotes = {}
+        for ticker in tickers:
+            try:
+                frame = data[ticker] if ticker in data.columns.get_level_values(0) else data
+                closes = frame['Close'].dropna()
+                if closes.empty:
+                    continue
+                price = float(closes.iloc[-1])
+                volume = frame['Volume'].loc[closes.index[-1]]
+                previous = float(closes.iloc[-2]) if len(closes) > 1 else None
+            except (KeyError, IndexError, ValueError):
+                continue
+            if price > 0:
+                quotes[ticker] = {
+                    "price": price,
+                    "volume": int(volume) if volume == volume else None,
+                    "previous_close": previous
+                }
+                cls._price_cache.set(ticker, quotes[ticker])
+                cls._remember(ticker, quotes[ticker])
+        return quotes
+
+    @staticmethod
+    def _fetch_price(ticker: str) -> Dict[str, Any]:
+        """Get only the latest price and volume from Yahoo Finance"""
+        stock = yf.Ticker(ticker)
+        current_price = None
+        volume = None
+        previous_close = None
+
+        try:
+            fast_info, errors = attempt(lambda: dict(
+                price=stock.fast_info.get('lastPrice') or stock.fast_info.get('regularMarketPrice'),
+                volume=stock.fast_info.get('lastVolume'),
+                previous_close=stock.fast_info.get('previousClose')
+            ))
+            if fast_info:
+                current_price, volume = fast_info["price"], fast_info["volume"]
+                previous_close = fast_info["previous_close"]
+
+            if current_price is None:
+                hist, failed = attempt(lambda: stock.history(period="5d"))
+                errors = errors or failed
+                if hist is not None and not hist.empty:
+                    current_price = hist['Close'].iloc[-1]
+                    volume = hist['Volume'].iloc[-1]
+                    if len(hist) > 1:
+                        previous_close = hist['Close'].iloc[-2]
+        except UpstreamUnavailable as e:
+            raise unavailable(e.retry_after)
+
+        if current_price is None or current_price <= 0:
+            if errors:
+                raise unavailable()
+            raise HTTPException(status_code=404, detail=f"Stock {ticker} not found or data unavailable")
+
+        return {
+            "price": float(current_price),
+            "volume": int(volume) if volume is not None else None,
+            "previous_close": float(previous_close) if previous_close is not None else None
+        }
+
     @staticmethod
-    def get_stock_info(ticker: str) -> Dict[str, Any]:
+    def _fetch_stock_info(ticker: str) -> Dict[str, Any]:
         """Get comprehensive stock information from Yahoo Finance"""
         try:
             stock = yf.Ticker(ticker.upper())
             current_price = None
-            info = {}
 
-            try:
-                info = stock.info
-                if info and len(info) > 1:
-                    current_price = info.get('regularMarketPrice') or info.get('currentPrice') or info.get('previousClose')
-            except:
-                pass
-            
+            # Each step is one guarded upstream call; throttling or an open circuit
+            # aborts the chain instead of burning through every fallback
+            info, errors = attempt(lambda: stock.info)
+            info = info or {}
+            if len(info) > 1:
+                current_price = info.get('regularMarketPrice') or info.get('currentPrice') or info.get('previousClose')
+
             if current_price is None:
-                try:
-                    hist = stock.history(period="5d")
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                except:
-                    pass
-            
+                hist, failed = attempt(lambda: stock.history(period="5d"))
+                errors = errors or failed
+                if hist is not None and not hist.empty:
+                    current_price = hist['Close'].iloc[-1]
+
             if current_price is None:
-                try:
-                    fast_info = stock.fast_info
-                    current_price = fast_info.get('lastPrice') or fast_info.get('regularMarketPrice')
-                except:
-                    pass
-            
+                current_price, failed = attempt(
+                    lambda: stock.fast_info.get('lastPrice') or stock.fast_info.get('regularMarketPrice')
+                )
+                errors = errors or failed
+
             if current_price is None or current_price <= 0:
+                if errors:
+                    raise unavailable()
                 raise ValueError("Stock not found or invalid")
-            
+
             name = (info.get('longName') or info.get('shortName') or ticker.upper())
-            
+
             return {
                 "ticker": ticker.upper(),
                 "name": name,
@@ -59,11 +438,16 @@ class StockService:
                 "forward_pe": info.get('forwardPE'),
                 "beta": info.get('beta'),
                 "volume": info.get('volume'),
+                "previous_close": info.get('regularMarketPreviousClose') or info.get('previousClose'),
                 "average_volume": info.get('averageVolume'),
-                "website": info.get('website', "N/A"),
+                "website": info.get('website'),
                 "short_description": info.get('longBusinessSummary')[:300] + "..." if info.get('longBusinessSummary') else None,
                 "is_etf": info.get('quoteType') == 'ETF'
             }
-            
+
+        except UpstreamUnavailable as e:
+            raise unavailable(e.retry_after)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=404, detail=f"Stock {ticker} not found or data unavailable")
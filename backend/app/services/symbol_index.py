@@ -0,0 +1,220 @@
+import asyncio
+import bisect
+import csv
+import difflib
+import io
+import logging
+import os
+import re
+import time
+import httpx
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Exchange codes used by the NASDAQ Trader otherlisted.txt file
+EXCHANGE_CODES = {
+    "A": "NYSE American",
+    "N": "NYSE",
+    "P": "NYSE Arca",
+    "Z": "Cboe BZX",
+    "V": "IEX",
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_symbol(ticker: str) -> str:
+    """Yahoo-style symbol: upper case, share classes joined with '-' (BRK.B -> BRK-B)"""
+    return ticker.strip().upper().replace(".", "-")
+
+
+def parse_listing(text: str) -> List[Tuple[str, str, str]]:
+    """Parse a NASDAQ Trader pipe file or a ticker,name,exchange CSV into entries"""
+    delimiter = "|" if "|" in text.split("\n", 1)[0] else ","
+    entries = []
+    for row in csv.DictReader(io.StringIO(text), delimiter=delimiter):
+        symbol = row.get("Symbol") or row.get("ACT Symbol") or row.get("ticker")
+        if not symbol or symbol.startswith("File Creation Time"):
+            continue
+        if row.get("Test Issue") == "Y":
+            continue
+        name = row.get("Security Name") or row.get("name") or ""
+        if "Exchange" in row:
+            exchange = EXCHANGE_CODES.get(row["Exchange"], row["Exchange"])
+        else:
+            exchange = row.get("exchange") or "NASDAQ"
+        entries.append((normalize_symbol(symbol), name.strip(), exchange))
+    return entries
+
+
+class _Snapshot(NamedTuple):
+    symbols: List[str]
+    details: Dict[str, Tuple[str, str]]
+    tokens: List[Tuple[str, str]]
+    vocabulary: List[str]
+
+
+class SymbolIndex:
+    """Sorted in-memory symbol universe for instant validation and autocomplete"""
+
+    def __init__(self):
+        self._snapshot = _Snapshot([], {}, [], [])
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._snapshot.symbols)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.symbols)
+
+    def load(self, entries: Iterable[Tuple[str, str, str]], loaded_at: Optional[float] = None) -> None:
+        """Rebuild the index; readers keep the old snapshot until the swap"""
+        details: Dict[str, Tuple[str, str]] = {}
+        for symbol, name, exchange in entries:
+            details.setdefault(symbol, (name, exchange))
+
+        tokens = []
+        for symbol, (name, _) in details.items():
+            tokens.extend((word, symbol) for word in set(_WORD.findall(name.lower())))
+        tokens.sort()
+        vocabulary = sorted({word for word, _ in tokens})
+
+        self._snapshot = _Snapshot(sorted(details), details, tokens, vocabulary)
+        self.loaded_at = loaded_at or time.time()
+
+    def contains(self, ticker: str) -> bool:
+        return normalize_symbol(ticker) in self._snapshot.details
+
+    def get(self, ticker: str) -> Optional[Dict[str, str]]:
+        snapshot = self._snapshot
+        symbol = normalize_symbol(ticker)
+        if symbol not in snapshot.details:
+            return None
+        return _entry(snapshot, symbol)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Symbol prefix, then name-word prefix, then the same with typo-corrected words"""
+        snapshot = self._snapshot
+        symbol = normalize_symbol(query)
+        words = _WORD.findall(query.lower())
+        if not symbol or not snapshot.symbols:
+            return []
+
+        matches: List[str] = []
+
+        def add(candidates: Iterable[str]) -> bool:
+            for candidate in candidates:
+                if candidate not in matches:
+                    matches.append(candidate)
+                    if len(matches) >= limit:
+                        return True
+            return False
+
+        done = add(_prefix(snapshot.symbols, symbol, limit))
+        if not done and words:
+            done = add(_name_prefix(snapshot, words, limit))
+        if not matches and words:
+            # Only pay for fuzzy matching when nothing matched exactly
+            corrected = [_correct(snapshot.vocabulary, word) for word in words]
+            if corrected != words:
+                add(_name_prefix(snapshot, corrected, limit))
+        return [_entry(snapshot, s) for s in matches]
+
+    def load_file(self, path: str) -> bool:
+        """Load a previously downloaded listing; its age counts towards the next refresh"""
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding="utf-8") as f:
+            self.load(parse_listing(f.read()), loaded_at=os.path.getmtime(path))
+        return True
+
+    async def refresh(self, urls: List[str], path: Optional[str] = None) -> bool:
+        """Download listing files, cache them locally and rebuild the index; False if they were empty"""
+        texts = []
+        async with httpx.AsyncClient(timeout=30) as client:
+            for url in urls:
+                response = await client.get(url)
+                response.raise_for_status()
+                texts.append(response.text)
+        entries = [entry for text in texts for entry in parse_listing(text)]
+        if not entries:
+            return False
+        await asyncio.to_thread(self.load, entries)
+        if path:
+            await asyncio.to_thread(_write_listing, path, entries)
+        return True
+
+
+def _entry(snapshot: _Snapshot, symbol: str) -> Dict[str, str]:
+    name, exchange = snapshot.details[symbol]
+    return {"ticker": symbol, "name": name, "exchange": exchange}
+
+
+def _prefix(items: List[str], prefix: str, limit: int) -> List[str]:
+    start = bisect.bisect_left(items, prefix)
+    found = []
+    for item in items[start:start + limit]:
+        if not item.startswith(prefix):
+            break
+        found.append(item)
+    return found
+
+
+def _correct(vocabulary: List[str], word: str) -> str:
+    # Assume the first letter is right so only a slice of the vocabulary is compared
+    start = bisect.bisect_left(vocabulary, word[0])
+    end = bisect.bisect_left(vocabulary, chr(ord(word[0]) + 1))
+    close = difflib.get_close_matches(word, vocabulary[start:end], n=1, cutoff=0.75)
+    return close[0] if close else word
+
+
+def _name_prefix(snapshot: _Snapshot, words: List[str], limit: int) -> List[str]:
+    # The first query word is looked up in the token array; the rest must prefix some name word
+    first, rest = words[0], words[1:]
+    start = bisect.bisect_left(snapshot.tokens, (first, ""))
+    found: List[str] = []
+    for token, symbol in snapshot.tokens[start:]:
+        if not token.startswith(first):
+            break
+        if symbol in found:
+            continue
+        name_words = _WORD.findall(snapshot.details[symbol][0].lower())
+        if all(any(w.startswith(r) for w in name_words) for r in rest):
+            found.append(symbol)
+            if len(found) >= limit * 4:
+                break
+    # Shorter names are usually the primary listing (Apple Inc. before Apple Hospitality REIT)
+    found.sort(key=lambda s: len(snapshot.details[s][0]))
+    return found[:limit]
+
+
+def _write_listing(path: str, entries: List[Tuple[str, str, str]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ticker", "name", "exchange"])
+        writer.writerows(entries)
+    os.replace(tmp_path, path)
+
+
+async def keep_symbol_index_fresh(index: SymbolIndex, urls: List[str], path: str, interval: float) -> None:
+    """Load the local listing copy, then re-download it whenever it is older than interval"""
+    await asyncio.to_thread(index.load_file, path)
+    if not urls:
+        return
+    while True:
+        age = time.time() - (index.loaded_at or 0)
+        if age < interval:
+            await asyncio.sleep(interval - age)
+            continue
+        try:
+            if await index.refresh(urls, path):
+                continue
+            logger.warning("Symbol listing refresh returned no symbols")
+        except Exception as e:
+            logger.warning("Symbol listing refresh failed: %s", e)
+        # Keep serving the current index and retry later rather than spinning
+        await asyncio.sleep(min(interval, 15 * 60))
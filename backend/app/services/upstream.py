@@ -0,0 +1,41 @@
+from fastapi import HTTPException
+from typing import Any, Callable, Tuple
+from yfinance.exceptions import YFPricesMissingError, YFRateLimitError, YFTickerMissingError, YFTzMissingError
+from ..core import config
+from ..core.resilience import CircuitBreaker, TokenBucket, UpstreamGuard, UpstreamUnavailable
+
+# One budget and one breaker for every Yahoo Finance request made by this process
+market_data = UpstreamGuard(
+    "market data",
+    TokenBucket(config.UPSTREAM_RATE_PER_SECOND, config.UPSTREAM_BURST),
+    CircuitBreaker(config.UPSTREAM_BREAKER_FAILURES, config.UPSTREAM_BREAKER_RESET_SECONDS),
+    wait=config.UPSTREAM_RATE_WAIT_SECONDS,
+    # Unknown symbols surface as these (or as malformed payloads), not as outages
+    benign=(
+        YFTickerMissingError, YFPricesMissingError, YFTzMissingError,
+        KeyError, IndexError, TypeError, ValueError, AttributeError
+    )
+)
+
+
+def unavailable(retry_after: float = 1) -> HTTPException:
+    """503 telling the client when it is worth trying again"""
+    return HTTPException(
+        status_code=503,
+        detail="Market data is temporarily unavailable, try again shortly",
+        headers={"Retry-After": str(max(1, round(retry_after)))}
+    )
+
+
+def attempt(fn: Callable[[], Any]) -> Tuple[Any, bool]:
+    """Run one guarded upstream step: (result, failed); fails the whole chain fast when throttled"""
+    try:
+        return market_data.call(fn), False
+    except UpstreamUnavailable:
+        raise
+    except YFRateLimitError:
+        raise UpstreamUnavailable("throttled by upstream", market_data.breaker.reset_timeout)
+    except market_data.benign:
+        return None, False
+    except Exception:
+        return None, True
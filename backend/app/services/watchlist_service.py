@@ -1,65 +1,119 @@
+import time
 from fastapi import HTTPException
-from supabase import Client
-from ..models.watchlist import TickerAdd, WatchlistResponse
-from .stock_service import StockService
+from typing import Any, Dict, List, Tuple
+from ..core import config
+from ..core.etag import version_etag
+from ..models.watchlist import TickerAdd, WatchlistBatch, WatchlistBatchResult, WatchlistQuote, WatchlistResponse
+from ..repositories.database import Database
+from ..repositories.loader import RequestLoader
+from .stock_provider import StockDataProvider
+from .symbol_index import normalize_symbol
 
 
 class WatchlistService:
-    def __init__(self, supabase_client: Client):
-        self.supabase = supabase_client
-        self.stock_service = StockService()
+    def __init__(self, db: Database, stock_provider: StockDataProvider, loader: RequestLoader):
+        self.db = db
+        self.stock_provider = stock_provider
+        self.loader = loader
 
     async def get_watchlist(self, user_id: str) -> WatchlistResponse:
         """Get user's watchlist"""
-        watchlist_response = self.supabase.table("watchlists").select("*").eq("user_id", user_id).execute()
+        watchlist, _ = await self.get_watchlist_with_etag(user_id)
+        return watchlist
+
+    async def get_watchlist_etag(self, user_id: str) -> str:
+        """Current ETag of the user's watchlist, without loading its tickers"""
+        watchlist = await self.db.watchlists.get_version(user_id)
+        if not watchlist:
+            raise HTTPException(status_code=404, detail="Watchlist not found")
+        return version_etag(watchlist)
+
+    async def get_watchlist_with_etag(self, user_id: str) -> Tuple[WatchlistResponse, str]:
+        """Get user's watchlist and the ETag of the version that was read"""
+        watchlist = await self.loader.watchlists.load(user_id)
         
-        if not watchlist_response.data:
+        if not watchlist:
             raise HTTPException(status_code=404, detail="Watchlist not found")
         
-        watchlist = watchlist_response.data[0]
         return WatchlistResponse(
             id=watchlist["id"],
             tickers=watchlist.get("tickers", []),
             created_at=watchlist["created_at"]
+        ), version_etag(watchlist)
+
+    async def get_watchlist_with_quotes(self, user_id: str, deadline: float) -> WatchlistResponse:
+        """Get user's watchlist with a quote per ticker, resolved concurrently within deadline seconds"""
+        started = time.monotonic()
+        watchlist = await self.get_watchlist(user_id)
+        remaining = max(0.0, deadline - (time.monotonic() - started))
+        quotes, pending = await self.stock_provider.get_quotes_within(
+            watchlist.tickers, remaining, config.WATCHLIST_QUOTE_CHUNK_SIZE
         )
+        pending = set(pending)
+
+        rows = []
+        for ticker in watchlist.tickers:
+            quote = quotes.get(ticker.upper(), {})
+            price, previous = quote.get("price"), quote.get("previous_close")
+            change = price - previous if price is not None and previous else None
+            rows.append(WatchlistQuote(
+                ticker=ticker,
+                price=price,
+                change=change,
+                change_percent=change / previous * 100 if change is not None else None,
+                volume=quote.get("volume"),
+                stale=quote.get("stale", False),
+                pending=ticker.upper() in pending,
+                as_of=quote.get("as_of")
+            ))
+        watchlist.quotes = rows
+        return watchlist
 
     async def add_ticker(self, user_id: str, ticker_data: TickerAdd) -> dict:
         """Add a ticker to user's watchlist"""
-        # Validate ticker
-        self.stock_service.get_stock_info(ticker_data.ticker)
+        # Validate the symbol as it will be stored (BRK.B -> BRK-B)
+        ticker_upper = normalize_symbol(ticker_data.ticker)
+        await self.stock_provider.validate_ticker(ticker_upper)
         
-        # Get user's watchlist
-        watchlist_response = self.supabase.table("watchlists").select("*").eq("user_id", user_id).execute()
+        result = await self._edit(user_id, add=[ticker_upper], remove=[])
         
-        if not watchlist_response.data:
-            raise HTTPException(status_code=404, detail="Watchlist not found")
-        
-        watchlist = watchlist_response.data[0]
-        ticker_upper = ticker_data.ticker.upper()
-        current_tickers = watchlist.get("tickers", [])
-        
-        if ticker_upper not in current_tickers:
-            current_tickers.append(ticker_upper)
-            self.supabase.table("watchlists").update({"tickers": current_tickers}).eq("id", watchlist["id"]).execute()
+        if result["added"]:
             return {"message": f"Added {ticker_upper} to watchlist"}
         else:
             return {"message": f"{ticker_upper} already in watchlist"}
 
     async def remove_ticker(self, user_id: str, ticker_data: TickerAdd) -> dict:
         """Remove a ticker from user's watchlist"""
-        # Get user's watchlist
-        watchlist_response = self.supabase.table("watchlists").select("*").eq("user_id", user_id).execute()
+        ticker_upper = normalize_symbol(ticker_data.ticker)
+        result = await self._edit(user_id, add=[], remove=[ticker_upper])
         
-        if not watchlist_response.data:
-            raise HTTPException(status_code=404, detail="Watchlist not found")
-        
-        watchlist = watchlist_response.data[0]
-        ticker_upper = ticker_data.ticker.upper()
-        current_tickers = watchlist.get("tickers", [])
-        
-        if ticker_upper in current_tickers:
-            current_tickers.remove(ticker_upper)
-            self.supabase.table("watchlists").update({"tickers": current_tickers}).eq("id", watchlist["id"]).execute()
+        if result["removed"]:
             return {"message": f"Removed {ticker_upper} from watchlist"}
         else:
             raise HTTPException(status_code=404, detail="Ticker not in watchlist")
+
+    async def edit_tickers(self, user_id: str, batch: WatchlistBatch) -> WatchlistBatchResult:
+        """Remove and add many tickers in one atomic update; unknown tickers are reported, not added"""
+        add = list(dict.fromkeys(normalize_symbol(t) for t in batch.add if t.strip()))
+        remove = list(dict.fromkeys(normalize_symbol(t) for t in batch.remove if t.strip()))
+
+        # Listed symbols validate locally; the rest share chunked bulk lookups, and
+        # upstream trouble fails the whole batch rather than silently dropping tickers
+        index = self.stock_provider.symbol_index
+        unlisted = [ticker for ticker in add if not index.contains(ticker)]
+        errors = await self.stock_provider.find_unknown(unlisted) if unlisted else {}
+
+        result = await self._edit(user_id, add=[t for t in add if t not in errors], remove=remove)
+        return WatchlistBatchResult(
+            tickers=result["tickers"],
+            added=result["added"],
+            removed=result["removed"],
+            errors=errors
+        )
+
+    async def _edit(self, user_id: str, add: List[str], remove: List[str]) -> Dict[str, Any]:
+        result = await self.db.watchlists.edit(user_id, add, remove)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Watchlist not found")
+        self.loader.watchlists.clear(user_id)
+        return result
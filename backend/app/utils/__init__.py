@@ -1,10 +1,31 @@
 from .database import create_tables
-from .dependencies import get_supabase_client, get_auth_service, get_portfolio_service, get_watchlist_service
+from .dependencies import (
+    get_supabase_client,
+    get_database,
+    get_symbol_index,
+    get_stock_provider,
+    get_hash_executor,
+    get_quote_broadcaster,
+    get_prewarmer,
+    get_auth_service,
+    get_current_user,
+    get_portfolio_service,
+    get_watchlist_service,
+    close_dependencies
+)
 
 __all__ = [
     "create_tables",
     "get_supabase_client",
+    "get_database",
+    "get_symbol_index",
+    "get_stock_provider",
+    "get_hash_executor",
+    "get_quote_broadcaster",
+    "get_prewarmer",
     "get_auth_service",
+    "get_current_user",
     "get_portfolio_service", 
-    "get_watchlist_service"
+    "get_watchlist_service",
+    "close_dependencies"
 ]
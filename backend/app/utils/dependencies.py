@@ -1,15 +1,53 @@
+import hmac
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
-from ..services.auth_service import AuthService
+from ..core import config
+from ..core.executor import BoundedExecutor
+from ..repositories.client import PostgrestClient
+from ..repositories.database import Database
+from ..repositories.loader import RequestLoader
+from ..repositories.postgres import postgres_database
+from ..repositories.sqlite import sqlite_database
+from ..services.auth_service import AuthService, PRINCIPAL_FIELDS, security
+from ..services.stock_provider import StockDataProvider
+from ..services.symbol_index import SymbolIndex
+from ..services.history_store import HistoryStore
 from ..services.portfolio_service import PortfolioService
 from ..services.watchlist_service import WatchlistService
+from ..services.quote_stream import QuoteBroadcaster
+from ..services.prewarm import QuotePrewarmer
+from ..services.screener import Screener
+from ..services.stock_service import StockService
 
 load_dotenv()
 
 # Global Supabase client instance
 _supabase_client = None
 
+# Global pooled database instance
+_database = None
+
+# Global symbol universe index
+_symbol_index = None
+
+# Global market data provider instance
+_stock_provider = None
+
+# Global password hashing pool
+_hash_executor = None
+
+# Global live quote poller
+_quote_broadcaster = None
+
+# Global hot-ticker prewarmer
+_prewarmer = None
+
+# Global columnar screener table
+_screener = None
+
 
 def get_supabase_client() -> Client:
     """Get Supabase client instance (singleton pattern)"""
@@ -21,16 +59,170 @@ def get_supabase_client() -> Client:
     return _supabase_client
 
 
-def get_auth_service() -> AuthService:
+def get_database() -> Database:
+    """Get pooled async database instance for the configured backend (singleton pattern)"""
+    global _database
+    if _database is None:
+        if config.DB_BACKEND == "postgres":
+            _database = postgres_database(
+                config.DATABASE_URL,
+                max_size=config.DB_POOL_MAX_CONNECTIONS,
+                statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+                timeout=config.DB_TIMEOUT_SECONDS
+            )
+        elif config.DB_BACKEND == "sqlite":
+            _database = sqlite_database(config.SQLITE_PATH, statement_cache_size=config.DB_STATEMENT_CACHE_SIZE)
+        else:
+            client = PostgrestClient(
+                config.POSTGREST_URL,
+                os.getenv("SUPABASE_KEY"),
+                max_connections=config.DB_POOL_MAX_CONNECTIONS,
+                max_keepalive=config.DB_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=config.DB_KEEPALIVE_EXPIRY_SECONDS,
+                connect_timeout=config.DB_CONNECT_TIMEOUT_SECONDS,
+                timeout=config.DB_TIMEOUT_SECONDS,
+                retries=config.DB_RETRIES,
+                http2=config.DB_HTTP2
+            )
+            _database = Database(client)
+    return _database
+
+
+def get_symbol_index() -> SymbolIndex:
+    """Get symbol index instance (singleton pattern)"""
+    global _symbol_index
+    if _symbol_index is None:
+        _symbol_index = SymbolIndex()
+    return _symbol_index
+
+
+def get_stock_provider() -> StockDataProvider:
+    """Get market data provider instance (singleton pattern)"""
+    global _stock_provider
+    if _stock_provider is None:
+        executor = BoundedExecutor(
+            "stock-data",
+            max_workers=config.STOCK_EXECUTOR_WORKERS,
+            max_queue=config.STOCK_EXECUTOR_MAX_QUEUE
+        )
+        _stock_provider = StockDataProvider(
+            executor,
+            timeout=config.STOCK_FETCH_TIMEOUT_SECONDS,
+            symbol_index=get_symbol_index(),
+            history_store=HistoryStore(
+                config.HISTORY_STORE_PATH,
+                refresh_seconds=config.HISTORY_REFRESH_SECONDS,
+                initial_period=config.HISTORY_INITIAL_PERIOD,
+                max_open=config.HISTORY_MAX_OPEN,
+                max_series=config.SERIES_CACHE_SIZE
+            )
+        )
+    return _stock_provider
+
+
+def get_hash_executor() -> BoundedExecutor:
+    """Get password hashing pool (singleton pattern)"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = BoundedExecutor(
+            "password-hash",
+            max_workers=config.PASSWORD_HASH_WORKERS,
+            max_queue=config.PASSWORD_HASH_MAX_QUEUE,
+            kind=config.PASSWORD_HASH_EXECUTOR
+        )
+    return _hash_executor
+
+
+def get_quote_broadcaster() -> QuoteBroadcaster:
+    """Get live quote poller instance (singleton pattern)"""
+    global _quote_broadcaster
+    if _quote_broadcaster is None:
+        _quote_broadcaster = QuoteBroadcaster(
+            get_stock_provider(),
+            interval=config.QUOTE_STREAM_INTERVAL_SECONDS,
+            max_subscribers=config.QUOTE_STREAM_MAX_SUBSCRIBERS,
+            max_tickers=config.QUOTE_STREAM_MAX_TICKERS
+        )
+    return _quote_broadcaster
+
+
+def get_prewarmer() -> QuotePrewarmer:
+    """Get hot-ticker prewarmer instance (singleton pattern)"""
+    global _prewarmer
+    if _prewarmer is None:
+        _prewarmer = QuotePrewarmer(
+            get_database(),
+            get_stock_provider(),
+            interval=config.PREWARM_INTERVAL_SECONDS,
+            max_tickers=config.PREWARM_MAX_TICKERS,
+            budget=config.PREWARM_UPSTREAM_BUDGET,
+            batch_size=config.QUOTE_BATCH_MAX_TICKERS
+        )
+    return _prewarmer
+
+
+def get_screener() -> Screener:
+    """Get screener table instance, fed by every quote cache write (singleton pattern)"""
+    global _screener
+    if _screener is None:
+        _screener = Screener()
+        StockService.add_listener(_screener.upsert)
+    return _screener
+
+
+def get_request_loader() -> RequestLoader:
+    """Dependency to get the request's loader; FastAPI caches it, so every service in one request shares it"""
+    return RequestLoader(get_database(), principal_columns=",".join(PRINCIPAL_FIELDS))
+
+
+def get_auth_service(loader: RequestLoader = Depends(get_request_loader)) -> AuthService:
     """Dependency to get AuthService instance"""
-    return AuthService(get_supabase_client())
+    return AuthService(get_database(), get_hash_executor(), loader)
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> dict:
+    """Dependency to resolve the authenticated user for protected routes"""
+    return await auth_service.get_current_user(credentials)
+
 
+async def require_ops_access(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> None:
+    """Dependency guarding operational endpoints: the OPS_TOKEN if configured, else any user"""
+    if config.OPS_TOKEN:
+        if not hmac.compare_digest(credentials.credentials.encode(), config.OPS_TOKEN.encode()):
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return
+    await auth_service.get_current_user(credentials)
 
-def get_portfolio_service() -> PortfolioService:
+
+def get_portfolio_service(loader: RequestLoader = Depends(get_request_loader)) -> PortfolioService:
     """Dependency to get PortfolioService instance"""
-    return PortfolioService(get_supabase_client())
+    return PortfolioService(get_database(), get_stock_provider(), loader)
 
 
-def get_watchlist_service() -> WatchlistService:
+def get_watchlist_service(loader: RequestLoader = Depends(get_request_loader)) -> WatchlistService:
     """Dependency to get WatchlistService instance"""
-    return WatchlistService(get_supabase_client())
+    return WatchlistService(get_database(), get_stock_provider(), loader)
+
+
+async def close_dependencies() -> None:
+    """Release pooled connections and worker pools on shutdown"""
+    global _database, _stock_provider, _hash_executor, _quote_broadcaster, _prewarmer
+    _prewarmer = None
+    if _quote_broadcaster is not None:
+        await _quote_broadcaster.close()
+        _quote_broadcaster = None
+    if _database is not None:
+        await _database.close()
+        _database = None
+    if _stock_provider is not None:
+        _stock_provider.executor.shutdown()
+        _stock_provider = None
+    if _hash_executor is not None:
+        _hash_executor.shutdown()
+        _hash_executor = None
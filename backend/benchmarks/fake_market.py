@@ -0,0 +1,140 @@
+"""Deterministic stand-in for the parts of yfinance the services call"""
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Business days of synthetic history generated per symbol
+HISTORY_DAYS = 2600
+
+
+def symbol_universe(count: int) -> List[str]:
+    """Stable fake tickers: S0000, S0001, ..."""
+    return [f"S{i:04d}" for i in range(count)]
+
+
+class FakeMarket:
+    """Seeded prices per symbol, with a fixed sleep standing in for each upstream call"""
+
+    def __init__(self, symbols: List[str], latency: float = 0.0, seed: int = 0):
+        self.symbols = set(symbols)
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._index = pd.bdate_range(end=pd.Timestamp(date.today()), periods=HISTORY_DAYS)
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """Full daily OHLCV history for a symbol; empty for unknown symbols"""
+        if symbol not in self.symbols:
+            return pd.DataFrame(
+                columns=["Open", "High", "Low", "Close", "Volume"],
+                index=pd.DatetimeIndex([], name="Date")
+            )
+        frame = self._frames.get(symbol)
+        if frame is None:
+            # crc32 rather than hash() so prices are identical across processes
+            rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+            close = 20 + 80 * rng.random() * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(self._index))))
+            spread = close * rng.uniform(0, 0.02, len(close))
+            frame = pd.DataFrame({
+                "Open": close + rng.uniform(-1, 1, len(close)) * spread / 2,
+                "High": close + spread,
+                "Low": close - spread,
+                "Close": close,
+                "Volume": rng.integers(1e5, 1e7, len(close)).astype(float)
+            }, index=self._index)
+            with self._lock:
+                self._frames[symbol] = frame
+        return frame
+
+    def upstream_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None, **kwargs) -> pd.DataFrame:
+        self.upstream_call()
+        frame = self.frame(symbol)
+        if start is not None:
+            return frame[frame.index >= pd.Timestamp(start)]
+        return frame
+
+    def download(self, tickers, **kwargs) -> pd.DataFrame:
+        self.upstream_call()
+        if isinstance(tickers, str):
+            tickers = tickers.split()
+        frames = {t: self.frame(t).iloc[-5:] for t in tickers if t in self.symbols}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def ticker(self, symbol: str) -> "FakeTicker":
+        return FakeTicker(self, symbol.upper())
+
+    @contextmanager
+    def patch(self) -> Iterator["FakeMarket"]:
+        """Route yfinance calls made by the services to this fake for the duration"""
+        import yfinance as yf
+
+        saved = (yf.Ticker, yf.download)
+        yf.Ticker = self.ticker
+        yf.download = self.download
+        try:
+            yield self
+        finally:
+            yf.Ticker, yf.download = saved
+
+
+class FakeTicker:
+    def __init__(self, market: FakeMarket, symbol: str):
+        self.market = market
+        self.symbol = symbol
+
+    @property
+    def info(self) -> Dict:
+        self.market.upstream_call()
+        if self.symbol not in self.market.symbols:
+            return {"trailingPegRatio": None}
+        frame = self.market.frame(self.symbol)
+        close = frame["Close"]
+        return {
+            "longName": f"{self.symbol} Holdings Inc.",
+            "sector": "Technology",
+            "industry": "Software",
+            "country": "United States",
+            "exchange": "NMS",
+            "currency": "USD",
+            "regularMarketPrice": float(close.iloc[-1]),
+            "regularMarketPreviousClose": float(close.iloc[-2]) if len(close) > 1 else None,
+            "marketCap": int(close.iloc[-1] * 1e9),
+            "fiftyTwoWeekHigh": float(close.iloc[-252:].max()),
+            "fiftyTwoWeekLow": float(close.iloc[-252:].min()),
+            "volume": int(frame["Volume"].iloc[-1]),
+            "averageVolume": int(frame["Volume"].iloc[-60:].mean()),
+            "beta": 1.0,
+            "website": "https://example.com",
+            "quoteType": "EQUITY"
+        }
+
+    @property
+    def fast_info(self) -> Dict:
+        self.market.upstream_call()
+        if self.symbol not in self.market.symbols:
+            raise KeyError(self.symbol)
+        frame = self.market.frame(self.symbol)
+        return {
+            "lastPrice": float(frame["Close"].iloc[-1]),
+            "lastVolume": int(frame["Volume"].iloc[-1]),
+            "previousClose": float(frame["Close"].iloc[-2]) if len(frame) > 1 else None
+        }
+
+    def history(self, period: Optional[str] = None, start: Optional[str] = None, **kwargs) -> pd.DataFrame:
+        return self.market.history(self.symbol, period=period, start=start, **kwargs)
@@ -0,0 +1,231 @@
+"""In-memory PostgREST stand-in so benchmarks can run the real repositories without Supabase"""
+import asyncio
+import json
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+# Child tables that can be embedded with select=*,child(*)
+EMBEDS = {("portfolios", "positions"): "portfolio_id"}
+
+# Tables with a version column maintained by triggers in the real schema
+VERSIONED = ("portfolios", "watchlists")
+
+# Label of the API route being served; set by the caller so round trips can be attributed
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_list(text: str) -> List[str]:
+    items, buf, quoted, escaped = [], "", False, False
+    for ch in text:
+        if escaped:
+            buf += ch
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif ch == "," and not quoted:
+            items.append(buf)
+            buf = ""
+        else:
+            buf += ch
+    items.append(buf)
+    return items
+
+
+def _matches(row: Dict[str, Any], column: str, expr: str) -> bool:
+    op, _, value = expr.partition(".")
+    current = row.get(column)
+    if op == "eq":
+        return str(current) == value
+    if op == "in":
+        return str(current) in _split_list(value.strip("()"))
+    if op == "gte":
+        return current is not None and current >= type(current)(value)
+    if op == "lte":
+        return current is not None and current <= type(current)(value)
+    raise ValueError(f"Unsupported operator {op}")
+
+
+class FakePostgrest:
+    """In-memory stand-in for the PostgREST subset the repositories use"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = {
+            "users": [], "portfolios": [], "positions": [], "watchlists": []
+        }
+        self.functions: Dict[str, Callable[..., Any]] = dict(DEFAULT_FUNCTIONS)
+        self.requests = 0
+        self.requests_by_route: Counter = Counter()
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle_async)
+
+    async def _handle_async(self, request: httpx.Request) -> httpx.Response:
+        # Simulated network round trip to the database
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.handle(request)
+
+    def _filter(self, table: str, params) -> List[Dict[str, Any]]:
+        rows = self.tables[table]
+        for key, expr in params.multi_items():
+            if key in ("select", "limit", "order", "on_conflict"):
+                continue
+            if key == "or":
+                clauses = _split_list(expr.strip("()"))
+                rows = [r for r in rows if any(
+                    _matches(r, c.split(".", 1)[0], c.split(".", 1)[1].replace('"', "")) for c in clauses
+                )]
+            else:
+                rows = [r for r in rows if _matches(r, key, expr)]
+        return rows
+
+    def _project(self, table: str, rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        out = []
+        for row in rows:
+            item = dict(row)
+            for child, fk in ((c, fk) for (p, c), fk in EMBEDS.items() if p == table):
+                if f"{child}(" in select:
+                    item[child] = [dict(r) for r in self.tables[child] if r[fk] == row["id"]]
+            columns = [c for c in select.split(",") if c and c != "*" and "(" not in c]
+            if columns and "*" not in select.split(","):
+                item = {c: item.get(c) for c in columns}
+            out.append(item)
+        return out
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.requests_by_route[current_route.get()] += 1
+        path = request.url.path.rstrip("/").split("/")
+        params = request.url.params
+        body = json.loads(request.content) if request.content else None
+
+        if len(path) >= 2 and path[-2] == "rpc":
+            result = self.functions[path[-1]](self, **(body or {}))
+            return httpx.Response(200, json=result)
+
+        table = path[-1]
+        if request.method == "GET":
+            rows = self._filter(table, params)
+            if "order" in params:
+                column, _, direction = params["order"].partition(".")
+                rows = sorted(rows, key=lambda r: r.get(column) or "", reverse=direction == "desc")
+            rows = self._project(table, rows, params.get("select", "*"))
+            if "limit" in params:
+                rows = rows[: int(params["limit"])]
+            return httpx.Response(200, json=rows)
+        if request.method == "POST":
+            new_rows = body if isinstance(body, list) else [body]
+            created = []
+            for values in new_rows:
+                row = {"id": str(uuid.uuid4()), "created_at": _now(), **values}
+                if table in VERSIONED:
+                    row.setdefault("version", 0)
+                self.tables[table].append(row)
+                created.append(dict(row))
+            return httpx.Response(201, json=created)
+        if request.method == "PATCH":
+            rows = self._filter(table, params)
+            for row in rows:
+                row.update(body)
+                if table == "watchlists" and "tickers" in body:
+                    row["version"] = row.get("version", 0) + 1
+            return httpx.Response(200, json=[dict(r) for r in rows])
+        if request.method == "DELETE":
+            doomed = {id(r) for r in self._filter(table, params)}
+            self.tables[table] = [r for r in self.tables[table] if id(r) not in doomed]
+            return httpx.Response(204)
+        return httpx.Response(405)
+
+
+def _user_portfolio(db: FakePostgrest, user_id: str):
+    owned = [p for p in db.tables["portfolios"] if p["user_id"] == user_id]
+    return owned[0] if owned else None
+
+
+def rpc_add_position(db: FakePostgrest, p_user_id, p_ticker, p_shares):
+    portfolio = _user_portfolio(db, p_user_id)
+    if portfolio is None:
+        return []
+    portfolio["version"] = portfolio.get("version", 0) + 1
+    for row in db.tables["positions"]:
+        if row["portfolio_id"] == portfolio["id"] and row["ticker"] == p_ticker:
+            row["shares"] += p_shares
+            return [dict(row)]
+    row = {"id": str(uuid.uuid4()), "created_at": _now(), "portfolio_id": portfolio["id"],
+           "ticker": p_ticker, "shares": p_shares}
+    db.tables["positions"].append(row)
+    return [dict(row)]
+
+
+def rpc_remove_position(db: FakePostgrest, p_user_id, p_ticker, p_shares):
+    portfolio = _user_portfolio(db, p_user_id)
+    if portfolio is None:
+        return None
+    portfolio["version"] = portfolio.get("version", 0) + 1
+    for row in db.tables["positions"]:
+        if row["portfolio_id"] == portfolio["id"] and row["ticker"] == p_ticker:
+            if p_shares >= row["shares"]:
+                db.tables["positions"].remove(row)
+                return 0
+            row["shares"] -= p_shares
+            return row["shares"]
+    return None
+
+
+def rpc_import_positions(db: FakePostgrest, p_user_id, p_positions):
+    totals: Dict[str, int] = {}
+    for item in p_positions:
+        totals[item["ticker"].upper()] = totals.get(item["ticker"].upper(), 0) + item["shares"]
+    if _user_portfolio(db, p_user_id) is None:
+        return 0
+    for ticker, shares in totals.items():
+        rpc_add_position(db, p_user_id, ticker, shares)
+    return len(totals)
+
+
+def rpc_edit_watchlist(db: FakePostgrest, p_user_id, p_add, p_remove):
+    owned = [w for w in db.tables["watchlists"] if w["user_id"] == p_user_id]
+    if not owned:
+        return []
+    watchlist = owned[0]
+    current = watchlist.get("tickers") or []
+    kept = [t for t in current if t not in p_remove]
+    removed = sorted(set(p_remove) & set(current))
+    added = [t for t in dict.fromkeys(p_add) if t not in kept]
+    if added or removed:
+        watchlist["tickers"] = kept + added
+        watchlist["version"] = watchlist.get("version", 0) + 1
+    return [{"tickers": watchlist["tickers"], "added": added, "removed": removed, "version": watchlist["version"]}]
+
+
+def rpc_hot_tickers(db: FakePostgrest, p_limit):
+    owners = {p["id"]: p["user_id"] for p in db.tables["portfolios"]}
+    held = {(owners.get(p["portfolio_id"]), p["ticker"]) for p in db.tables["positions"]}
+    held |= {(w["user_id"], t) for w in db.tables["watchlists"] for t in (w.get("tickers") or [])}
+    counts: Dict[str, int] = {}
+    for _, ticker in held:
+        counts[ticker] = counts.get(ticker, 0) + 1
+    ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:p_limit]
+    return [{"ticker": t, "holders": n} for t, n in ranked]
+
+
+DEFAULT_FUNCTIONS = {
+    "add_position": rpc_add_position,
+    "remove_position": rpc_remove_position,
+    "import_positions": rpc_import_positions,
+    "edit_watchlist": rpc_edit_watchlist,
+    "hot_tickers": rpc_hot_tickers,
+}
+
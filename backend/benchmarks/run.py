@@ -0,0 +1,339 @@
+"""
+Load and latency benchmark for the API against fake Supabase and fake market data.
+
+Run from backend/:
+
+    python -m benchmarks.run --concurrency 32 --duration 20 --output bench.json
+    python -m benchmarks.run --baseline bench.json --fail-on-regression
+
+Everything is seeded, so with the same arguments each simulated client issues the
+same request sequence and sees the same prices; only the timings differ.
+
+Each route also reports db_round_trips, the mean number of database requests it made,
+which should not move with timing noise:
+
+    python -m benchmarks.run --concurrency 1 --duration 5 --market-latency-ms 0
+
+--db sqlite runs the same workload against the embedded SQLite backend instead of
+fake PostgREST; there is no simulated latency or round-trip count in that mode.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from itertools import accumulate
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .fake_market import FakeMarket, symbol_universe
+from .fake_postgrest import FakePostgrest, current_route
+
+PASSWORD = "bench-password"
+
+# Relative request frequency per operation; override with --mix name=weight,...
+DEFAULT_MIX = {
+    "login": 1,
+    "research": 20,
+    "research_batch": 4,
+    "history": 3,
+    "portfolio": 12,
+    "portfolio_add": 3,
+    "analytics": 2,
+    "watchlist": 10,
+    "watchlist_add": 2,
+}
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent simulated clients")
+    parser.add_argument("--duration", type=float, default=15, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before measuring")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--symbols", type=int, default=500, help="size of the fake ticker universe")
+    parser.add_argument("--positions", type=int, default=20, help="positions seeded per user")
+    parser.add_argument("--watchlist", type=int, default=10, help="watchlist tickers seeded per user")
+    parser.add_argument("--market-latency-ms", type=float, default=150, help="sleep per fake yfinance call")
+    parser.add_argument("--db", choices=("fake", "sqlite"), default="fake", help="storage backend to run against")
+    parser.add_argument("--db-latency-ms", type=float, default=5, help="sleep per fake database round trip")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--upstream-rate", type=float, default=0, help="market data calls per second (0: unlimited)")
+    parser.add_argument("--mix", default="", help="operation weights, e.g. research=10,login=0")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown before flagging")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, args.mix.split(",")):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            parser.error(f"unknown operation {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight)
+    args.mix = {name: weight for name, weight in mix.items() if weight > 0}
+    return args
+
+
+def configure_environment(args: argparse.Namespace, workdir: str, symbols: List[str]) -> None:
+    """Settings are read at import time, so this must run before the app is imported"""
+    listing = os.path.join(workdir, "symbols.txt")
+    with open(listing, "w") as f:
+        f.write("ticker,name,exchange\n")
+        f.writelines(f"{s},{s} Holdings Inc.,NASDAQ\n" for s in symbols)
+
+    os.environ.update({
+        "SUPABASE_URL": "http://fake-supabase",
+        "SUPABASE_KEY": "bench",
+        "SECRET_KEY": "bench-secret-key-bench-secret-key",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "SYMBOL_LISTING_URLS": "",
+        "SYMBOL_LISTING_PATH": listing,
+        "HISTORY_STORE_PATH": os.path.join(workdir, "history"),
+        "PROFILE_STORE_PATH": os.path.join(workdir, "profiles.sqlite3"),
+        # The fake market never throttles, so by default don't let the limiter skew results
+        "UPSTREAM_RATE_PER_SECOND": str(args.upstream_rate or 1e6),
+        "UPSTREAM_BURST": str(int(args.upstream_rate * 2) or 10 ** 6),
+        "PREWARM_INTERVAL_SECONDS": "0",
+        "ANALYTICS_BENCHMARK": "SPY",
+        "DB_BACKEND": "sqlite" if args.db == "sqlite" else "supabase",
+        "SQLITE_PATH": os.path.join(workdir, "app.sqlite3"),
+    })
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.enabled = False
+
+    def record(self, route: str, seconds: float, status: int) -> None:
+        if self.enabled:
+            self.latencies[route].append(seconds)
+            self.statuses[route][status] += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        routes = {}
+        everything = []
+        for route in sorted(self.latencies):
+            samples = np.array(self.latencies[route]) * 1000
+            everything.append(samples)
+            routes[route] = _latency_summary(samples, duration)
+            routes[route]["errors"] = sum(n for status, n in self.statuses[route].items() if status >= 400)
+            routes[route]["statuses"] = {str(s): n for s, n in sorted(self.statuses[route].items())}
+        total = _latency_summary(np.concatenate(everything) if everything else np.array([]), duration)
+        total["errors"] = sum(r["errors"] for r in routes.values())
+        return {"total": total, "routes": routes}
+
+
+def _latency_summary(samples_ms: np.ndarray, duration: float) -> Dict[str, Any]:
+    if not len(samples_ms):
+        return {"count": 0, "throughput_rps": 0.0}
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        "count": int(len(samples_ms)),
+        "throughput_rps": round(len(samples_ms) / duration, 2),
+        "mean_ms": round(float(samples_ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(samples_ms.max()), 3),
+    }
+
+
+class Workload:
+    """Turns a seeded random stream into concrete requests"""
+
+    def __init__(self, args: argparse.Namespace, symbols: List[str], users: List[Dict[str, str]]):
+        self.users = users
+        self.symbols = symbols
+        # Zipf-like popularity so a few tickers are hot, as in real traffic
+        self.cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(symbols))))
+        self.operations = list(args.mix)
+        self.op_weights = list(accumulate(args.mix.values()))
+
+    def ticker(self, rng: random.Random) -> str:
+        return rng.choices(self.symbols, cum_weights=self.cum_weights)[0]
+
+    def next(self, rng: random.Random) -> Tuple[str, str, str, Dict[str, Any]]:
+        """(route label, method, url, httpx kwargs)"""
+        user = self.users[rng.randrange(len(self.users))]
+        auth = {"headers": {"Authorization": f"Bearer {user['token']}"}}
+        op = rng.choices(self.operations, cum_weights=self.op_weights)[0]
+
+        if op == "login":
+            body = {"username": user["username"], "password": PASSWORD}
+            return "POST /auth/login", "POST", "/auth/login", {"json": body}
+        if op == "research":
+            ticker = self.ticker(rng)
+            return "GET /research/{ticker}", "GET", f"/research/{ticker}", auth
+        if op == "research_batch":
+            tickers = ",".join(dict.fromkeys(self.ticker(rng) for _ in range(10)))
+            return "GET /research", "GET", f"/research?tickers={tickers}", auth
+        if op == "history":
+            ticker = self.ticker(rng)
+            return "GET /research/{ticker}/history", "GET", f"/research/{ticker}/history", auth
+        if op == "portfolio":
+            return "GET /portfolio", "GET", "/portfolio", auth
+        if op == "portfolio_add":
+            body = {"ticker": self.ticker(rng), "shares": rng.randint(1, 50)}
+            return "POST /portfolio/add", "POST", "/portfolio/add", {**auth, "json": body}
+        if op == "analytics":
+            return "GET /portfolio/analytics", "GET", "/portfolio/analytics", auth
+        if op == "watchlist":
+            return "GET /watchlist", "GET", "/watchlist", auth
+        if op == "watchlist_add":
+            body = {"ticker": self.ticker(rng)}
+            return "POST /watchlist/add", "POST", "/watchlist/add", {**auth, "json": body}
+        raise ValueError(op)
+
+
+async def seed_users(client, args: argparse.Namespace, symbols: List[str]) -> List[Dict[str, str]]:
+    rng = random.Random(args.seed)
+
+    async def seed(i: int) -> Dict[str, str]:
+        username = f"bench{i:04d}"
+        r = await client.post("/auth/register", json={
+            "username": username, "email": f"{username}@example.com", "password": PASSWORD
+        })
+        r.raise_for_status()
+        token = r.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        holdings = [{"ticker": t, "shares": 10} for t in rng.sample(symbols, args.positions)]
+        (await client.post("/portfolio/import", json=holdings, headers=headers)).raise_for_status()
+        batch = {"add": rng.sample(symbols, args.watchlist)}
+        (await client.post("/watchlist/batch", json=batch, headers=headers)).raise_for_status()
+        return {"username": username, "token": token}
+
+    return list(await asyncio.gather(*(seed(i) for i in range(args.users))))
+
+
+async def drive(args: argparse.Namespace, symbols: List[str], fake_db: FakePostgrest, market: FakeMarket) -> Dict[str, Any]:
+    import httpx
+    from app.main import app
+    from app.repositories import Database, PostgrestClient
+    from app.utils import dependencies
+
+    if args.db == "fake":
+        dependencies._database = Database(PostgrestClient(
+            "http://fake-supabase/rest/v1", "bench", transport=fake_db.transport()
+        ))
+    recorder = Recorder()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            # Wait for the lifespan task to load the local symbol listing
+            while not len(dependencies.get_symbol_index()):
+                await asyncio.sleep(0.01)
+            users = await seed_users(client, args, symbols)
+            workload = Workload(args, symbols, users)
+            setup_calls, setup_requests = market.calls, fake_db.requests
+
+            async def client_loop(index: int, until: float) -> None:
+                rng = random.Random(args.seed * 100003 + index)
+                while time.perf_counter() < until:
+                    route, method, url, kwargs = workload.next(rng)
+                    # ASGITransport runs the app in this task, so the label reaches the fake database
+                    token = current_route.set(route)
+                    started = time.perf_counter()
+                    try:
+                        response = await client.request(method, url, **kwargs)
+                    finally:
+                        current_route.reset(token)
+                    recorder.record(route, time.perf_counter() - started, response.status_code)
+
+            started = time.perf_counter()
+            until = started + args.warmup + args.duration
+            loops = [asyncio.create_task(client_loop(i, until)) for i in range(args.concurrency)]
+            await asyncio.sleep(args.warmup)
+            recorder.enabled = True
+            measured_from = time.perf_counter()
+            measured_calls, measured_requests = market.calls, fake_db.requests
+            measured_by_route = dict(fake_db.requests_by_route)
+            await asyncio.gather(*loops)
+            duration = time.perf_counter() - measured_from
+
+    report = recorder.summary(duration)
+    if args.db == "fake":
+        for route, summary in report["routes"].items():
+            # Loops finish their in-flight request after the window closes, so this is approximate
+            round_trips = fake_db.requests_by_route[route] - measured_by_route.get(route, 0)
+            summary["db_round_trips"] = round(round_trips / summary["count"], 3) if summary["count"] else 0.0
+    report["upstream"] = {
+        "market_calls": market.calls - measured_calls,
+        "db_requests": fake_db.requests - measured_requests,
+        "setup_market_calls": setup_calls,
+        "setup_db_requests": setup_requests,
+    }
+    report["duration_s"] = round(duration, 3)
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Relative change per route and percentile; anything slower than tolerance is a regression"""
+    routes = {}
+    regressions = []
+    for route, current in {"total": report["total"], **report["routes"]}.items():
+        previous = baseline["total"] if route == "total" else baseline.get("routes", {}).get(route)
+        if not previous or not previous.get("count") or not current.get("count"):
+            continue
+        changes = {}
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            if previous[key]:
+                changes[key] = round(current[key] / previous[key] - 1, 4)
+        routes[route] = changes
+        slower = [k for k in ("p50_ms", "p95_ms", "p99_ms") if changes.get(k, 0) > tolerance]
+        if changes.get("throughput_rps", 0) < -tolerance:
+            slower.append("throughput_rps")
+        if slower:
+            regressions.append({"route": route, "metrics": slower})
+    return {"tolerance": tolerance, "changes": routes, "regressions": regressions}
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    symbols = symbol_universe(args.symbols)
+
+    with tempfile.TemporaryDirectory(prefix="neurovest-bench-") as workdir:
+        configure_environment(args, workdir, symbols)
+        fake_db = FakePostgrest(latency=args.db_latency_ms / 1000)
+        # The analytics benchmark ticker must have history too
+        market = FakeMarket(symbols + ["SPY"], latency=args.market_latency_ms / 1000, seed=args.seed)
+        with market.patch():
+            report = asyncio.run(drive(args, symbols, fake_db, market))
+
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "baseline", "fail_on_regression")
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        **report,
+    }
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        if args.fail_on_regression and report["comparison"]["regressions"]:
+            exit_code = 1
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,122 @@
+"""
+Encoding and compression cost of GET /portfolio for a large portfolio, in process.
+
+Run from backend/:
+
+    python -m benchmarks.serialization --positions 1000 --requests 300
+
+The portfolio service and authentication are replaced by stubs, so each request
+measures only routing, response validation, JSON encoding and compression. The
+"validated-*" variants run response_model validation before encoding, as by
+default; the "trusted-*" variants encode the service output directly. Each is
+run with every installed JSON encoder.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positions", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per variant")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured requests per variant")
+    return parser.parse_args(argv)
+
+
+def portfolio_payload(positions: int) -> Dict[str, Any]:
+    """A portfolio shaped like the database rows PortfolioService passes on"""
+    created = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+    return {
+        "id": "6f1c7f0e-3c1b-4a8e-9a51-6f0a2b1d9c10",
+        "name": "My Portfolio",
+        "created_at": created.isoformat(),
+        "positions": [
+            {
+                "id": f"00000000-0000-4000-8000-{i:012d}",
+                "ticker": f"T{i:04d}",
+                "shares": i % 500 + 1,
+                "created_at": (created + timedelta(minutes=i, microseconds=i)).isoformat()
+            }
+            for i in range(positions)
+        ]
+    }
+
+
+class StubPortfolioService:
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+
+    async def get_portfolio_payload(self, user_id: str) -> Tuple[Dict[str, Any], str]:
+        return self.payload, '"bench.1"'
+
+
+async def measure(client, args: argparse.Namespace, encoding: str) -> Dict[str, Any]:
+    headers = {"Authorization": "Bearer bench", "Accept-Encoding": encoding}
+    samples = []
+    size = 0
+    for i in range(args.warmup + args.requests):
+        started = time.perf_counter()
+        response = await client.get("/portfolio", headers=headers)
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        if i >= args.warmup:
+            samples.append(elapsed * 1000)
+            size = int(response.headers.get("content-length", len(response.content)))
+    samples = np.array(samples)
+    p50, p95 = np.percentile(samples, [50, 95])
+    return {
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "bytes": size,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from app.core import compression, config, responses
+    from app.main import app
+    from app.utils.dependencies import get_current_user, get_portfolio_service
+
+    service = StubPortfolioService(portfolio_payload(args.positions))
+    app.dependency_overrides[get_current_user] = lambda: {"id": "bench", "username": "bench"}
+    app.dependency_overrides[get_portfolio_service] = lambda: service
+
+    encoders = ["json"]
+    if responses.ORJSON_AVAILABLE:
+        encoders.append("orjson")
+    if responses.MSGSPEC_AVAILABLE:
+        encoders.append("msgspec")
+    variants = [
+        (f"{mode}-{encoder}", mode == "trusted", encoder)
+        for mode in ("validated", "trusted") for encoder in encoders
+    ]
+    encodings = ["identity", "gzip"] + (["br"] if compression.BROTLI_AVAILABLE else [])
+
+    results: Dict[str, Dict[str, Any]] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, trusted, encoder in variants:
+            config.TRUST_SERVICE_OUTPUT = trusted
+            responses.render_json = responses._json_encoder(encoder)
+            results[name] = {encoding: await measure(client, args, encoding) for encoding in encodings}
+    app.dependency_overrides.clear()
+    return results
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    report = {"config": vars(args), "results": asyncio.run(run(args))}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
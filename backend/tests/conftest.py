@@ -0,0 +1,66 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Settings are read when app.core.config is imported, so the app must be configured first:
+# an embedded SQLite database, a local symbol listing and no background network access
+_workdir = tempfile.mkdtemp(prefix="portfolio-tests-")
+LISTED = ("AAPL", "BRK-B", "MSFT", "NVDA", "SPY")
+with open(os.path.join(_workdir, "symbols.txt"), "w") as f:
+    f.write("ticker,name,exchange\n")
+    f.writelines(f"{s},{s} Holdings Inc.,NASDAQ\n" for s in LISTED)
+
+os.environ.update({
+    "SUPABASE_URL": "http://supabase.invalid",
+    "SUPABASE_KEY": "test",
+    "SECRET_KEY": "test-secret-key-test-secret-key-test",
+    "BCRYPT_ROUNDS": "4",
+    "DB_BACKEND": "sqlite",
+    "SQLITE_PATH": os.path.join(_workdir, "app.sqlite3"),
+    "SYMBOL_LISTING_URLS": "",
+    "SYMBOL_LISTING_PATH": os.path.join(_workdir, "symbols.txt"),
+    "HISTORY_STORE_PATH": os.path.join(_workdir, "history"),
+    "PROFILE_STORE_PATH": os.path.join(_workdir, "profiles.sqlite3"),
+    "PREWARM_INTERVAL_SECONDS": "0",
+    "OPS_TOKEN": "",
+})
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def auth(client):
+    """Authorization headers for a newly registered user"""
+    username = f"user{uuid.uuid4().hex[:12]}"
+    response = client.post("/auth/register", json={
+        "username": username, "email": f"{username}@example.com", "password": "correct horse"
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """Stand-in for upstream ticker checks: Z* tickers do not exist, DOWN* ones time out"""
+    from fastapi import HTTPException
+    from app.services.stock_service import StockService
+
+    checked = []
+
+    def find_unknown(tickers):
+        checked.append(list(tickers))
+        if any(t.startswith("DOWN") for t in tickers):
+            raise HTTPException(status_code=503, detail="Market data is temporarily unavailable")
+        return {t: f"Stock {t} not found" for t in tickers if t.startswith("Z")}, {}
+
+    monkeypatch.setattr(StockService, "find_unknown", staticmethod(find_unknown))
+    return checked
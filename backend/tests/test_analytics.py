@@ -0,0 +1,51 @@
+import numpy as np
+
+from app.services import analytics
+
+
+def test_align_closes_leaves_gaps_for_missing_bars():
+    calendar = np.array(["2024-01-02", "2024-01-03", "2024-01-04"], dtype="datetime64[D]")
+    histories = {
+        "AAA": {"date": calendar.copy(), "close": np.array([1.0, 2.0, 3.0])},
+        "BBB": {"date": calendar[[0, 2]], "close": np.array([10.0, 30.0])},
+    }
+    prices = analytics.align_closes(histories, ["AAA", "BBB", "CCC"], calendar)
+    np.testing.assert_array_equal(prices[:, 0], [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(prices[:, 1], [10.0, np.nan, 30.0])
+    assert np.isnan(prices[:, 2]).all()
+
+
+def test_forward_fill_carries_last_price():
+    prices = np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, np.nan], [4.0, 5.0]])
+    filled = analytics.forward_fill(prices)
+    np.testing.assert_array_equal(filled[:, 0], [np.nan, 2.0, 2.0, 4.0])
+    np.testing.assert_array_equal(filled[:, 1], [1.0, 1.0, 1.0, 5.0])
+
+
+def test_simple_returns_are_zero_without_a_price():
+    prices = np.array([[np.nan, 100.0], [10.0, 110.0], [11.0, 99.0]])
+    returns = analytics.simple_returns(prices)
+    np.testing.assert_allclose(returns, [[0.0, 0.1], [0.1, -0.1]])
+
+
+def test_portfolio_metrics_against_benchmark():
+    rng = np.random.default_rng(1)
+    benchmark = rng.normal(0, 0.01, 250)
+    returns = np.column_stack((benchmark, 2 * benchmark))
+    weights = np.array([0.5, 0.5])
+    metrics = analytics.portfolio_metrics(returns, benchmark, weights)
+    np.testing.assert_allclose(metrics["position_beta"], [1.0, 2.0])
+    assert abs(metrics["beta"] - 1.5) < 1e-9
+    expected = (returns @ weights).std(ddof=1) * np.sqrt(analytics.TRADING_DAYS)
+    assert abs(metrics["volatility"] - expected) < 1e-12
+    np.testing.assert_allclose(metrics["correlation"], np.ones((2, 2)))
+
+
+def test_portfolio_metrics_needs_two_observations():
+    metrics = analytics.portfolio_metrics(np.zeros((1, 2)), None, np.array([0.5, 0.5]))
+    assert metrics["volatility"] is None and metrics["beta"] is None
+
+
+def test_to_json_list_drops_non_finite_values():
+    assert analytics.to_json_list(np.array([1.5, np.nan, np.inf, -np.inf])) == [1.5, None, None, None]
+
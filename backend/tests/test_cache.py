@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core import cache
+from app.core.cache import SingleFlight, TTLCache
+from app.services.stock_service import StockService
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2, ttl=5)
+    clock.now += 10
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.ttl_remaining("a") == 50
+    clock.now += 50
+    assert ttl_cache.get("a", "gone") == "gone"
+    assert ttl_cache.stats()["expirations"] == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    ttl_cache = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("b") is None
+    assert (ttl_cache.get("a"), ttl_cache.get("c")) == (1, 3)
+    stats = ttl_cache.stats()
+    assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 3, 1)
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "quote"
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        futures = [pool.submit(flight.do, "AAPL", fetch) for _ in range(20)]
+        time.sleep(0.1)
+        release.set()
+        assert [f.result() for f in futures] == ["quote"] * 20
+    assert len(calls) == 1
+
+
+def test_single_flight_shares_errors_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("AAPL", fail)
+    assert flight.do("AAPL", lambda: "retried") == "retried"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Counts upstream fetches made through StockService"""
+    calls = {"info": 0, "price": 0}
+
+    def fetch_info(ticker):
+        calls["info"] += 1
+        time.sleep(0.05)
+        return {"ticker": ticker, "name": f"{ticker} Inc.", "sector": "Technology", "price": 10.0, "volume": 1, "previous_close": 9.0}
+
+    def fetch_price(ticker):
+        calls["price"] += 1
+        return {"price": 11.0, "volume": 2, "previous_close": 10.0}
+
+    StockService.clear_cache()
+    monkeypatch.setattr(StockService, "_fetch_stock_info", staticmethod(fetch_info))
+    monkeypatch.setattr(StockService, "_fetch_price", staticmethod(fetch_price))
+    monkeypatch.setattr(StockService._profile_store, "get", lambda symbol: None)
+    monkeypatch.setattr(StockService._profile_store, "put", lambda symbol, profile: None)
+    yield calls
+    StockService.clear_cache()
+
+
+def test_concurrent_lookups_make_one_upstream_fetch(upstream):
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        results = list(pool.map(StockService.get_stock_info, ["aapl"] * 200))
+    assert upstream == {"info": 1, "price": 0}
+    assert all(result["price"] == 10.0 for result in results)
+
+
+def test_expired_price_refetches_only_the_price(upstream):
+    StockService.get_stock_info("AAPL")
+    StockService._price_cache.delete("AAPL")
+    info = StockService.get_stock_info("AAPL")
+    assert upstream == {"info": 1, "price": 1}
+    assert (info["name"], info["price"]) == ("AAPL Inc.", 11.0)
@@ -0,0 +1,61 @@
+import pytest
+
+from app.services.stock_service import StockService
+
+QUOTE = {
+    "ticker": "AAPL",
+    "name": "Apple Inc.",
+    "sector": "Technology",
+    "industry": "Consumer Electronics",
+    "country": "United States",
+    "exchange": "NMS",
+    "currency": "USD",
+    "price": 190.0,
+    "volume": 1000,
+    "previous_close": 188.0,
+    "is_etf": False,
+}
+
+
+@pytest.fixture
+def cached_quote():
+    # Seed the quote cache so requests never reach upstream
+    StockService._store("AAPL", dict(QUOTE))
+    yield
+    StockService.clear_cache()
+
+
+def test_research_conditional_get(client, auth, cached_quote):
+    first = client.get("/research/aapl", headers=auth)
+    assert first.status_code == 200
+    assert first.json()["price"] == 190.0
+    etag = first.headers["etag"]
+    assert client.get("/research/AAPL", headers={**auth, "If-None-Match": etag}).status_code == 304
+    assert client.get("/research/AAPL", headers={**auth, "If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+    # A new quote landing in the cache changes the tag
+    StockService._store("AAPL", {**QUOTE, "price": 191.0})
+    changed = client.get("/research/AAPL", headers={**auth, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["price"] == 191.0
+    assert changed.headers["etag"] != etag
+
+
+
+def test_portfolio_conditional_get(client, auth):
+    first = client.get("/portfolio", headers=auth)
+    etag = first.headers["etag"]
+    assert client.get("/portfolio", headers={**auth, "If-None-Match": etag}).status_code == 304
+
+    client.post("/portfolio/add", json={"ticker": "MSFT", "shares": 2}, headers=auth)
+    changed = client.get("/portfolio", headers={**auth, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert client.get("/portfolio", headers={**auth, "If-None-Match": changed.headers["etag"]}).status_code == 304
+
+
+def test_watchlist_conditional_get(client, auth):
+    etag = client.get("/watchlist", headers=auth).headers["etag"]
+    assert client.get("/watchlist", headers={**auth, "If-None-Match": etag}).status_code == 304
+    client.post("/watchlist/add", json={"ticker": "AAPL"}, headers=auth)
+    assert client.get("/watchlist", headers={**auth, "If-None-Match": etag}).status_code == 200
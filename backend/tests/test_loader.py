@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.repositories.loader import BatchLoader
+from app.repositories.portfolios import PortfolioRepository
+from app.repositories.watchlists import WatchlistRepository
+
+
+def test_keys_requested_together_share_one_batch():
+    batches = []
+
+    async def fetch(keys):
+        batches.append(sorted(keys))
+        return {key: {"id": key} for key in keys if key != "missing"}
+
+    async def scenario():
+        loader = BatchLoader(fetch)
+        first = await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"), loader.load("missing"))
+        again = await loader.load("a")
+        loader.clear("a")
+        reloaded = await loader.load("a")
+        return first, again, reloaded
+
+    first, again, reloaded = asyncio.run(scenario())
+    assert first == [{"id": "a"}, {"id": "b"}, {"id": "a"}, None]
+    assert again == reloaded == {"id": "a"}
+    assert batches == [["a", "b", "missing"], ["a"]]
+
+
+def test_failed_batches_are_retried():
+    calls = []
+
+    async def fetch(keys):
+        calls.append(keys)
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        return {key: {"id": key} for key in keys}
+
+    async def scenario():
+        loader = BatchLoader(fetch)
+        with pytest.raises(RuntimeError):
+            await loader.load("a")
+        return await loader.load("a")
+
+    assert asyncio.run(scenario()) == {"id": "a"}
+
+
+class FakeClient:
+    """PostgREST client returning rows already in the requested created_at order"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = []
+
+    async def select(self, table, params):
+        self.params.append(params)
+        return sorted(self.rows, key=lambda row: row["created_at"])
+
+
+@pytest.mark.parametrize("repository, method", [
+    (PortfolioRepository, "get_many_with_positions"),
+    (WatchlistRepository, "get_many_by_user_id"),
+])
+def test_batched_lookups_keep_each_users_oldest_row(repository, method):
+    client = FakeClient([
+        {"id": "newer", "user_id": "u1", "created_at": "2024-02-01T00:00:00Z"},
+        {"id": "older", "user_id": "u1", "created_at": "2024-01-01T00:00:00Z"},
+        {"id": "only", "user_id": "u2", "created_at": "2024-03-01T00:00:00Z"},
+    ])
+    found = asyncio.run(getattr(repository(client), method)(["u1", "u2"]))
+    assert {user: row["id"] for user, row in found.items()} == {"u1": "older", "u2": "only"}
+    assert client.params[0]["order"] == "created_at.asc"
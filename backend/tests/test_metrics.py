@@ -0,0 +1,27 @@
+def test_stats_and_metrics_require_authentication(client, auth):
+    assert client.get("/stats").status_code in (401, 403)
+    assert client.get("/metrics").status_code in (401, 403)
+    stats = client.get("/stats", headers=auth)
+    assert stats.status_code == 200
+    assert "path" not in stats.json()["quote_cache"]["profile_store"]
+
+
+def test_metrics_record_request_latency(client, auth):
+    client.get("/", headers=auth)
+    response = client.get("/metrics", headers=auth)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/"' in response.text
+
+
+def test_server_timing_header(client, auth):
+    response = client.get("/portfolio", headers=auth)
+    assert "db;dur=" in response.headers.get("server-timing", "")
+
+
+def test_ops_token_replaces_user_tokens(client, auth, monkeypatch):
+    from app.core import config
+
+    monkeypatch.setattr(config, "OPS_TOKEN", "scraper-token")
+    assert client.get("/metrics", headers=auth).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scraper-token"}).status_code == 200
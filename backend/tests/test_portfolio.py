@@ -0,0 +1,71 @@
+import pytest
+
+from app.services.portfolio_service import parse_positions_csv
+
+
+def test_parse_positions_csv_strips_bom_and_keeps_columns():
+    rows = parse_positions_csv("\ufeffSymbol,Quantity\nAAPL,10\nmsft,\"1,200\"\n")
+    assert rows == [{"Symbol": "AAPL", "Quantity": "10"}, {"Symbol": "msft", "Quantity": "1,200"}]
+
+
+def test_parse_positions_csv_empty_body():
+    assert parse_positions_csv("") == []
+
+
+def holdings(client, auth):
+    response = client.get("/portfolio", headers=auth)
+    assert response.status_code == 200
+    return {p["ticker"]: p["shares"] for p in response.json()["positions"]}
+
+
+def test_import_csv_reports_bad_rows_and_sums_duplicates(client, auth, market):
+    body = "Symbol,Quantity\nAAPL,10\nmsft,\"1,200\"\nAAPL,5\nZZZZ,3\n$$$,1\nNVDA,-2\n"
+    response = client.post("/portfolio/import", content=body, headers={**auth, "Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["imported"] == 3
+    assert [(e["row"], e["error"]) for e in result["errors"]] == [
+        (4, "Unknown ticker ZZZZ"),
+        (5, "Invalid ticker '$$$'"),
+        (6, "Shares must be a positive whole number"),
+    ]
+    # Only the unlisted ticker went upstream
+    assert market == [["ZZZZ"]]
+    assert holdings(client, auth) == {"AAPL": 15, "MSFT": 1200}
+
+
+def test_import_adds_to_existing_positions(client, auth, market):
+    client.post("/portfolio/add", json={"ticker": "AAPL", "shares": 1}, headers=auth)
+    response = client.post("/portfolio/import", json={"positions": [{"ticker": "AAPL", "shares": 4}]}, headers=auth)
+    assert response.status_code == 200
+    assert holdings(client, auth) == {"AAPL": 5}
+
+
+def test_import_fails_when_upstream_cannot_check_tickers(client, auth, market):
+    rows = [{"ticker": "AAPL", "shares": 1}, {"ticker": "DOWNX", "shares": 1}]
+    response = client.post("/portfolio/import", json=rows, headers=auth)
+    assert response.status_code == 503
+    assert holdings(client, auth) == {}
+
+
+def test_import_rejects_bodies_that_are_not_utf8(client, auth):
+    response = client.post("/portfolio/import", content=b"ticker,shares\n\xff\xfe,1\n", headers={**auth, "Content-Type": "text/csv"})
+    assert response.status_code == 400
+
+
+
+@pytest.mark.parametrize("shares", ["inf", "1e400", "nan", "3000000000"])
+def test_import_reports_out_of_range_share_counts(client, auth, market, shares):
+    body = f"ticker,shares\nAAPL,{shares}\nMSFT,2\n"
+    response = client.post("/portfolio/import", content=body, headers={**auth, "Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["imported"] == 1
+    assert [error["row"] for error in result["errors"]] == [1]
+    assert holdings(client, auth) == {"MSFT": 2}
+
+
+def test_add_rejects_share_counts_beyond_the_column_range(client, auth):
+    for route in ("/portfolio/add", "/portfolio/remove"):
+        response = client.post(route, json={"ticker": "AAPL", "shares": 2 ** 31}, headers=auth)
+        assert response.status_code == 422
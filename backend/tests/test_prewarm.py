@@ -0,0 +1,61 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.prewarm import QuotePrewarmer
+from app.services.stock_service import StockService
+
+
+class FakeTickers:
+    def __init__(self, tickers):
+        self.tickers = tickers
+
+    async def hot(self, limit):
+        return [{"ticker": ticker, "holders": 1} for ticker in self.tickers[:limit]]
+
+
+class FakeProvider:
+    def __init__(self):
+        self.quote_batches = []
+        self.profiles = []
+
+    async def refresh_quotes(self, tickers):
+        self.quote_batches.append(list(tickers))
+        return {ticker: {"price": 1.0} for ticker in tickers}
+
+    async def refresh_stock_info(self, ticker):
+        self.profiles.append(ticker)
+        return {"ticker": ticker}
+
+
+@pytest.fixture
+def caches():
+    StockService.clear_cache()
+    yield
+    StockService.clear_cache()
+
+
+def prewarmer(tickers, provider, budget=10):
+    db = SimpleNamespace(tickers=FakeTickers(tickers))
+    return QuotePrewarmer(db, provider, interval=45, max_tickers=100, budget=budget, batch_size=2)
+
+
+def test_profiles_on_disk_are_loaded_instead_of_refetched(caches):
+    # As after a restart: the durable tier has the profile, memory does not
+    StockService._profile_store.put("DISK", {"ticker": "DISK", "name": "Disk Corp"})
+    provider = FakeProvider()
+    asyncio.run(prewarmer(["DISK", "GONE"], provider).run_once())
+
+    assert provider.profiles == ["GONE"]
+    assert StockService._profile_cache.get("DISK")["name"] == "Disk Corp"
+
+
+def test_prices_come_first_and_the_budget_caps_upstream_calls(caches):
+    provider = FakeProvider()
+    warmer = prewarmer(["A1", "A2", "A3", "A4", "A5"], provider, budget=2)
+    asyncio.run(warmer.run_once())
+
+    assert provider.quote_batches == [["A1", "A2"], ["A3", "A4"]]
+    assert provider.profiles == []
+    assert warmer.stats()["over_budget"] == 1 + 5
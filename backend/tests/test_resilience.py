@@ -0,0 +1,86 @@
+import pytest
+
+from app.core import resilience
+from app.core.resilience import CircuitBreaker, TokenBucket, UpstreamGuard, UpstreamUnavailable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def fail(exception):
+    raise exception
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 1
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+
+def test_breaker_lets_one_probe_through_after_reset(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    # A failed probe reopens the circuit at once
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_guard_fails_fast_while_open(clock):
+    guard = UpstreamGuard("test", TokenBucket(1000, 1000), CircuitBreaker(2, 30), wait=0)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            guard.call(fail, RuntimeError("down"))
+    with pytest.raises(UpstreamUnavailable):
+        guard.call(lambda: "never called")
+    assert guard.stats()["rejected"] == 1
+    assert guard.stats()["circuit"] == CircuitBreaker.OPEN
+
+
+def test_benign_errors_do_not_reset_failures(clock):
+    guard = UpstreamGuard("test", TokenBucket(1000, 1000), CircuitBreaker(3, 30), wait=0, benign=(KeyError,))
+    for exception in (RuntimeError(), KeyError(), RuntimeError(), KeyError(), RuntimeError()):
+        with pytest.raises(type(exception)):
+            guard.call(fail, exception)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    assert guard.failures == 3
+
+
+def test_rate_limit_rejects_once_the_burst_is_spent(clock):
+    guard = UpstreamGuard("test", TokenBucket(rate=1, burst=2), CircuitBreaker(5, 30), wait=0)
+    assert guard.call(lambda: 1) == 1
+    assert guard.call(lambda: 2) == 2
+    with pytest.raises(UpstreamUnavailable):
+        guard.call(lambda: 3)
+    clock.now += 1
+    assert guard.call(lambda: 4) == 4
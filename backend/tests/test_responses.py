@@ -0,0 +1,27 @@
+from app.core import config, responses
+
+
+def test_database_row_routes_use_the_configured_encoder_with_validation_on(client, auth, monkeypatch):
+    encoded = []
+
+    def render(content):
+        encoded.append(content)
+        return responses._json_encoder("json")(content)
+
+    monkeypatch.setattr(config, "TRUST_SERVICE_OUTPUT", False)
+    monkeypatch.setattr(responses, "render_json", render)
+
+    for path in ("/portfolio", "/watchlist"):
+        response = client.get(path, headers=auth)
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["id"]
+    assert len(encoded) == 2
+
+
+def test_trusted_output_keeps_the_etag(client, auth, monkeypatch):
+    monkeypatch.setattr(config, "TRUST_SERVICE_OUTPUT", True)
+    response = client.get("/portfolio", headers=auth)
+    assert response.status_code == 200
+    assert response.json()["positions"] == []
+    assert client.get("/portfolio", headers={**auth, "If-None-Match": response.headers["etag"]}).status_code == 304
@@ -0,0 +1,38 @@
+import numpy as np
+
+from app.services import analytics
+
+
+def test_covariance_factor_reproduces_covariance():
+    returns = np.random.default_rng(2).normal(0, 0.02, (300, 4))
+    factor = analytics.covariance_factor(returns)
+    np.testing.assert_allclose(factor @ factor.T, np.cov(returns, rowvar=False), atol=1e-12)
+
+
+def test_value_at_risk_is_a_positive_loss():
+    pnl = np.arange(-50.0, 50.0)[:, None]
+    var, cvar = analytics.value_at_risk(pnl, 0.95)
+    assert 44 < var[0] < 46
+    assert cvar[0] >= var[0]
+
+
+def test_covariance_factor_with_fewer_observations_than_tickers():
+    returns = np.random.default_rng(3).normal(0, 0.02, (3, 5))
+    factor = analytics.covariance_factor(returns)
+    np.testing.assert_allclose(factor @ factor.T, np.cov(returns, rowvar=False), atol=1e-12)
+
+
+def test_simulate_pnl_shape_and_scaling():
+    factor = np.array([[0.01, 0.0], [0.0, 0.02]])
+    values = np.array([[1000.0, 0.0], [0.0, 1000.0]])
+    pnl = analytics.simulate_pnl(factor, values, [1, 10], 20000, np.random.default_rng(4), budget=10)
+    assert pnl.shape == (20000, 2, 2)
+    std = np.log1p(pnl / 1000).std(axis=0)
+    np.testing.assert_allclose(std[:, 0], [0.01, 0.02], rtol=0.05)
+    np.testing.assert_allclose(std[:, 1], np.array([0.01, 0.02]) * np.sqrt(10), rtol=0.05)
+
+
+def test_simulate_pnl_stops_at_the_time_budget():
+    factor = np.eye(3) * 0.01
+    pnl = analytics.simulate_pnl(factor, np.ones((3, 1)), [1], 100000, np.random.default_rng(5), budget=0, chunk_size=1000)
+    assert len(pnl) == 1000
@@ -0,0 +1,37 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.screener import Screener, parse_filter
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("pe_ratio<20", ("pe_ratio", "<", 20.0)),
+    ("market_cap >= 10B", ("market_cap", ">=", 1e10)),
+    ("Volume>1.5m", ("volume", ">", 1.5e6)),
+    ("eps!=-0.5", ("eps", "!=", -0.5)),
+    ("beta = 1e0", ("beta", "=", 1.0)),
+])
+def test_parse_filter(expression, expected):
+    assert parse_filter(expression) == expected
+
+
+@pytest.mark.parametrize("expression", ["", "pe_ratio", "pe_ratio<<20", "name=Apple", "price<abc", "price<10x"])
+def test_parse_filter_rejects_malformed_expressions(expression):
+    with pytest.raises(HTTPException) as error:
+        parse_filter(expression)
+    assert error.value.status_code == 400
+
+
+def test_screen_filters_sorts_and_skips_missing_values():
+    screener = Screener(capacity=2)
+    screener.upsert("AAA", {"name": "Alpha", "sector": "Technology", "market_cap": 3e12, "pe_ratio": 30})
+    screener.upsert("BBB", {"name": "Beta", "sector": "technology", "market_cap": 5e11, "pe_ratio": 12})
+    screener.upsert("CCC", {"name": "Gamma", "sector": "Energy", "market_cap": 8e11, "pe_ratio": None})
+
+    result = screener.screen([parse_filter("market_cap>100B")], {"sector": ["TECHNOLOGY"]}, sort="pe_ratio", descending=False)
+    assert result["universe"] == 3
+    assert [row["ticker"] for row in result["results"]] == ["BBB", "AAA"]
+
+    # Unknown values never match a numeric filter
+    result = screener.screen([parse_filter("pe_ratio<100")], {})
+    assert {row["ticker"] for row in result["results"]} == {"AAA", "BBB"}
@@ -0,0 +1,106 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services.series import aggregate, build_series, lttb, ohlc_buckets, range_start
+
+
+def make_columns(n, start="2020-01-01"):
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return {
+        "date": np.arange(np.datetime64(start, "D"), np.datetime64(start, "D") + n),
+        "open": close - 0.5,
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": np.arange(1, n + 1, dtype=np.int64),
+    }
+
+
+def reference_lttb(x, y, points):
+    # Straightforward per-bucket implementation of Steinarsson's algorithm
+    n = len(x)
+    every = (n - 2) / (points - 2)
+    keep = [0]
+    a = 0
+    for i in range(points - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        next_lo, next_hi = hi, min(int((i + 2) * every) + 1, n)
+        if i == points - 3:
+            hi, next_lo, next_hi = n - 1, n - 1, n
+        cx, cy = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        areas = [abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a])) for j in range(lo, hi)]
+        a = lo + int(np.argmax(areas))
+        keep.append(a)
+    keep.append(n - 1)
+    return np.array(keep)
+
+
+@pytest.mark.parametrize("last, period, expected", [
+    (date(2024, 3, 31), "1mo", date(2024, 2, 29)),
+    (date(2024, 3, 15), "1y", date(2023, 3, 15)),
+    (date(2024, 1, 10), "3mo", date(2023, 10, 10)),
+    (date(2024, 6, 5), "ytd", date(2024, 1, 1)),
+    (date(2024, 6, 5), "max", None),
+])
+def test_range_start(last, period, expected):
+    assert range_start(last, period) == expected
+
+
+def test_aggregate_collapses_runs_into_ohlcv_bars():
+    columns = make_columns(6)
+    bars = aggregate(columns, np.array([0, 2, 5]))
+    assert bars["date"].tolist() == columns["date"][[0, 2, 5]].tolist()
+    assert bars["open"].tolist() == columns["open"][[0, 2, 5]].tolist()
+    assert bars["close"].tolist() == columns["close"][[1, 4, 5]].tolist()
+    assert bars["high"][1] == columns["high"][2:5].max()
+    assert bars["low"][1] == columns["low"][2:5].min()
+    assert bars["volume"].tolist() == [1 + 2, 3 + 4 + 5, 6]
+
+
+def test_ohlc_buckets_keeps_totals_and_extremes():
+    columns = make_columns(1000)
+    bars = ohlc_buckets(columns, 120)
+    assert len(bars["date"]) == 120
+    assert bars["volume"].sum() == columns["volume"].sum()
+    assert bars["high"].max() == columns["high"].max()
+    assert bars["low"].min() == columns["low"].min()
+    assert bars["close"][-1] == columns["close"][-1]
+
+
+def test_ohlc_buckets_returns_short_series_unchanged():
+    columns = make_columns(50)
+    assert ohlc_buckets(columns, 100) is columns
+
+
+def test_lttb_matches_reference_implementation():
+    columns = make_columns(2000)
+    x = columns["date"].astype(np.int64).astype(np.float64)
+    y = columns["close"]
+    keep = lttb(x, y, 150)
+    assert len(keep) == 150
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    np.testing.assert_array_equal(keep, reference_lttb(x, y, 150))
+
+
+def test_lttb_short_series_and_minimum_points():
+    x = np.arange(5, dtype=np.float64)
+    np.testing.assert_array_equal(lttb(x, x, 10), np.arange(5))
+    with pytest.raises(ValueError):
+        lttb(x, x, 2)
+
+
+def test_build_series_limits_range_and_points():
+    columns = make_columns(3000)
+    series = build_series("AAPL", columns, "1y", 100, "lttb")
+    first = date.fromisoformat(str(series["points"][0]["date"])[:10])
+    assert series["source_bars"] in (366, 367)
+    assert len(series["points"]) == 100
+    assert first == range_start(columns["date"][-1].astype(date), "1y")
+
+    bars = build_series("AAPL", columns, "max", 40, "ohlc")["bars"]
+    assert len(bars) == 40
+    assert sum(bar["volume"] for bar in bars) == int(columns["volume"].sum())
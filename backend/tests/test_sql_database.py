@@ -0,0 +1,18 @@
+import asyncio
+import os
+import tempfile
+
+from app.repositories.sql import SqlUserRepository
+from app.repositories.sqlite import sqlite_database
+
+
+def test_sql_backend_keeps_its_connection_apart_from_the_postgrest_client():
+    db = sqlite_database(os.path.join(tempfile.mkdtemp(), "app.sqlite3"))
+
+    async def scenario():
+        await db.create_schema()
+        await db.close()
+
+    asyncio.run(scenario())
+    assert db.client is None
+    assert isinstance(db.users, SqlUserRepository) and db.users.conn is db.conn
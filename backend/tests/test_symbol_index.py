@@ -0,0 +1,67 @@
+import pytest
+
+from app.services.symbol_index import SymbolIndex, parse_listing
+
+NASDAQ_LISTING = """Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares
+AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N
+APLE|Apple Hospitality REIT, Inc. - Common Shares|Q|N|N|100|N|N
+MSFT|Microsoft Corporation - Common Stock|Q|N|N|100|N|N
+ZZZT|Test Issue Corp|Q|Y|N|100|N|N
+File Creation Time: 0101202400:00|||||||
+"""
+
+OTHER_LISTING = """ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol
+BRK.B|Berkshire Hathaway Inc. Class B|N|BRK.B|N|100|N|BRK.B
+SPY|SPDR S&P 500 ETF Trust|P|SPY|Y|100|N|SPY
+"""
+
+
+@pytest.fixture
+def index():
+    index = SymbolIndex()
+    index.load(parse_listing(NASDAQ_LISTING) + parse_listing(OTHER_LISTING))
+    return index
+
+
+def test_parse_listing_skips_test_issues_and_footer():
+    symbols = [entry[0] for entry in parse_listing(NASDAQ_LISTING)]
+    assert symbols == ["AAPL", "APLE", "MSFT"]
+    assert parse_listing(OTHER_LISTING)[0] == ("BRK-B", "Berkshire Hathaway Inc. Class B", "NYSE")
+
+
+def test_contains_normalizes_symbols(index):
+    assert index.contains("aapl")
+    assert index.contains("BRK.B")
+    assert not index.contains("ZZZT")
+
+
+def test_search_by_symbol_prefix(index):
+    # Symbol matches come first, then companies whose name starts with the query
+    assert [match["ticker"] for match in index.search("AP")] == ["APLE", "AAPL"]
+    assert [match["ticker"] for match in index.search("aap")] == ["AAPL"]
+
+
+def test_search_by_name_prefers_shorter_names(index):
+    assert [match["ticker"] for match in index.search("apple")] == ["AAPL", "APLE"]
+    assert [match["ticker"] for match in index.search("apple hosp")] == ["APLE"]
+
+
+def test_search_corrects_typos_only_without_exact_matches(index):
+    assert [match["ticker"] for match in index.search("microsfot")] == ["MSFT"]
+
+
+def test_search_respects_limit_and_empty_index(index):
+    assert len(index.search("a", limit=1)) == 1
+    assert SymbolIndex().search("AAPL") == []
+
+
+def test_positions_and_watchlists_store_normalized_symbols(client, auth, market):
+    client.post("/portfolio/add", json={"ticker": "brk.b", "shares": 3}, headers=auth)
+    client.post("/portfolio/import", json=[{"ticker": "BRK.B", "shares": 2}], headers=auth)
+    positions = client.get("/portfolio", headers=auth).json()["positions"]
+    assert [(p["ticker"], p["shares"]) for p in positions] == [("BRK-B", 5)]
+
+    client.post("/watchlist/add", json={"ticker": "BRK.B"}, headers=auth)
+    client.post("/watchlist/batch", json={"add": ["brk.b"]}, headers=auth)
+    assert client.get("/watchlist", headers=auth).json()["tickers"] == ["BRK-B"]
+    assert market == []
@@ -0,0 +1,41 @@
+def test_batch_removes_then_adds_and_reports_unknown_tickers(client, auth, market):
+    client.post("/watchlist/batch", json={"add": ["AAPL", "MSFT"]}, headers=auth)
+
+    response = client.post("/watchlist/batch", json={
+        "add": ["nvda", "AAPL", "ZZZZ", "NVDA", "SPY"],
+        "remove": ["MSFT", "TSLA"]
+    }, headers=auth)
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "tickers": ["AAPL", "NVDA", "SPY"],
+        "added": ["NVDA", "SPY"],
+        "removed": ["MSFT"],
+        "errors": {"ZZZZ": "Stock ZZZZ not found"},
+    }
+    # Listed symbols never go upstream; the rest share one lookup
+    assert market == [["ZZZZ"]]
+    assert client.get("/watchlist", headers=auth).json()["tickers"] == ["AAPL", "NVDA", "SPY"]
+
+
+def test_batch_is_all_or_nothing_when_upstream_is_down(client, auth, market):
+    response = client.post("/watchlist/batch", json={"add": ["AAPL", "DOWNX"]}, headers=auth)
+    assert response.status_code == 503
+    assert client.get("/watchlist", headers=auth).json()["tickers"] == []
+
+
+def test_batch_without_changes_keeps_the_etag(client, auth, market):
+    client.post("/watchlist/batch", json={"add": ["AAPL"]}, headers=auth)
+    etag = client.get("/watchlist", headers=auth).headers["etag"]
+
+    client.post("/watchlist/batch", json={"add": ["AAPL"], "remove": ["MSFT"]}, headers=auth)
+    assert client.get("/watchlist", headers={**auth, "If-None-Match": etag}).status_code == 304
+
+    client.post("/watchlist/batch", json={"remove": ["AAPL"]}, headers=auth)
+    assert client.get("/watchlist", headers={**auth, "If-None-Match": etag}).status_code == 200
+
+
+def test_batch_size_is_limited(client, auth):
+    from app.core import config
+
+    tickers = [f"T{i}" for i in range(config.WATCHLIST_BATCH_MAX_TICKERS + 1)]
+    assert client.post("/watchlist/batch", json={"add": tickers}, headers=auth).status_code == 422